@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+AI vision review of rendered main images (generate_images_v2 --ai-review).
+
+review_images() sends product images to Claude or OpenAI from a bounded
+thread pool, every call passing through one shared RateLimiter. Images are
+downscaled to REVIEW_MAX_DIMENSION and sent as JPEG rather than as the
+300 DPI PNG. Verdicts are cached in exports/.review_cache/ under a hash of
+the image bytes, provider, model and REVIEW_PROMPT_VERSION, so an unchanged
+image is never reviewed twice; failed or skipped reviews are not cached.
+
+A verdict is the reviewer's JSON:
+    {"approved": false, "score": 6, "feedback": "...", "icon_scale": 1.2, "text_scale": 1.0}
+where the scales are relative adjustments (1.2 = 20% larger).
+"""
+
+import base64
+import io
+import json
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from image_derivatives import flatten_on_white
+from rasterizers import write_atomic
+from rate_limit import RateLimiter
+from render_cache import cache_key, file_digest
+
+REVIEW_PROMPT_VERSION = "1"  # bump when either prompt changes, to invalidate cached verdicts
+REVIEW_MODELS = {
+    "claude": "claude-sonnet-4-20250514",
+    "openai": "gpt-4o",
+}
+REVIEW_MAX_DIMENSION = 1024  # longest side sent to the API
+REVIEW_JPEG_QUALITY = 85
+REVIEW_WORKERS = 4
+REVIEW_REQUESTS_PER_MINUTE = 40
+REVIEW_CACHE_DIRNAME = ".review_cache"
+
+# Bounds for scales the reviewer can push a product to
+SCALE_LIMITS = (0.5, 2.0)
+
+
+def _describe(product, size_note: str = "") -> str:
+    return (
+        f"- SKU: {product.sku_parent}\n"
+        f"- Size: {product.size}{size_note}\n"
+        f"- Layout: {product.layout_mode}\n"
+        f"- Sign type: {product.sign_type}\n"
+        f"- Text: {product.text_line_1} / {product.text_line_2} / {product.text_line_3}"
+    )
+
+
+def _claude_prompt(product) -> str:
+    return f"""Review this product sign image for Amazon listing quality.
+
+Product details:
+{_describe(product)}
+
+Evaluate:
+1. Text readability (is it clear and properly sized?)
+2. Icon visibility (is it clear and well-positioned?)
+3. Overall balance (is the layout visually balanced?)
+4. Professional appearance (does it look like a quality product image?)
+
+If adjustments are needed, suggest percentage changes for icon_scale and text_scale (e.g., 1.2 = 20% larger, 0.8 = 20% smaller).
+
+Respond with JSON only:
+{{"approved": true/false, "score": 1-10, "feedback": "brief feedback", "icon_scale": 1.0, "text_scale": 1.0}}
+"""
+
+
+def _openai_prompt(product) -> str:
+    return f"""You are a graphic design expert reviewing a product sign image for Amazon listing quality.
+
+Product details:
+{_describe(product, " (physical sign dimensions)")}
+
+Critically evaluate for VISUAL PRESENCE and IMPACT:
+1. Is the icon large enough to be immediately recognizable? Should it be bigger?
+2. Is the text bold and readable at a glance? Should it be larger?
+3. Is the icon positioned optimally (not too centered, good use of space)?
+4. Does the overall design have strong visual impact for a product listing?
+
+Be critical - if elements are too small or poorly positioned, suggest specific scale adjustments.
+icon_scale: 1.0 = current size, 1.3 = 30% larger, 0.8 = 20% smaller
+text_scale: 1.0 = current size, 1.5 = 50% larger, etc.
+
+Respond with JSON only:
+{{"approved": true/false, "score": 1-10, "feedback": "specific feedback", "icon_scale": 1.0, "text_scale": 1.0}}
+"""
+
+
+def review_payload(image_path: Path) -> bytes:
+    """The image as sent for review: flattened on white, at most REVIEW_MAX_DIMENSION, JPEG."""
+    with Image.open(image_path) as img:
+        img.thumbnail((REVIEW_MAX_DIMENSION, REVIEW_MAX_DIMENSION), Image.LANCZOS)
+        out = io.BytesIO()
+        flatten_on_white(img).save(out, "JPEG", quality=REVIEW_JPEG_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+def _parse_verdict(result_text: str, provider: str) -> dict:
+    # The JSON may be wrapped in prose or a markdown code block
+    json_match = re.search(r'\{[^{}]*\}', result_text, re.DOTALL)
+    if json_match:
+        try:
+            return json.loads(json_match.group())
+        except json.JSONDecodeError:
+            pass
+    logging.warning("No JSON found in %s response: %s", provider, result_text[:200])
+    return {"approved": True, "score": None, "feedback": result_text[:200], "skipped": True}
+
+
+def _review_with_claude(client, payload: bytes, product) -> dict:
+    """Send one image to the Claude Vision API. Returns the verdict dict."""
+    response = client.messages.create(
+        model=REVIEW_MODELS["claude"],
+        max_tokens=200,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": "image/jpeg",
+                            "data": base64.b64encode(payload).decode("utf-8"),
+                        },
+                    },
+                    {"type": "text", "text": _claude_prompt(product)},
+                ],
+            }
+        ],
+    )
+    result_text = response.content[0].text
+    logging.debug("Claude raw response: %s", result_text)
+    return _parse_verdict(result_text, "Claude")
+
+
+def _review_with_openai(client, payload: bytes, product) -> dict:
+    """Send one image to the OpenAI GPT-4o Vision API. Returns the verdict dict."""
+    response = client.chat.completions.create(
+        model=REVIEW_MODELS["openai"],
+        max_tokens=300,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": _openai_prompt(product)},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{base64.b64encode(payload).decode('utf-8')}",
+                            "detail": "high",
+                        },
+                    },
+                ],
+            }
+        ],
+    )
+    result_text = response.choices[0].message.content
+    logging.debug("OpenAI raw response: %s", result_text)
+    return _parse_verdict(result_text, "OpenAI")
+
+
+def _make_client(provider: str, api_key: str):
+    """API client shared by the review threads, or None when review is unavailable."""
+    if not api_key:
+        logging.warning("AI review skipped: no API key")
+        return None
+    try:
+        if provider == "claude":
+            import anthropic
+            return anthropic.Anthropic(api_key=api_key)
+        import openai
+        return openai.OpenAI(api_key=api_key)
+    except ImportError:
+        logging.warning("%s package not installed, skipping AI review",
+                        "anthropic" if provider == "claude" else "openai")
+        return None
+
+
+class ReviewCache:
+    """Verdicts on disk, one small JSON file per key: exports/.review_cache/ab/abcdef....json"""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            verdict = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self.hits += 1
+        return verdict
+
+    def put(self, key: str, verdict: dict) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, json.dumps(verdict).encode("utf-8"))
+        except OSError as e:
+            logging.warning("Could not cache review verdict: %s", e)
+
+
+def review_images(
+    items: list,
+    provider: str,
+    api_key: str,
+    exports_dir: Path,
+    workers: int = REVIEW_WORKERS,
+    requests_per_minute: float = REVIEW_REQUESTS_PER_MINUTE,
+) -> dict[str, dict]:
+    """
+    Review (product, image_path) pairs concurrently. Returns {m_number: verdict};
+    products whose review could not run are left out. Verdicts carry "cached": True
+    when they came from the cache.
+    """
+    cache = ReviewCache(Path(exports_dir) / REVIEW_CACHE_DIRNAME)
+    reviewed = 0
+    model = REVIEW_MODELS[provider]
+    keyed = []
+    verdicts: dict[str, dict] = {}
+    for product, image_path in items:
+        if not Path(image_path).exists():
+            logging.warning("AI review: no image for %s at %s", product.m_number, image_path)
+            continue
+        key = cache_key(image=file_digest(image_path), provider=provider, model=model,
+                        prompt=REVIEW_PROMPT_VERSION)
+        verdict = cache.get(key)
+        if verdict is not None:
+            verdicts[product.m_number] = {**verdict, "cached": True}
+        else:
+            keyed.append((product, image_path, key))
+
+    if keyed:
+        client = _make_client(provider, api_key)
+        if client is not None:
+            review = _review_with_claude if provider == "claude" else _review_with_openai
+            limiter = RateLimiter(requests_per_minute)
+
+            def run(product, image_path, key):
+                try:
+                    payload = review_payload(image_path)
+                    limiter.acquire()
+                    verdict = review(client, payload, product)
+                except Exception as e:
+                    logging.warning("%s review failed for %s: %s", provider, product.m_number, e)
+                    return None
+                if not verdict.get("skipped"):
+                    cache.put(key, verdict)
+                return verdict
+
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(keyed)))) as pool:
+                futures = [(product, pool.submit(run, product, image_path, key))
+                           for product, image_path, key in keyed]
+                for product, future in futures:
+                    verdict = future.result()
+                    if verdict is not None:
+                        verdicts[product.m_number] = verdict
+                        reviewed += 1
+            if limiter.waited:
+                logging.info("AI review: waited %.1fs for the rate limit", limiter.waited)
+
+    logging.info("AI review: %d reviewed, %d from cache, %d approved",
+                 reviewed, cache.hits,
+                 sum(1 for v in verdicts.values() if v.get("approved")))
+    return verdicts
+
+
+def adjusted_scales(product, verdict: dict) -> Optional[tuple[float, float]]:
+    """(icon_scale, text_scale) after applying the verdict's suggestion, or None if it suggests no change."""
+    lo, hi = SCALE_LIMITS
+    scales = []
+    for name in ("icon_scale", "text_scale"):
+        try:
+            factor = float(verdict.get(name) or 1.0)
+        except (TypeError, ValueError):
+            factor = 1.0
+        current = getattr(product, name)
+        scales.append(round(min(hi, max(lo, current * factor)), 3))
+    if all(abs(new - getattr(product, name)) < 0.01 for new, name in zip(scales, ("icon_scale", "text_scale"))):
+        return None
+    return scales[0], scales[1]
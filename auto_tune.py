@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Automatic icon/text scale tuning (generate_images_v2 --auto-tune).
+
+Instead of the QA loop (adjust a slider, regenerate, look again), each
+product's design is rendered for a small grid of (icon_scale, text_scale)
+candidates around its current values, at draft resolution and without the
+template background, and every candidate is scored from its pixels:
+
+  fill         bounding box of the design as a share of the sign's area,
+               rewarded up to TARGET_FILL and penalized beyond it
+  clearance    distance from the design to the sign edge, penalized below
+               COMFORT_CLEARANCE_MM
+  balance      text ink as a share of all ink, penalized away from
+               TARGET_TEXT_SHARE (only when there is both icon and text)
+  lint         each layout_lint.py error costs LINT_ERROR_PENALTY
+
+The current scales win unless another candidate scores at least
+MIN_IMPROVEMENT higher, so repeated runs settle instead of drifting.
+The rendering itself is generate_images_v2._tune_product_scales.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+SCALE_STEPS = (1.0, 0.85, 1.15)  # relative to the current scale; unchanged first, so it wins ties
+SCALE_LIMITS = (0.5, 2.0)  # the QA slider range
+SCALE_QUANTUM = 0.05  # the QA slider step
+
+INK_ALPHA = 32  # design-layer pixels at least this opaque count as ink
+TARGET_FILL = 0.7
+TARGET_TEXT_SHARE = 0.3
+COMFORT_CLEARANCE_MM = 5.0
+BALANCE_WEIGHT = 0.5
+CLEARANCE_WEIGHT = 0.5
+LINT_ERROR_PENALTY = 1.0
+MIN_IMPROVEMENT = 0.01
+
+
+@dataclass
+class CandidateScore:
+    icon_scale: float
+    text_scale: float
+    score: float
+    fill: float
+    clearance_mm: float
+    text_share: Optional[float]  # None without both icon and text
+    lint_errors: int = 0
+
+
+def _quantize(value: float) -> float:
+    lo, hi = SCALE_LIMITS
+    return round(min(hi, max(lo, round(value / SCALE_QUANTUM) * SCALE_QUANTUM)), 2)
+
+
+def candidate_scales(icon_scale: float, text_scale: float) -> list[tuple[float, float]]:
+    """The (icon_scale, text_scale) grid around the current values, current values first."""
+    current = (icon_scale, text_scale)
+    grid = [current]
+    for icon_step in SCALE_STEPS:
+        for text_step in SCALE_STEPS:
+            candidate = (_quantize(icon_scale * icon_step), _quantize(text_scale * text_step))
+            if candidate not in grid:
+                grid.append(candidate)
+    return grid
+
+
+def score_layer(
+    layer: Image.Image,
+    px_per_mm: float,
+    sign_box: tuple[float, float, float, float],
+    circular: bool,
+    icon_box: Optional[tuple[float, float, float, float]],
+    has_text: bool,
+    icon_scale: float,
+    text_scale: float,
+    lint_errors: int = 0,
+) -> Optional[CandidateScore]:
+    """
+    Score one candidate's design layer (RGBA, transparent where there is no design).
+    Boxes are (x0, y0, x1, y1) in mm. Returns None if the layer has no ink.
+    """
+    alpha = np.asarray(layer.getchannel("A"))
+    ys, xs = np.nonzero(alpha >= INK_ALPHA)
+    if xs.size == 0:
+        return None
+    # Pixel centres in mm
+    x_mm = (xs + 0.5) / px_per_mm
+    y_mm = (ys + 0.5) / px_per_mm
+    sx0, sy0, sx1, sy1 = sign_box
+
+    box_area = (x_mm.max() - x_mm.min()) * (y_mm.max() - y_mm.min())
+    if circular:
+        radius = min(sx1 - sx0, sy1 - sy0) / 2
+        fill = box_area / (np.pi * radius ** 2)
+        clearance = radius - np.hypot(x_mm - (sx0 + sx1) / 2, y_mm - (sy0 + sy1) / 2).max()
+    else:
+        fill = box_area / ((sx1 - sx0) * (sy1 - sy0))
+        clearance = min(x_mm.min() - sx0, y_mm.min() - sy0, sx1 - x_mm.max(), sy1 - y_mm.max())
+
+    text_share = None
+    if icon_box is not None and has_text:
+        ix0, iy0, ix1, iy1 = icon_box
+        in_icon = (x_mm >= ix0) & (x_mm <= ix1) & (y_mm >= iy0) & (y_mm <= iy1)
+        text_share = float(1.0 - in_icon.mean())
+
+    score = min(fill, TARGET_FILL) - 2 * max(0.0, fill - TARGET_FILL)
+    score -= CLEARANCE_WEIGHT * max(0.0, COMFORT_CLEARANCE_MM - clearance) / COMFORT_CLEARANCE_MM
+    if text_share is not None:
+        score -= BALANCE_WEIGHT * abs(text_share - TARGET_TEXT_SHARE)
+    score -= LINT_ERROR_PENALTY * lint_errors
+    return CandidateScore(icon_scale, text_scale, round(float(score), 4), round(float(fill), 4),
+                          round(float(clearance), 2), None if text_share is None else round(text_share, 4), lint_errors)
+
+
+def pick(scores: list[CandidateScore]) -> CandidateScore:
+    """The winning candidate; scores[0] is the current scales, kept unless beaten by MIN_IMPROVEMENT."""
+    current = scores[0]
+    best = max(scores, key=lambda s: s.score)
+    return best if best.score >= current.score + MIN_IMPROVEMENT else current
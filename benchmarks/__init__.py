@@ -0,0 +1,14 @@
+"""
+Throughput benchmarks for the image and listing pipelines.
+
+Runs each pipeline stage against a synthetic catalog with no Inkscape and
+no paid APIs: images are rasterized by a stub backend and Claude/R2 calls
+go to fake HTTP services on localhost.
+
+    python -m benchmarks.catalog --products 500 --output bench_products.csv
+    python -m benchmarks.run --products 200 --output bench.json
+    python -m benchmarks.run --products 200 --baseline bench.json
+
+Run from the repository root (the pipelines resolve assets/ and
+001 ICONS/ relative to it).
+"""
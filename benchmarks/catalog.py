@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Synthetic products.csv generator.
+
+Cycles through every SIZES x COLORS x LAYOUT_MODES combination (portrait
+too, where the size has portrait templates) in a shuffled order, so a
+catalog of any length exercises all layouts evenly. Icons, text, fonts and
+scales are drawn from the same seeded RNG: one seed, one catalog.
+
+Usage:
+    python -m benchmarks.catalog --products 500 --output bench_products.csv
+"""
+
+import argparse
+import csv
+import itertools
+import logging
+import random
+from pathlib import Path
+
+from generate_images_v2 import COLORS, FONTS, LAYOUT_MODES, SIZES
+
+CATALOG_COLUMNS = [
+    "m_number", "description", "size", "color", "layout_mode", "icon_files",
+    "text_line_1", "text_line_2", "text_line_3", "sign_type", "orientation",
+    "font", "icon_scale", "text_scale", "qa_status",
+]
+
+# Sign wording to draw text lines from
+SIGN_WORDS = [
+    "NO", "PARKING", "PRIVATE", "PROPERTY", "KEEP", "GATE", "CLOSED", "STAFF", "ONLY",
+    "PUSH", "PULL", "DOGS", "ON", "LEAD", "PLEASE", "RING", "BELL", "DELIVERIES",
+    "THIS", "WAY", "FIRE", "EXIT", "CCTV", "IN", "OPERATION", "SLOW", "TURNING",
+]
+
+
+def _available_icons(icons_dir: Path) -> list[str]:
+    """Icon file names usable in icon_files (overlays are drawn by the pipeline itself)."""
+    icons = sorted(
+        p.name for p in icons_dir.iterdir()
+        if p.suffix.lower() in (".svg", ".png") and "OVERLAY" not in p.name.upper()
+    )
+    if not icons:
+        raise FileNotFoundError(f"No icons found in {icons_dir}")
+    return icons
+
+
+def _combinations(templates_dir: Path) -> list[tuple[str, str, str, str]]:
+    """Every (size, color, layout_mode, orientation) that has a main template."""
+    combos = []
+    for size, color, layout_mode in itertools.product(SIZES, COLORS, LAYOUT_MODES):
+        for orientation in ("landscape", "portrait"):
+            suffix = "_portrait" if orientation == "portrait" else ""
+            if (templates_dir / f"{color}_{size}{suffix}_main.svg").exists():
+                combos.append((size, color, layout_mode, orientation))
+    return combos
+
+
+def _text_line(rng: random.Random, max_words: int = 3) -> str:
+    return " ".join(rng.choice(SIGN_WORDS) for _ in range(rng.randint(1, max_words)))
+
+
+def generate_catalog(
+    output: Path,
+    products: int = 100,
+    seed: int = 1,
+    templates_dir: Path = Path("assets"),
+    icons_dir: Path = Path("001 ICONS"),
+    first_m_number: int = 90000,
+) -> Path:
+    """Write a synthetic catalog of `products` rows to output. Returns output."""
+    rng = random.Random(seed)
+    icons = _available_icons(icons_dir)
+    combos = _combinations(templates_dir)
+    if not combos:
+        raise FileNotFoundError(f"No main templates found in {templates_dir}")
+    # Every block of len(combos) rows covers each combination once; shuffled so
+    # short catalogs still mix sizes, colors and layouts
+    rng.shuffle(combos)
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_COLUMNS)
+        writer.writeheader()
+        for i in range(products):
+            size, color, layout_mode, orientation = combos[i % len(combos)]
+            lines = [_text_line(rng)]
+            if rng.random() < 0.6:
+                lines.append(_text_line(rng))
+            if rng.random() < 0.2:
+                lines.append(_text_line(rng, max_words=4))
+            lines += [""] * (3 - len(lines))
+            icon_count = 2 if rng.random() < 0.1 else 1
+            writer.writerow({
+                "m_number": f"M{first_m_number + i}",
+                "description": f"{lines[0].title()} Sign",
+                "size": size,
+                "color": color,
+                "layout_mode": layout_mode,
+                "icon_files": ",".join(rng.sample(icons, icon_count)),
+                "text_line_1": lines[0],
+                "text_line_2": lines[1],
+                "text_line_3": lines[2],
+                "sign_type": "prohibition" if rng.random() < 0.3 else "informational",
+                "orientation": orientation,
+                "font": rng.choice(list(FONTS)),
+                "icon_scale": f"{rng.uniform(0.85, 1.15):.2f}",
+                "text_scale": f"{rng.uniform(0.85, 1.15):.2f}",
+                "qa_status": "approved",
+            })
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic products.csv for benchmarking")
+    parser.add_argument("--products", type=int, default=100, help="Number of rows (default: 100)")
+    parser.add_argument("--seed", type=int, default=1, help="RNG seed (default: 1)")
+    parser.add_argument("--output", type=Path, default=Path("bench_products.csv"), help="Output CSV")
+    parser.add_argument("--templates", type=Path, default=Path("assets"), help="Templates directory")
+    parser.add_argument("--icons", type=Path, default=Path("001 ICONS"), help="Icons directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    path = generate_catalog(args.output, args.products, args.seed, args.templates, args.icons)
+    logging.info("Wrote %d products to %s", args.products, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner: one synthetic catalog through every pipeline stage.
+
+Stages (run in this order, each in a fresh process so peak RSS is per stage):
+  images  - generate_images_v2.generate_from_csv with the stub renderer
+  upload  - generate_amazon_content.upload_product_images to the fake S3 (needs images)
+  amazon  - generate_amazon_content.generate_content_with_claude
+  ebay    - generate_ebay_listings.generate_content_with_claude
+  etsy    - generate_etsy_listings.generate_etsy_content_with_claude
+
+The report is JSON: per stage items, failures, items/sec, latency
+percentiles (seconds per product) and peak RSS; for images also the
+pipeline's own per-stage timings. Stages whose modules cannot be imported
+(e.g. anthropic not installed) are reported as skipped.
+
+Usage:
+    python -m benchmarks.run --products 200 --output bench.json
+    python -m benchmarks.run --products 200 --stages images --jobs 4 --render-latency 0.05
+    python -m benchmarks.run --products 200 --baseline bench.json
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.catalog import generate_catalog
+from benchmarks.stubs import FakeServices
+
+STAGES = ("images", "upload", "amazon", "ebay", "etsy")
+
+# stage -> (module, content function)
+CONTENT_STAGES = {
+    "amazon": ("generate_amazon_content", "generate_content_with_claude"),
+    "ebay": ("generate_ebay_listings", "generate_content_with_claude"),
+    "etsy": ("generate_etsy_listings", "generate_etsy_content_with_claude"),
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its finished children, in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / 2**20, 1)
+        except (ImportError, AttributeError):
+            return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _stage_result(items: int, failed: int, seconds: float, latencies: list[float], **extra) -> dict:
+    from pipeline_metrics import percentile
+
+    values = sorted(latencies)
+    latency = {}
+    if values:
+        latency = {
+            "mean": sum(values) / len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1],
+        }
+    return {
+        "items": items,
+        "failed": failed,
+        "seconds": round(seconds, 4),
+        "items_per_sec": round(items / seconds, 3) if seconds else None,
+        "latency": {k: round(v, 6) for k, v in latency.items()},
+        "peak_rss_mb": _peak_rss_mb(),
+        **extra,
+    }
+
+
+def _bench_images(settings: dict) -> dict:
+    from benchmarks.stubs import register_stub_renderer
+    import generate_images_v2
+    from pipeline_metrics import load_spans, summarize
+
+    register_stub_renderer(settings["render_seconds"])
+    generate_images_v2._configure_renderer("stub", inkscape_shell=False)
+    exports = Path(settings["workdir"]) / "exports"
+
+    start = time.perf_counter()
+    ok, failed = generate_images_v2.generate_from_csv(
+        Path(settings["catalog"]), Path("assets"), Path("001 ICONS"), exports,
+        jobs=settings["jobs"], use_cache=settings["cache"],
+    )
+    seconds = time.perf_counter() - start
+
+    # Per-product latency is the product's instrumented time (see pipeline_metrics)
+    spans = load_spans(exports / "metrics.jsonl", "last")
+    per_product: dict[str, float] = {}
+    for record in spans:
+        if record["product"]:
+            per_product[record["product"]] = per_product.get(record["product"], 0.0) + record["seconds"]
+    stages = {stage: {k: round(v, 6) for k, v in s.items()} for stage, s in summarize(spans).items()}
+    return _stage_result(ok + failed, failed, seconds, list(per_product.values()), pipeline_stages=stages)
+
+
+def _bench_upload(settings: dict) -> dict:
+    import boto3
+    import generate_amazon_content
+
+    exports = Path(settings["workdir"]) / "exports"
+    folders = sorted(p for p in exports.glob("*") if (p / "002 Images").is_dir()) if exports.exists() else []
+    if not folders:
+        return {"skipped": "no rendered products (run the images stage first)"}
+
+    real_client = boto3.client
+
+    def local_client(service, **kwargs):
+        kwargs["endpoint_url"] = settings["services_url"]  # R2's endpoint is built from the account id
+        return real_client(service, **kwargs)
+
+    boto3.client = local_client
+    latencies, failed = [], 0
+    start = time.perf_counter()
+    try:
+        for folder in folders:
+            t0 = time.perf_counter()
+            try:
+                generate_amazon_content.upload_product_images(
+                    folder, "bench", "bench", "bench-key", "bench-secret", "https://images.example.invalid",
+                    also_upload_jpeg=True,
+                )
+            except Exception as e:
+                logging.warning("Upload failed for %s: %s", folder.name, e)
+                failed += 1
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        boto3.client = real_client
+    return _stage_result(len(folders), failed, time.perf_counter() - start, latencies)
+
+
+def _bench_content(stage: str, settings: dict) -> dict:
+    os.environ["ANTHROPIC_BASE_URL"] = settings["services_url"]
+    module_name, function_name = CONTENT_STAGES[stage]
+    module = importlib.import_module(module_name)
+    generate = getattr(module, function_name)
+    products = module.read_products_from_csv(Path(settings["catalog"]), qa_filter="approved")
+    # Never the real llm_cache.db; cold (every call reaches the fake API) unless --cache
+    from llm_cache import ResponseCache
+    cache = ResponseCache(Path(settings["workdir"]) / "llm_cache.db", refresh=not settings["cache"])
+
+    latencies, failed = [], 0
+    start = time.perf_counter()
+    for product in products:
+        t0 = time.perf_counter()
+        try:
+            generate(product, "bench-key", cache=cache)
+        except Exception as e:
+            logging.warning("%s content failed for %s: %s", stage, product.m_number, e)
+            failed += 1
+        latencies.append(time.perf_counter() - t0)
+    return _stage_result(len(products), failed, time.perf_counter() - start, latencies)
+
+
+def _run_stage(stage: str, settings: dict) -> dict:
+    """Entry point in the per-stage process."""
+    # Before the pipeline modules are imported, so their basicConfig() calls are no-ops
+    logging.basicConfig(level=logging.INFO if settings["verbose"] else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        if stage == "images":
+            return _bench_images(settings)
+        if stage == "upload":
+            return _bench_upload(settings)
+        return _bench_content(stage, settings)
+    except ImportError as e:
+        return {"skipped": str(e)}
+
+
+def _git_revision() -> dict:
+    """Commit the benchmark ran against, so reports can be compared across commits."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=30)
+        status = subprocess.run(["git", "status", "--porcelain", "-uno"], capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit.stdout.strip() or None, "dirty": bool(status.stdout.strip())}
+
+
+def run_benchmarks(
+    products: int = 100,
+    seed: int = 1,
+    stages: tuple = STAGES,
+    jobs: int = 1,
+    cache: bool = False,
+    render_seconds: float = 0.0,
+    api_seconds: float = 0.0,
+    upload_seconds: float = 0.0,
+    error_rate: float = 0.0,
+    workdir: Optional[Path] = None,
+    verbose: bool = False,
+) -> dict:
+    """Run the selected stages against a fresh synthetic catalog. Returns the report."""
+    keep = workdir is not None
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="signmaker-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    catalog = generate_catalog(workdir / "products.csv", products, seed)
+
+    report = {
+        **_git_revision(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "products": products, "seed": seed, "jobs": jobs, "cache": cache,
+            "render_seconds": render_seconds, "api_seconds": api_seconds,
+            "upload_seconds": upload_seconds, "error_rate": error_rate,
+        },
+        "stages": {},
+    }
+    try:
+        with FakeServices(api_seconds, upload_seconds, error_rate, seed) as services:
+            settings = {
+                "catalog": str(catalog),
+                "workdir": str(workdir),
+                "services_url": services.url,
+                "jobs": jobs,
+                "cache": cache,
+                "render_seconds": render_seconds,
+                "verbose": verbose,
+            }
+            context = multiprocessing.get_context("spawn")
+            for stage in (s for s in STAGES if s in stages):
+                logging.info("Running %s stage...", stage)
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(_run_stage, stage, settings).result()
+                report["stages"][stage] = result
+                if "skipped" in result:
+                    logging.warning("  %s skipped: %s", stage, result["skipped"])
+                else:
+                    logging.info("  %d items, %.2f items/sec, p95 %.4fs, peak RSS %s MB",
+                                 result["items"], result["items_per_sec"] or 0,
+                                 result["latency"].get("p95", 0), result["peak_rss_mb"])
+            report["services"] = dict(services.counters)
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def log_comparison(baseline: dict, report: dict) -> None:
+    """Log items/sec and p95 latency against a baseline report."""
+    logging.info("Compared with %s:", (baseline.get("commit") or "baseline")[:12])
+    logging.info("  %-8s %12s %12s %8s %10s %10s", "stage", "base it/s", "new it/s", "change", "base p95", "new p95")
+    for stage, new in report["stages"].items():
+        old = baseline.get("stages", {}).get(stage, {})
+        if "skipped" in new or not old or "skipped" in old:
+            continue
+        change = ""
+        if old.get("items_per_sec") and new.get("items_per_sec"):
+            change = f"{(new['items_per_sec'] / old['items_per_sec'] - 1) * 100:+.1f}%"
+        logging.info("  %-8s %12.2f %12.2f %8s %10.4f %10.4f", stage,
+                     old.get("items_per_sec") or 0, new.get("items_per_sec") or 0, change,
+                     old.get("latency", {}).get("p95", 0), new.get("latency", {}).get("p95", 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image and listing pipelines offline")
+    parser.add_argument("--products", type=int, default=100, help="Synthetic catalog size (default: 100)")
+    parser.add_argument("--seed", type=int, default=1, help="Catalog and fake-API RNG seed (default: 1)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--jobs", type=int, default=1, help="generate_images_v2 --jobs (default: 1)")
+    parser.add_argument("--cache", action="store_true", help="Keep the render and content caches enabled (default: cold renders and API calls)")
+    parser.add_argument("--render-latency", type=float, default=0.0, help="Seconds per stub render (default: 0)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Seconds per fake Claude call (default: 0)")
+    parser.add_argument("--upload-latency", type=float, default=0.0, help="Seconds per fake R2 upload (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of fake Claude calls answered with 429 (default: 0)")
+    parser.add_argument("--workdir", type=Path, help="Keep the catalog and exports here instead of a temp dir")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", type=Path, help="Previous JSON report to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline INFO logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    stages = tuple(s.strip() for s in args.stages.split(",") if s.strip())
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))} (choose from: {', '.join(STAGES)})")
+
+    report = run_benchmarks(
+        products=args.products,
+        seed=args.seed,
+        stages=stages,
+        jobs=args.jobs,
+        cache=args.cache,
+        render_seconds=args.render_latency,
+        api_seconds=args.api_latency,
+        upload_seconds=args.upload_latency,
+        error_rate=args.error_rate,
+        workdir=args.workdir,
+        verbose=args.verbose,
+    )
+    if args.baseline:
+        log_comparison(json.loads(args.baseline.read_text(encoding="utf-8")), report)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        logging.info("Report written to %s", args.output)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
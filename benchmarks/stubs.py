@@ -0,0 +1,174 @@
+"""
+Stand-ins for the expensive parts of the pipelines.
+
+StubRasterizer   - registered as renderer "stub": serializes the SVG like a
+                   real backend, then returns a blank PNG of the requested
+                   size after an optional fixed delay.
+FakeServices     - one local HTTP server that answers the Anthropic
+                   Messages API (POST /v1/messages) and S3 PutObject (any
+                   other PUT, as used for Cloudflare R2 uploads).
+"""
+
+import functools
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lxml import etree
+from PIL import Image
+
+from pipeline_metrics import span
+from rasterizers import RASTERIZERS, Rasterizer, encode_png
+
+# One JSON body that satisfies the Amazon, eBay and Etsy content parsers
+FAKE_LISTING = {
+    "title": "Benchmark Sign – 11x9.5cm Brushed Aluminium, Weatherproof, Self Adhesive",
+    "description": "<p>Synthetic listing text returned by the benchmark's fake API.</p>" * 8,
+    "bullet_points": ["Synthetic bullet point for benchmarking listing generation throughput."] * 5,
+    "search_terms": "benchmark sign aluminium weatherproof",
+    "aspects": {"Type": "Safety Sign", "Material": "Aluminium", "Colour": "Silver"},
+    "tags": [f"benchmark tag {i}" for i in range(13)],
+    "materials": ["Brushed Aluminium", "UV Print", "Self-Adhesive Backing"],
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _blank_png(width_px: int, height_px: int) -> bytes:
+    return encode_png(Image.new("RGBA", (max(1, width_px), max(1, height_px)), (255, 255, 255, 0)))
+
+
+class StubRasterizer(Rasterizer):
+    """Rasterizer that does no rasterizing; render_seconds simulates a real backend's cost."""
+
+    name = "stub"
+    render_seconds = 0.0
+
+    def render(self, root, width_px, height_px, dpi=300, export_area="page"):
+        return Image.new("RGBA", (max(1, width_px), max(1, height_px)), (255, 255, 255, 0))
+
+    def render_png(self, root, width_px, height_px, dpi=300, export_area="page"):
+        with span("serialize"):
+            etree.tostring(root, encoding="utf-8", xml_declaration=True)  # keep serialization cost realistic
+        with span("rasterize"):
+            if self.render_seconds:
+                time.sleep(self.render_seconds)
+            return _blank_png(width_px, height_px)
+
+
+def register_stub_renderer(render_seconds: float = 0.0) -> None:
+    """
+    Make --renderer stub available in this process. --jobs workers inherit it
+    when forked; on platforms that spawn workers, benchmark images with --jobs 1.
+    """
+    StubRasterizer.render_seconds = render_seconds
+    RASTERIZERS["stub"] = StubRasterizer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeServices"
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _read_body(self) -> bytes:
+        if "chunked" in self.headers.get("Transfer-Encoding", ""):
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailers (e.g. S3 checksums) end with a blank line
+                    while self.rfile.readline().strip():
+                        pass
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(self, status: int, body: bytes = b"", headers: dict = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_POST(self):
+        body = self._read_body()
+        if not self.path.rstrip("/").endswith("/v1/messages"):
+            self._send(404)
+            return
+        self.server.count("messages")
+        if self.server.api_seconds:
+            time.sleep(self.server.api_seconds)
+        if self.server.should_fail():
+            error = {"type": "error", "error": {"type": "rate_limit_error", "message": "Fake rate limit"}}
+            self._send(429, json.dumps(error).encode(), {"Content-Type": "application/json", "retry-after": "0"})
+            return
+        request = json.loads(body or b"{}")
+        prompt = json.dumps(request.get("messages", []))
+        message = {
+            "id": f"msg_bench_{hashlib.md5(body).hexdigest()[:16]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake"),
+            "content": [{"type": "text", "text": json.dumps(FAKE_LISTING)}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 600},
+        }
+        self._send(200, json.dumps(message).encode(), {"Content-Type": "application/json"})
+
+    def do_PUT(self):
+        body = self._read_body()
+        self.server.count("uploads")
+        self.server.count("upload_bytes", len(body))
+        if self.server.upload_seconds:
+            time.sleep(self.server.upload_seconds)
+        self._send(200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+
+
+class FakeServices(ThreadingHTTPServer):
+    """Local Anthropic + S3 stand-in with fixed latency and an optional 429 rate."""
+
+    daemon_threads = True
+
+    def __init__(self, api_seconds: float = 0.0, upload_seconds: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 1):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.api_seconds = api_seconds
+        self.upload_seconds = upload_seconds
+        self.error_rate = error_rate
+        self.counters: dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.counters["rate_limited"] = self.counters.get("rate_limited", 0) + 1
+        return failed
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
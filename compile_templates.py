@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Compile SVG templates into a minimal render form.
+
+The assets/*.svg templates are Inkscape documents: besides the artwork they
+carry the editor's namedview, metadata, unused defs and inkscape:/sodipodi:
+attributes, all of which used to be parsed, copied into every output SVG and
+handed to the renderer. This build step writes, for each template:
+
+    assets/compiled/<name>.svg   - editor data stripped, unused defs dropped,
+                                   identity transforms removed and nested
+                                   translate-only groups merged
+    assets/compiled/<name>.json  - sidecar: source hash, canvas size and the
+                                   sign outline measured from the artwork
+
+generate_images_v2 renders from the compiled form when its sidecar matches
+the source (by hash) and falls back to the source otherwise. The master
+design file is always built from the source, since it is opened in Inkscape.
+layout_lint and pixel QA read the sign outline through template_sign_outline(),
+which measures the source when its sidecar is missing or stale.
+
+Usage:
+    python compile_templates.py
+    python compile_templates.py --verify --renderer resvg
+"""
+
+import argparse
+import json
+import logging
+import math
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+from lxml import etree
+
+from render_cache import file_digest
+
+COMPILED_DIRNAME = "compiled"
+COMPILER_VERSION = "2"  # bump when the compiled output changes
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+INKSCAPE_NS = "http://www.inkscape.org/namespaces/inkscape"
+SODIPODI_NS = "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd"
+
+# Editor attributes the renderer still reads
+KEEP_EDITOR_ATTRS = {
+    f"{{{SODIPODI_NS}}}role",  # "line" positions tspans in Inkscape text
+}
+# namedview attributes that set the exported page background
+KEEP_NAMEDVIEW_ATTRS = {"pagecolor", f"{{{INKSCAPE_NS}}}pageopacity"}
+
+TEMPLATE_TYPES = ("peel_and_stick", "master_design_file", "dimensions", "main", "rear")
+_ID_REF = re.compile(r"url\(\s*#([^)\s]+)\s*\)")
+_IDENTITY_TRANSFORMS = re.compile(
+    r"^\s*(translate\(\s*0+(\.0*)?\s*([, ]\s*0+(\.0*)?\s*)?\)|scale\(\s*1(\.0*)?\s*\)|"
+    r"matrix\(\s*1(\.0*)?[, ]+0+(\.0*)?[, ]+0+(\.0*)?[, ]+1(\.0*)?[, ]+0+(\.0*)?[, ]+0+(\.0*)?\s*\))\s*$"
+)
+_TRANSLATE = re.compile(r"^\s*translate\(\s*(-?[\d.eE+-]+)\s*(?:[, ]\s*(-?[\d.eE+-]+)\s*)?\)\s*$")
+
+# Sign outline measurement: shapes that are not drawn, or are not the sign blank
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_PATH_TOKEN = re.compile(r"[MmZzLlHhVvCcSsQqTtAa]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+_PATH_ARGS = {"m": 2, "l": 2, "h": 1, "v": 1, "c": 6, "s": 4, "q": 4, "t": 2, "a": 7, "z": 0}
+_OUTLINE_SKIP_TAGS = {f"{{{SVG_NS}}}{tag}" for tag in (
+    "defs", "clipPath", "mask", "symbol", "pattern", "marker", "metadata", "image", "text",
+)}
+OUTLINE_CANVAS_TOLERANCE = 1.0  # user units a shape may extend past the canvas and still count
+
+
+def compiled_paths(source_path: Path) -> tuple[Path, Path]:
+    """(compiled SVG, sidecar JSON) locations for a source template."""
+    source_path = Path(source_path)
+    out_dir = source_path.parent / COMPILED_DIRNAME
+    return out_dir / source_path.name, out_dir / f"{source_path.stem}.json"
+
+
+_SIDECARS: dict[str, tuple[int, dict]] = {}
+_SIDECARS_LOCK = threading.Lock()
+
+
+def _read_sidecar(sidecar_path: Path) -> Optional[dict]:
+    """Parsed sidecar, memoized by mtime (None if missing or unreadable)."""
+    try:
+        mtime = sidecar_path.stat().st_mtime_ns
+    except OSError:
+        return None
+    key = str(sidecar_path)
+    with _SIDECARS_LOCK:
+        cached = _SIDECARS.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    try:
+        sidecar = json.loads(sidecar_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    with _SIDECARS_LOCK:
+        _SIDECARS[key] = (mtime, sidecar)
+    return sidecar
+
+
+def compiled_template_path(source_path: Path) -> Optional[Path]:
+    """The compiled form of a template if it exists and was built from the current source."""
+    svg_path, sidecar_path = compiled_paths(source_path)
+    sidecar = _read_sidecar(sidecar_path)
+    if (not sidecar or not svg_path.exists()
+            or sidecar.get("compiler_version") != COMPILER_VERSION
+            or sidecar.get("source_sha256") != file_digest(source_path)):
+        return None
+    return svg_path
+
+
+def _is_editor_name(name: str) -> bool:
+    return name.startswith((f"{{{INKSCAPE_NS}}}", f"{{{SODIPODI_NS}}}"))
+
+
+def _strip_editor_data(root: etree._Element) -> None:
+    """Drop editor-only elements, attributes and comments; keep a minimal namedview."""
+    for element in list(root.iter()):
+        if element is not root and element.getparent() is None:
+            continue  # Inside a subtree removed earlier in this loop
+        if not isinstance(element.tag, str):
+            # Comments and processing instructions
+            if element.getparent() is not None:
+                element.getparent().remove(element)
+            continue
+        if element.tag == f"{{{SODIPODI_NS}}}namedview":
+            for attr in list(element.attrib):
+                if attr not in KEEP_NAMEDVIEW_ATTRS:
+                    del element.attrib[attr]
+            for child in list(element):
+                element.remove(child)
+            continue
+        if element.tag == f"{{{SVG_NS}}}metadata" or (_is_editor_name(element.tag) and element is not root):
+            element.getparent().remove(element)
+            continue
+        for attr in list(element.attrib):
+            if _is_editor_name(attr) and attr not in KEEP_EDITOR_ATTRS:
+                del element.attrib[attr]
+
+
+def _referenced_ids(root: etree._Element, skip: Optional[etree._Element] = None) -> set[str]:
+    """Ids referenced via url(#id) or href="#id" anywhere outside `skip`."""
+    refs = set()
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        if skip is not None and (element is skip or skip in element.iterancestors()):
+            continue
+        for name, value in element.attrib.items():
+            if name in (f"{{{XLINK_NS}}}href", "href") and value.startswith("#"):
+                refs.add(value[1:])
+            else:
+                refs.update(_ID_REF.findall(value))
+    return refs
+
+
+def _drop_unused_defs(root: etree._Element) -> int:
+    """Remove defs children nothing refers to (repeated: gradients can chain). Returns count."""
+    removed = 0
+    for defs in root.iter(f"{{{SVG_NS}}}defs"):
+        while True:
+            used = _referenced_ids(root, skip=defs)
+            # References from other defs children keep their targets alive
+            for child in defs:
+                used |= _referenced_ids(child)
+            unused = [child for child in defs if isinstance(child.tag, str) and child.get("id") not in used]
+            if not unused:
+                break
+            for child in unused:
+                defs.remove(child)
+            removed += len(unused)
+    return removed
+
+
+def _flatten_transforms(root: etree._Element) -> None:
+    """Remove identity transforms and merge a translate-only group into its only child group."""
+    for element in root.iter():
+        if isinstance(element.tag, str) and _IDENTITY_TRANSFORMS.match(element.get("transform", "x")):
+            del element.attrib["transform"]
+
+    group_tag = f"{{{SVG_NS}}}g"
+    changed = True
+    while changed:
+        changed = False
+        for group in root.iter(group_tag):
+            children = [c for c in group if isinstance(c.tag, str)]
+            # Safe only when the parent group carries nothing but an id and a translate
+            if len(children) != 1 or children[0].tag != group_tag or set(group.attrib) - {"id", "transform"}:
+                continue
+            child = children[0]
+            outer = _TRANSLATE.match(group.get("transform", "translate(0)"))
+            inner = _TRANSLATE.match(child.get("transform", "translate(0)"))
+            if not outer or not inner:
+                continue
+            dx = float(outer.group(1)) + float(inner.group(1))
+            dy = float(outer.group(2) or 0) + float(inner.group(2) or 0)
+            child.set("transform", f"translate({dx:g},{dy:g})")
+            group.addprevious(child)
+            group.getparent().remove(group)
+            changed = True
+            break
+
+
+Matrix = tuple[float, float, float, float, float, float]
+_IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def _multiply(a: Matrix, b: Matrix) -> Matrix:
+    return (a[0] * b[0] + a[2] * b[1], a[1] * b[0] + a[3] * b[1],
+            a[0] * b[2] + a[2] * b[3], a[1] * b[2] + a[3] * b[3],
+            a[0] * b[4] + a[2] * b[5] + a[4], a[1] * b[4] + a[3] * b[5] + a[5])
+
+
+def _parse_transform(value: Optional[str]) -> Matrix:
+    """An SVG transform attribute as an affine matrix (a, b, c, d, e, f)."""
+    matrix = _IDENTITY
+    for name, args in _TRANSFORM.findall(value or ""):
+        v = [float(x) for x in _NUMBER.findall(args)]
+        if name == "matrix":
+            step = tuple(v[:6])
+        elif name == "translate":
+            step = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == "scale":
+            step = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == "rotate":
+            angle = math.radians(v[0])
+            step = (math.cos(angle), math.sin(angle), -math.sin(angle), math.cos(angle), 0.0, 0.0)
+            if len(v) == 3:
+                step = _multiply(_multiply((1.0, 0.0, 0.0, 1.0, v[1], v[2]), step), (1.0, 0.0, 0.0, 1.0, -v[1], -v[2]))
+        elif name == "skewX":
+            step = (1.0, 0.0, math.tan(math.radians(v[0])), 1.0, 0.0, 0.0)
+        else:
+            step = (1.0, math.tan(math.radians(v[0])), 0.0, 1.0, 0.0, 0.0)
+        matrix = _multiply(matrix, step)
+    return matrix
+
+
+def _path_points(d: str) -> list[tuple[float, float]]:
+    """End and control points of a path; their bounding box contains the path (arcs: end points only)."""
+    tokens = _PATH_TOKEN.findall(d or "")
+    points = []
+    x = y = start_x = start_y = 0.0
+    command = None
+    i = 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in "Zz":
+                x, y = start_x, start_y
+                continue
+        if command is None:
+            break
+        kind = command.lower()
+        count = _PATH_ARGS[kind]
+        args = [float(t) for t in tokens[i:i + count]]
+        if len(args) < count:
+            break
+        i += count
+        relative = command.islower()
+        origin_x, origin_y = (x, y) if relative else (0.0, 0.0)
+        if kind == "h":
+            x = origin_x + args[0]
+        elif kind == "v":
+            y = origin_y + args[0]
+        elif kind == "a":
+            x, y = origin_x + args[5], origin_y + args[6]
+        else:
+            for j in range(0, count - 2, 2):
+                points.append((origin_x + args[j], origin_y + args[j + 1]))
+            x, y = origin_x + args[-2], origin_y + args[-1]
+        points.append((x, y))
+        if kind == "m":
+            # Further coordinate pairs after a moveto are linetos
+            start_x, start_y = x, y
+            command = "l" if relative else "L"
+    return points
+
+
+def _shape_points(element: etree._Element) -> list[tuple[float, float]]:
+    """Points whose bounding box is the shape's (untransformed) geometry, for rect/circle/ellipse/path."""
+    tag = etree.QName(element).localname
+
+    def number(name: str) -> float:
+        match = _NUMBER.match(element.get(name, ""))
+        return float(match.group()) if match else 0.0
+
+    if tag == "rect":
+        x, y = number("x"), number("y")
+        return [(x, y), (x + number("width"), y + number("height"))]
+    if tag in ("circle", "ellipse"):
+        rx, ry = (number("r"), number("r")) if tag == "circle" else (number("rx"), number("ry"))
+        return [(number("cx") - rx, number("cy") - ry), (number("cx") + rx, number("cy") + ry)]
+    if tag == "path":
+        return _path_points(element.get("d", ""))
+    return []
+
+
+def measure_sign_outline(root: etree._Element) -> Optional[dict]:
+    """
+    The sign blank's outline in mm: the largest visible rect, circle, ellipse
+    or path that lies on the canvas (off-canvas shapes are editor scraps).
+    Returns {"x", "y", "width", "height", "circular"}, or None if nothing qualifies.
+    """
+    view_box = [float(v) for v in _NUMBER.findall(root.get("viewBox", ""))]
+    if len(view_box) != 4:
+        return None
+    vx, vy, vw, vh = view_box
+    width = _NUMBER.match(root.get("width", ""))
+    mm_per_unit = float(width.group()) / vw if width and root.get("width", "").endswith("mm") else 1.0
+    tolerance = OUTLINE_CANVAS_TOLERANCE
+
+    best = None
+    stack = [(root, _IDENTITY)]
+    while stack:
+        parent, matrix = stack.pop()
+        for element in parent:
+            if not isinstance(element.tag, str) or element.tag in _OUTLINE_SKIP_TAGS:
+                continue
+            if "display:none" in element.get("style", "").replace(" ", "") or element.get("display") == "none":
+                continue
+            m = _multiply(matrix, _parse_transform(element.get("transform")))
+            stack.append((element, m))
+            points = [(m[0] * px + m[2] * py + m[4], m[1] * px + m[3] * py + m[5])
+                      for px, py in _shape_points(element)]
+            if not points:
+                continue
+            x0, y0 = min(p[0] for p in points), min(p[1] for p in points)
+            x1, y1 = max(p[0] for p in points), max(p[1] for p in points)
+            on_canvas = (x0 >= vx - tolerance and y0 >= vy - tolerance
+                         and x1 <= vx + vw + tolerance and y1 <= vy + vh + tolerance)
+            area = (x1 - x0) * (y1 - y0)
+            if on_canvas and area > 0 and (best is None or area > best[0]):
+                best = (area, x0, y0, x1, y1, etree.QName(element).localname in ("circle", "ellipse"))
+    if best is None:
+        return None
+    _, x0, y0, x1, y1, circular = best
+    return {
+        "x": round((x0 - vx) * mm_per_unit, 3),
+        "y": round((y0 - vy) * mm_per_unit, 3),
+        "width": round((x1 - x0) * mm_per_unit, 3),
+        "height": round((y1 - y0) * mm_per_unit, 3),
+        "circular": circular,
+    }
+
+
+_OUTLINES: dict[str, tuple[int, Optional[dict]]] = {}
+
+
+def template_sign_outline(source_path: Path) -> Optional[tuple[float, float, float, float]]:
+    """
+    A template's sign outline as (x0, y0, x1, y1) in mm: from its sidecar when
+    the compiled form is current, else measured from the source (memoized by mtime).
+    """
+    source_path = Path(source_path)
+    outline = None
+    if compiled_template_path(source_path) is not None:
+        outline = (_read_sidecar(compiled_paths(source_path)[1]) or {}).get("sign_outline")
+    else:
+        key = str(source_path.resolve())
+        mtime = source_path.stat().st_mtime_ns
+        with _SIDECARS_LOCK:
+            cached = _OUTLINES.get(key)
+        if cached and cached[0] == mtime:
+            outline = cached[1]
+        else:
+            outline = measure_sign_outline(etree.parse(str(source_path)).getroot())
+            with _SIDECARS_LOCK:
+                _OUTLINES[key] = (mtime, outline)
+    if not outline:
+        return None
+    x, y = outline["x"], outline["y"]
+    return (x, y, round(x + outline["width"], 3), round(y + outline["height"], 3))
+
+
+def _parse_template_name(source_path: Path) -> tuple[str, str, str, str]:
+    """(color, size, orientation, template_type) from {color}_{size}[_portrait]_{type}.svg."""
+    stem = Path(source_path).stem
+    for template_type in TEMPLATE_TYPES:
+        if stem.endswith(f"_{template_type}"):
+            stem = stem[: -len(template_type) - 1]
+            break
+    else:
+        template_type = ""
+    color, _, size = stem.partition("_")
+    orientation = "landscape"
+    if size.endswith("_portrait"):
+        size, orientation = size[: -len("_portrait")], "portrait"
+    return color, size, orientation, template_type
+
+
+def compile_template(source_path: Path) -> tuple[etree._Element, dict]:
+    """Build the render form of one template. Returns (root, sidecar)."""
+    source_path = Path(source_path)
+    root = etree.parse(str(source_path), etree.XMLParser(remove_comments=True)).getroot()
+    _strip_editor_data(root)
+    dropped_defs = _drop_unused_defs(root)
+    _flatten_transforms(root)
+    # Drop namespace declarations that are no longer used
+    etree.cleanup_namespaces(root)
+
+    color, size, orientation, template_type = _parse_template_name(source_path)
+
+    sidecar = {
+        "source": source_path.name,
+        "source_sha256": file_digest(source_path),
+        "compiler_version": COMPILER_VERSION,
+        "color": color,
+        "size": size,
+        "orientation": orientation,
+        "template_type": template_type,
+        "canvas": {"width": root.get("width"), "height": root.get("height"), "viewBox": root.get("viewBox")},
+        "sign_outline": measure_sign_outline(root),
+        "dropped_defs": dropped_defs,
+    }
+    return root, sidecar
+
+
+def _verify(source_path: Path, compiled_path: Path, renderer: str, dpi: int) -> tuple[float, float]:
+    """Render source and compiled form and return compare_images() of the two."""
+    from rasterizers import compare_images, get_rasterizer
+
+    backend = get_rasterizer(renderer)
+    images = []
+    for path in (source_path, compiled_path):
+        root = etree.parse(str(path)).getroot()
+        width_mm = float(root.get("width", "100mm").replace("mm", ""))
+        height_mm = float(root.get("height", "100mm").replace("mm", ""))
+        size_px = int(width_mm / 25.4 * dpi), int(height_mm / 25.4 * dpi)
+        area = "drawing" if "peel_and_stick" in path.name else "page"
+        images.append(backend.render(root, size_px[0], size_px[1], dpi, area))
+    backend.close()
+    return compare_images(images[0], images[1])
+
+
+def compile_all(templates_dir: Path, verify: bool = False, renderer: str = "inkscape", dpi: int = 72) -> int:
+    """Compile every template in templates_dir. Returns the number of failures."""
+    from rasterizers import write_atomic
+
+    failures = 0
+    total_in = total_out = 0
+    for source_path in sorted(Path(templates_dir).glob("*.svg")):
+        svg_path, sidecar_path = compiled_paths(source_path)
+        try:
+            root, sidecar = compile_template(source_path)
+        except etree.XMLSyntaxError as e:
+            logging.error("Could not parse %s: %s", source_path.name, e)
+            failures += 1
+            continue
+
+        svg_bytes = etree.tostring(root, encoding="utf-8", xml_declaration=True)
+        svg_path.parent.mkdir(exist_ok=True)
+        write_atomic(svg_path, svg_bytes)
+        source_size = source_path.stat().st_size
+        sidecar["bytes"] = {"source": source_size, "compiled": len(svg_bytes)}
+        total_in += source_size
+        total_out += len(svg_bytes)
+
+        if verify:
+            mean_diff, bad_fraction = _verify(source_path, svg_path, renderer, dpi)
+            sidecar["verified"] = {"renderer": renderer, "dpi": dpi, "mean_diff": round(mean_diff, 3),
+                                   "bad_pixels": round(bad_fraction, 5)}
+            if mean_diff > 0.5 or bad_fraction > 0.001:
+                logging.error("%s renders differently once compiled (mean diff %.2f, bad pixels %.2f%%) "
+                              "- not using the compiled form", source_path.name, mean_diff, bad_fraction * 100)
+                svg_path.unlink(missing_ok=True)
+                failures += 1
+                continue
+        write_atomic(sidecar_path, json.dumps(sidecar, indent=2).encode("utf-8"))
+        logging.info("Compiled %s (%d -> %d bytes)", source_path.name, source_size, len(svg_bytes))
+
+    if total_in:
+        logging.info("Compiled templates: %d -> %d bytes (%.0f%% smaller)",
+                     total_in, total_out, 100 * (1 - total_out / total_in))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile SVG templates into a minimal render form")
+    parser.add_argument("--templates", type=Path, default=Path("assets"), help="Templates directory")
+    parser.add_argument("--verify", action="store_true",
+                        help="Render source and compiled form and reject templates that differ")
+    parser.add_argument("--renderer", default="inkscape", help="Renderer for --verify (default: inkscape)")
+    parser.add_argument("--dpi", type=int, default=72, help="DPI for --verify renders (default: 72)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    failures = compile_all(args.templates, args.verify, args.renderer, args.dpi)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ from pathlib import Path
 import boto3
 from PIL import Image
 
+from image_derivatives import find_derivative
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(message)s",
@@ -67,12 +69,15 @@ def process_image(args_tuple):
     png_path, s3_client, bucket_name, public_url = args_tuple
     
     try:
-        # Convert to JPEG
-        jpg_path = png_path.with_suffix(".jpg")
-        convert_png_to_jpeg(png_path, jpg_path)
+        # Use the JPEG derived at render time when it is current, else convert
+        jpg_path = find_derivative(png_path, "marketplace_jpeg")
+        converted = jpg_path is None
+        if converted:
+            jpg_path = png_path.with_suffix(".jpg")
+            convert_png_to_jpeg(png_path, jpg_path)
         
         # Upload to R2
-        key = jpg_path.name
+        key = png_path.with_suffix(".jpg").name
         s3_client.upload_file(
             str(jpg_path),
             bucket_name,
@@ -81,7 +86,8 @@ def process_image(args_tuple):
         )
         
         # Clean up local JPEG
-        jpg_path.unlink(missing_ok=True)
+        if converted:
+            jpg_path.unlink(missing_ok=True)
         
         url = f"{public_url}/{key}"
         logging.info("Uploaded: %s", key)
@@ -20,12 +20,25 @@ from typing import Optional
 # Number of parallel workers for image uploads
 MAX_UPLOAD_WORKERS = 8
 
+# Content generation: concurrent Claude calls, kept under the account's rate limits
+MAX_CONTENT_WORKERS = 4
+CONTENT_REQUESTS_PER_MINUTE = 50
+CONTENT_TOKENS_PER_MINUTE = 80000  # input + output tokens
+CONTENT_MAX_TOKENS = 1500
+CONTENT_MODEL = "claude-sonnet-4-20250514"
+
 import anthropic
 import boto3
 from botocore.config import Config
 import openpyxl
 from openpyxl.utils import get_column_letter
 
+from image_derivatives import find_derivative
+from llm_cache import ResponseCache, cache_key
+from rate_limit import RETRY_ERRORS, RateLimiter, call_with_retry
+from render_cache import file_digest
+from run_manifest import RunManifest, inputs_digest
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -190,12 +203,58 @@ class ProductData:
         return SIZE_MAP_VALUES.get(self.size.lower(), "M")
 
 
+def _request_content(
+    product: ProductData,
+    prompt: str,
+    api_key: str,
+    client: Optional[anthropic.Anthropic],
+    limiter: Optional[RateLimiter],
+) -> dict:
+    """Send the content prompt to Claude and return the JSON parsed from the response."""
+    if client is None:
+        # Retries are done here (call_with_retry), not by the SDK
+        client = anthropic.Anthropic(api_key=api_key, max_retries=0)
+
+    # Rough token count (4 characters per token) plus the output allowance
+    estimate = len(prompt) // 4 + CONTENT_MAX_TOKENS
+
+    def send():
+        if limiter is not None:
+            limiter.acquire(tokens=estimate)
+        return client.messages.create(
+            model=CONTENT_MODEL,
+            max_tokens=CONTENT_MAX_TOKENS,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+
+    message = call_with_retry(send, f"Claude content for {product.m_number}",
+                              errors=RETRY_ERRORS + (anthropic.APIConnectionError,))
+    usage = getattr(message, "usage", None)
+    if limiter is not None and usage is not None:
+        limiter.consume(usage.input_tokens + usage.output_tokens - estimate)
+    
+    # Parse the response
+    response_text = message.content[0].text
+    
+    # Extract JSON from response (handle markdown code blocks)
+    json_match = re.search(r'\{[\s\S]*\}', response_text)
+    if not json_match:
+        raise ValueError(f"Could not parse JSON from Claude response: {response_text[:200]}")
+    
+    return json.loads(json_match.group())
+
+
 def generate_content_with_claude(
     product: ProductData,
     api_key: str,
     brand_name: str = "NorthByNorthEast",
     theme: str = "",
     use_cases: str = "",
+    client: Optional[anthropic.Anthropic] = None,
+    limiter: Optional[RateLimiter] = None,
+    cache: Optional[ResponseCache] = None,
 ) -> AmazonContent:
     """
     Generate Amazon SEO-optimized content using Claude API.
@@ -206,12 +265,12 @@ def generate_content_with_claude(
         brand_name: Brand name for listings
         theme: Human-provided signage theme/description
         use_cases: Target use cases for the signage
+        client: Shared Anthropic client (one is created on a cache miss if not given)
+        limiter: Shared rate limiter, for concurrent callers
         
     Returns:
         AmazonContent with title, description, bullets, and search terms
     """
-    client = anthropic.Anthropic(api_key=api_key)
-    
     # Use human-provided theme if available, otherwise extract from product data
     if theme:
         sign_text = theme
@@ -266,30 +325,74 @@ Respond in JSON format:
     "search_terms": "..."
 }}"""
 
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1500,
-        messages=[
-            {"role": "user", "content": prompt}
-        ]
-    )
-    
-    # Parse the response
-    response_text = message.content[0].text
-    
-    # Extract JSON from response (handle markdown code blocks)
-    json_match = re.search(r'\{[\s\S]*\}', response_text)
-    if not json_match:
-        raise ValueError(f"Could not parse JSON from Claude response: {response_text[:200]}")
-    
-    data = json.loads(json_match.group())
-    
-    return AmazonContent(
+    if cache is None:
+        cache = ResponseCache()
+    content_key = cache_key(CONTENT_MODEL, prompt, max_tokens=CONTENT_MAX_TOKENS)
+    data = cache.get(content_key)
+    cached = data is not None
+    if not cached:
+        data = _request_content(product, prompt, api_key, client, limiter)
+    
+    content = AmazonContent(
         title=data["title"][:200],  # Enforce max length
         description=data["description"],
         bullet_points=data["bullet_points"][:5],  # Max 5 bullets
         search_terms=data["search_terms"][:250],  # Enforce max length
     )
+    # Only once it is known to be usable
+    if not cached:
+        cache.put(content_key, CONTENT_MODEL, data)
+    return content
+
+
+def generate_all_content(
+    products: list[ProductData],
+    api_key: str,
+    brand_name: str = "NorthByNorthEast",
+    theme: str = "",
+    use_cases: str = "",
+    workers: int = MAX_CONTENT_WORKERS,
+    requests_per_minute: float = CONTENT_REQUESTS_PER_MINUTE,
+    tokens_per_minute: Optional[float] = CONTENT_TOKENS_PER_MINUTE,
+    on_result=None,
+    refresh: bool = False,
+) -> list[tuple[ProductData, Optional[AmazonContent], Optional[Exception]]]:
+    """
+    Generate content for every product from a bounded thread pool sharing one
+    client and one RateLimiter; throttled calls are retried with backoff.
+    A failure only affects its own product. Responses already in the
+    llm_cache are reused unless refresh is set.
+
+    on_result(done, product, content, error) is called in this thread as each
+    product finishes. Returns (product, content, error) per product, in the
+    order of products; content is None where error is set.
+    """
+    if not products:
+        return []
+    client = anthropic.Anthropic(api_key=api_key, max_retries=0)
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    cache = ResponseCache(refresh=refresh)
+    results: list = [None] * len(products)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(products)))) as executor:
+        futures = {
+            executor.submit(generate_content_with_claude, product, api_key, brand_name, theme, use_cases,
+                            client=client, limiter=limiter, cache=cache): i
+            for i, product in enumerate(products)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                content, error = future.result(), None
+            except Exception as e:
+                content, error = None, e
+            results[i] = (products[i], content, error)
+            if on_result is not None:
+                on_result(done, products[i], content, error)
+    if cache.hits:
+        logging.info("Content for %d of %d products came from the LLM cache", cache.hits, len(products))
+    if limiter.waited:
+        logging.info("Content generation waited %.1fs for the rate limit", limiter.waited)
+    return results
 
 
 def convert_png_to_jpeg_local(png_path: Path, background_color=(255, 255, 255)) -> Path:
@@ -380,8 +483,12 @@ def upload_to_cloudflare_r2(
     # Also upload JPEG version if requested and source is PNG
     if also_upload_jpeg and image_path.suffix.lower() == ".png":
         try:
-            jpeg_path = convert_png_to_jpeg_local(image_path)
-            jpeg_key = jpeg_path.name
+            # Prefer the JPEG generate_images_v2 derived at render time
+            jpeg_path = find_derivative(image_path, "marketplace_jpeg")
+            converted = jpeg_path is None
+            if converted:
+                jpeg_path = convert_png_to_jpeg_local(image_path)
+            jpeg_key = image_path.with_suffix(".jpg").name
             s3_client.upload_file(
                 str(jpeg_path),
                 bucket_name,
@@ -389,8 +496,9 @@ def upload_to_cloudflare_r2(
                 ExtraArgs={"ContentType": "image/jpeg"},
             )
             logging.info("Also uploaded JPEG: %s", jpeg_key)
-            # Clean up temp JPEG
-            jpeg_path.unlink(missing_ok=True)
+            if converted:
+                # Clean up temp JPEG
+                jpeg_path.unlink(missing_ok=True)
         except Exception as e:
             logging.warning("Failed to create JPEG version: %s", e)
     
@@ -770,6 +878,17 @@ def main():
     parser.add_argument("--theme-file", type=Path, default=None, help="File containing theme text (alternative to --theme)")
     parser.add_argument("--use-cases-file", type=Path, default=None, help="File containing use cases text (alternative to --use-cases)")
     parser.add_argument("--m-number", type=str, default=None, help="Process only a specific M number (e.g., M1220)")
+    parser.add_argument("--content-workers", type=int, default=MAX_CONTENT_WORKERS,
+                        help=f"Concurrent Claude requests (default: {MAX_CONTENT_WORKERS})")
+    parser.add_argument("--requests-per-minute", type=float, default=CONTENT_REQUESTS_PER_MINUTE,
+                        help=f"Claude request rate limit (default: {CONTENT_REQUESTS_PER_MINUTE})")
+    parser.add_argument("--tokens-per-minute", type=float, default=CONTENT_TOKENS_PER_MINUTE,
+                        help=f"Claude token rate limit, input + output (default: {CONTENT_TOKENS_PER_MINUTE})")
+    parser.add_argument("--refresh-content", action="store_true",
+                        help="Ignore content cached in llm_cache.db and call Claude again")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reuse URLs of images a previous run uploaded (exports/.run_manifests/upload.jsonl) "
+                             "that are unchanged; upload only new, changed or failed ones")
     args = parser.parse_args()
     
     # Read theme/use-cases from files if specified
@@ -798,16 +917,24 @@ def main():
             return 1
         logging.info("Filtered to M number: %s", args.m_number)
     
-    # Generate content for each product
+    # Generate content for all products concurrently (results come back in CSV order)
+    logging.info("Generating content for %d products using %d parallel workers...",
+                 len(products), args.content_workers)
     contents = {}
-    for product in products:
-        logging.info("Generating content for %s...", product.m_number)
-        try:
-            content = generate_content_with_claude(product, api_key, args.brand, args.theme, args.use_cases)
-            contents[product.m_number] = content
-            logging.info("  Title: %s", content.title[:80] + "..." if len(content.title) > 80 else content.title)
-        except Exception as e:
-            logging.error("Failed to generate content for %s: %s", product.m_number, e)
+    results = generate_all_content(
+        products, api_key, args.brand, args.theme, args.use_cases,
+        workers=args.content_workers,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        refresh=args.refresh_content,
+    )
+    for product, content, error in results:
+        if error is not None:
+            logging.error("Failed to generate content for %s: %s", product.m_number, error)
+            continue
+        contents[product.m_number] = content
+        logging.info("%s title: %s", product.m_number,
+                     content.title[:80] + "..." if len(content.title) > 80 else content.title)
     
     # Upload images if requested
     if args.upload_images:
@@ -836,10 +963,29 @@ def main():
             else:
                 logging.warning("M folder not found: %s", m_folder)
         
+        # Checkpoint each upload so an interrupted run can --resume
+        manifest = RunManifest(args.exports, "upload")
+        upload_results = {}  # {m_number: {idx: url}}
+        task_inputs = {}
+        pending_tasks = []
+        for task in all_upload_tasks:
+            m_number, idx, img_file = task
+            inputs = inputs_digest(image=file_digest(img_file), bucket=r2_bucket, public_url=r2_public_url, jpeg=True)
+            task_inputs[task] = inputs
+            entry = manifest.completed(f"{m_number}/{img_file.name}", inputs) if args.resume else None
+            if entry is not None:
+                upload_results.setdefault(m_number, {})[idx] = entry["result"]
+            else:
+                pending_tasks.append(task)
+        if args.resume:
+            logging.info("Resume: %d images already uploaded, %d to upload",
+                         len(all_upload_tasks) - len(pending_tasks), len(pending_tasks))
+        all_upload_tasks = pending_tasks
+        
         # Upload all images in parallel
         logging.info("Uploading %d images using %d parallel workers...", len(all_upload_tasks), MAX_UPLOAD_WORKERS)
-        upload_results = {}  # {m_number: {idx: url}}
         completed = 0
+        failed_uploads = 0
         
         def upload_task(task):
             m_number, idx, img_file = task
@@ -853,7 +999,16 @@ def main():
         with ThreadPoolExecutor(max_workers=MAX_UPLOAD_WORKERS) as executor:
             futures = {executor.submit(upload_task, task): task for task in all_upload_tasks}
             for future in as_completed(futures):
-                m_number, idx, url = future.result()
+                task = futures[future]
+                m_number, idx, img_file = task
+                try:
+                    _, _, url = future.result()
+                except Exception as e:
+                    logging.error("Failed to upload %s: %s", img_file.name, e)
+                    manifest.record(f"{m_number}/{img_file.name}", task_inputs[task], False, error=str(e))
+                    failed_uploads += 1
+                    continue
+                manifest.record(f"{m_number}/{img_file.name}", task_inputs[task], True, result=url)
                 if m_number not in upload_results:
                     upload_results[m_number] = {}
                 upload_results[m_number][idx] = url
@@ -861,6 +1016,10 @@ def main():
                 if completed % 10 == 0 or completed == len(all_upload_tasks):
                     logging.info("Upload progress: %d/%d images", completed, len(all_upload_tasks))
         
+        if failed_uploads:
+            logging.error("%d image uploads failed; rerun with --resume to retry only those", failed_uploads)
+            return 1
+        
         # Assign URLs back to products in correct order
         for product in products:
             if product.m_number in upload_results:
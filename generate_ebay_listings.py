@@ -24,12 +24,16 @@ import requests
 
 from ebay_auth import get_ebay_auth_from_env, EbayAuth
 from ebay_setup_policies import load_policy_ids
+from llm_cache import ResponseCache, cache_key
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(message)s",
 )
 
+CONTENT_MODEL = "claude-sonnet-4-20250514"
+CONTENT_MAX_TOKENS = 1500
+
 # Product size dimensions in cm (length x width)
 SIZE_DIMENSIONS_CM = {
     "saville": (11.5, 9.5),
@@ -138,12 +142,12 @@ def generate_content_with_claude(
     product: ProductData,
     api_key: str,
     brand_name: str = "NorthByNorthEast",
+    cache: Optional[ResponseCache] = None,
 ) -> EbayContent:
     """
-    Generate eBay-optimized content using Claude API.
+    Generate eBay-optimized content using Claude API. Responses are reused
+    from cache (the default llm_cache.db if not given).
     """
-    client = anthropic.Anthropic(api_key=api_key)
-    
     sign_text = " ".join([t for t in product.text_lines if t])
     length_cm, width_cm = product.size_cm
     mounting = product.mounting_info
@@ -192,18 +196,25 @@ Respond in JSON format:
     }}
 }}"""
 
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1500,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    
-    response_text = message.content[0].text
-    json_match = re.search(r'\{[\s\S]*\}', response_text)
-    if not json_match:
-        raise ValueError(f"Could not parse JSON from Claude response: {response_text[:200]}")
-    
-    data = json.loads(json_match.group())
+    if cache is None:
+        cache = ResponseCache()
+    content_key = cache_key(CONTENT_MODEL, prompt, max_tokens=CONTENT_MAX_TOKENS)
+    data = cache.get(content_key)
+    cached = data is not None
+    if not cached:
+        client = anthropic.Anthropic(api_key=api_key)
+        message = client.messages.create(
+            model=CONTENT_MODEL,
+            max_tokens=CONTENT_MAX_TOKENS,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        
+        response_text = message.content[0].text
+        json_match = re.search(r'\{[\s\S]*\}', response_text)
+        if not json_match:
+            raise ValueError(f"Could not parse JSON from Claude response: {response_text[:200]}")
+        
+        data = json.loads(json_match.group())
     
     # Convert aspects to eBay format (values must be arrays)
     aspects = {}
@@ -213,11 +224,14 @@ Respond in JSON format:
         else:
             aspects[key] = [str(value)]
     
-    return EbayContent(
+    content = EbayContent(
         title=data["title"][:80],
         description=data["description"],
         aspects=aspects,
     )
+    if not cached:
+        cache.put(content_key, CONTENT_MODEL, data)
+    return content
 
 
 def read_products_from_csv(csv_path: Path, qa_filter: str = "approved") -> list[ProductData]:
@@ -776,7 +790,9 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Generate content without creating listings")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of products to process")
     parser.add_argument("--variations", action="store_true", help="Create multi-variation listings (group by product type)")
+    parser.add_argument("--refresh-content", action="store_true", help="Ignore content cached in llm_cache.db and call Claude again")
     args = parser.parse_args()
+    content_cache = ResponseCache(refresh=args.refresh_content)
     
     # Get API keys
     anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
@@ -830,10 +846,12 @@ def main():
                         product.size,
                         args.exports,
                     )
-                    content = generate_content_with_claude(product, anthropic_key, args.brand)
+                    hits = content_cache.hits
+                    content = generate_content_with_claude(product, anthropic_key, args.brand, cache=content_cache)
                     contents.append(content)
                     logging.info("  - %s: %s (%s)", product.m_number, product.size, product.color)
-                    time.sleep(0.5)  # Rate limit Claude API
+                    if content_cache.hits == hits:
+                        time.sleep(0.5)  # Rate limit Claude API
                 
                 if args.dry_run:
                     logging.info("  [DRY RUN] Would create variation listing with %d SKUs", len(group_products))
@@ -880,7 +898,7 @@ def main():
                 )
                 
                 # Generate content
-                content = generate_content_with_claude(product, anthropic_key, args.brand)
+                content = generate_content_with_claude(product, anthropic_key, args.brand, cache=content_cache)
                 logging.info("  Title: %s", content.title)
                 
                 if args.dry_run:
@@ -918,6 +936,8 @@ def main():
     logging.info("Processed: %d products", len(products))
     logging.info("Success: %d", success_count)
     logging.info("Errors: %d", error_count)
+    if content_cache.hits:
+        logging.info("Content from cache: %d", content_cache.hits)
     
     if ebay_ids:
         logging.info("\nCreated listings:")
@@ -21,6 +21,7 @@ import anthropic
 import requests
 
 from etsy_auth import EtsyAuth
+from llm_cache import ResponseCache, cache_key
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +31,9 @@ logging.basicConfig(
 # Etsy API base URL
 ETSY_API_BASE = "https://openapi.etsy.com/v3/application"
 
+CONTENT_MODEL = "claude-sonnet-4-20250514"
+CONTENT_MAX_TOKENS = 1500
+
 # Product size dimensions in cm (length x width)
 SIZE_DIMENSIONS_CM = {
     "saville": (11.5, 9.5),
@@ -141,6 +145,7 @@ class ProductData:
 def generate_etsy_content_with_claude(
     product: ProductData,
     api_key: str,
+    cache: Optional[ResponseCache] = None,
 ) -> EtsyContent:
     """
     Generate Etsy-optimized content using Claude API.
@@ -148,12 +153,11 @@ def generate_etsy_content_with_claude(
     Args:
         product: Product data
         api_key: Anthropic API key
+        cache: Response cache (the default llm_cache.db if not given)
         
     Returns:
         EtsyContent with title, description, tags, and materials
     """
-    client = anthropic.Anthropic(api_key=api_key)
-    
     sign_text = " ".join([t for t in product.text_lines if t])
     length_cm, width_cm = product.size_cm
     mounting = product.mounting_info
@@ -198,33 +202,43 @@ Respond in JSON format:
     "materials": ["material1", "material2", ...]
 }}"""
 
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1500,
-        messages=[
-            {"role": "user", "content": prompt}
-        ]
-    )
-    
-    response_text = message.content[0].text
-    
-    # Extract JSON from response
-    json_match = re.search(r'\{[\s\S]*\}', response_text)
-    if not json_match:
-        raise ValueError(f"Could not parse JSON from Claude response: {response_text[:200]}")
-    
-    data = json.loads(json_match.group())
+    if cache is None:
+        cache = ResponseCache()
+    content_key = cache_key(CONTENT_MODEL, prompt, max_tokens=CONTENT_MAX_TOKENS)
+    data = cache.get(content_key)
+    cached = data is not None
+    if not cached:
+        client = anthropic.Anthropic(api_key=api_key)
+        message = client.messages.create(
+            model=CONTENT_MODEL,
+            max_tokens=CONTENT_MAX_TOKENS,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        
+        response_text = message.content[0].text
+        
+        # Extract JSON from response
+        json_match = re.search(r'\{[\s\S]*\}', response_text)
+        if not json_match:
+            raise ValueError(f"Could not parse JSON from Claude response: {response_text[:200]}")
+        
+        data = json.loads(json_match.group())
     
     # Enforce Etsy limits
     title = data["title"][:140]
     tags = [tag[:20] for tag in data["tags"][:13]]
     
-    return EtsyContent(
+    content = EtsyContent(
         title=title,
         description=data["description"],
         tags=tags,
         materials=data["materials"][:5],
     )
+    if not cached:
+        cache.put(content_key, CONTENT_MODEL, data)
+    return content
 
 
 def read_products_from_csv(csv_path: Path, qa_filter: str = "approved") -> list[ProductData]:
@@ -530,7 +544,9 @@ def main():
     parser.add_argument("--skip-existing", action="store_true", help="Skip products with existing Etsy listing IDs")
     parser.add_argument("--publish", action="store_true", help="Publish listings (make active) after creation")
     parser.add_argument("--use-r2-urls", action="store_true", help="Use R2 image URLs instead of local files")
+    parser.add_argument("--refresh-content", action="store_true", help="Ignore content cached in llm_cache.db and call Claude again")
     args = parser.parse_args()
+    content_cache = ResponseCache(refresh=args.refresh_content)
     
     # Get API keys
     anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
@@ -591,7 +607,7 @@ def main():
         
         try:
             # Generate content
-            content = generate_etsy_content_with_claude(product, anthropic_key)
+            content = generate_etsy_content_with_claude(product, anthropic_key, cache=content_cache)
             logging.info("  Title: %s", content.title[:60] + "..." if len(content.title) > 60 else content.title)
             
             if args.dry_run:
@@ -655,6 +671,8 @@ def main():
     logging.info("  Total products: %d", len(products))
     logging.info("  Created: %d", created_count)
     logging.info("  Failed: %d", failed_count)
+    if content_cache.hits:
+        logging.info("  Content from cache: %d", content_cache.hits)
     if args.dry_run:
         logging.info("  (Dry run - no listings created)")
     
@@ -6,7 +6,7 @@ Generates product images by:
 1. Loading pre-designed SVG templates (per size/color)
 2. Dynamically positioning icons and text based on layout mode
 3. Exporting via Inkscape CLI
-4. Optionally reviewing with Claude Vision API
+4. Optionally reviewing with Claude or OpenAI vision (ai_review.py)
 
 Layout Modes:
   A - Icon(s) centered, no text
@@ -21,22 +21,38 @@ Colors: silver, gold, white
 """
 
 import argparse
+import atexit
 import base64
+import copy
 import csv
+import functools
 import json
 import logging
 import os
+import re
 import shutil
-import subprocess
 import sys
 import tempfile
-from dataclasses import dataclass, field
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
 from typing import Optional
 import math
 
 from lxml import etree
 
+from rasterizers import RASTERIZERS, Rasterizer, RenderJob, compare_images, encode_png, get_rasterizer, write_atomic
+from compile_templates import compiled_template_path
+from image_derivatives import ensure_derivatives, write_derivatives
+from pipeline_metrics import (
+    collect_spans, log_summary, new_run_id, product_scope, record_spans, span, take_spans, write_spans,
+)
+from render_cache import RENDER_PIPELINE_VERSION, RenderCache, cache_key, file_digest, link_or_copy
+from run_manifest import RunManifest, inputs_digest
+from text_metrics import fit_font_size, metrics_signature
+
 # Namespaces
 SVG_NS = "http://www.w3.org/2000/svg"
 XLINK_NS = "http://www.w3.org/1999/xlink"
@@ -139,6 +155,20 @@ class LayoutResult:
     text_elements: list[dict]  # [{text, x, y, font_size}, ...]
 
 
+@dataclass
+class RenderContext:
+    """Per-product values computed once and shared by every image type."""
+    product: ProductRow
+    bounds: SignBounds
+    icons: list  # [(type, IconData), ...] from _load_icon
+    layout: LayoutResult
+    width_px: int  # main canvas size at `dpi`
+    height_px: int
+    dpi: int = 300
+    max_dimension: int = 10000  # longest side of any export (CHANNEL_MAX_DIMENSION)
+    draft: bool = False  # QA preview tier: no derivatives
+
+
 def _setup_logging(exports_dir: Path) -> None:
     """Configure logging to console and file."""
     exports_dir.mkdir(parents=True, exist_ok=True)
@@ -289,6 +319,27 @@ def _load_layout_bounds(csv_path: Path) -> dict:
 # Global layout bounds loaded from CSV
 LAYOUT_BOUNDS_CSV = Path("assets/layout_modes.csv")
 LAYOUT_BOUNDS = {}
+_LAYOUT_BOUNDS_LOCK = threading.Lock()
+
+
+def _layout_bounds() -> dict:
+    """The layout_modes.csv boxes (see _load_layout_bounds), loaded on first use."""
+    global LAYOUT_BOUNDS
+    bounds = LAYOUT_BOUNDS
+    if not bounds and LAYOUT_BOUNDS_CSV.exists():
+        with _LAYOUT_BOUNDS_LOCK:
+            if not LAYOUT_BOUNDS:
+                LAYOUT_BOUNDS = _load_layout_bounds(LAYOUT_BOUNDS_CSV)
+            bounds = LAYOUT_BOUNDS
+    return bounds
+
+
+def _reload_layout_bounds() -> None:
+    """Re-read layout_modes.csv and swap it in whole, so concurrent layouts never see an empty table."""
+    global LAYOUT_BOUNDS
+    bounds = _load_layout_bounds(LAYOUT_BOUNDS_CSV)
+    with _LAYOUT_BOUNDS_LOCK:
+        LAYOUT_BOUNDS = bounds
 
 
 def _get_sign_bounds(size: str, orientation: str = "landscape") -> SignBounds:
@@ -320,12 +371,17 @@ def _get_sign_bounds(size: str, orientation: str = "landscape") -> SignBounds:
     )
 
 
+# Share of a text box's width that text is fitted to, leaving room for
+# renderer differences in hinting and glyph outlines
+TEXT_FIT_MARGIN = 0.97
+
+
 def _calculate_layout(
     bounds: SignBounds,
     layout_mode: str,
     num_icons: int,
     text_lines: list[str],
-    font_name: str = "Arial",
+    font: str = "arial_bold",
     icon_scale: float = 1.0,
     text_scale: float = 1.0,
     size: str = "",
@@ -334,8 +390,9 @@ def _calculate_layout(
     """
     Calculate positions and sizes for icons and text based on layout mode.
     
-    First checks LAYOUT_BOUNDS (from CSV) for exact coordinates.
+    First checks the layout_modes.csv bounds (_layout_bounds) for exact coordinates.
     Falls back to calculated positions if not found.
+    Text is sized from the glyph metrics of font (a FONTS key), see text_metrics.py.
 
     Layout Modes:
       A - Icon(s) centered, no text
@@ -345,11 +402,8 @@ def _calculate_layout(
       E - Icon(s) bottom, 2+ text lines above
       F - Icon(s) center, 1 text above, 1 text below
     """
-    global LAYOUT_BOUNDS
-    
-    # Load layout bounds from CSV if not already loaded
-    if not LAYOUT_BOUNDS and LAYOUT_BOUNDS_CSV.exists():
-        LAYOUT_BOUNDS = _load_layout_bounds(LAYOUT_BOUNDS_CSV)
+    # One table for the whole layout, even if a concurrent run reloads it meanwhile
+    layout_bounds = _layout_bounds()
     
     # Check if we have CSV-defined bounds for this layout
     icon_key = ("main", size, orientation, layout_mode, "icon")
@@ -361,8 +415,8 @@ def _calculate_layout(
     active_lines = [t for t in text_lines if t]
     
     # If CSV bounds exist for this layout, use them directly
-    if icon_key in LAYOUT_BOUNDS:
-        icon_bounds = LAYOUT_BOUNDS[icon_key]
+    if icon_key in layout_bounds:
+        icon_bounds = layout_bounds[icon_key]
         base_width = icon_bounds["width"]
         base_height = icon_bounds["height"]
         base_x = icon_bounds["x"]
@@ -380,19 +434,14 @@ def _calculate_layout(
         # Add text elements from CSV bounds
         for idx, line in enumerate(active_lines):
             text_key = ("main", size, orientation, layout_mode, f"text_{idx + 1}")
-            if text_key in LAYOUT_BOUNDS:
-                tb = LAYOUT_BOUNDS[text_key]
-                # Simple linear relationship: font_size = box_width / (num_chars * k)
-                # where k is a constant that accounts for SVG rendering
-                # Calibrated: 7 chars in 90mm box should give font ~4mm
-                # So k = 90 / (7 * 4) = 3.2
-                num_chars = len(line) if line else 1
-                font_size = tb["width"] / (num_chars * 3.2)
-                # Also cap by height
-                max_by_height = tb["height"] / 3.0
-                font_size = min(font_size, max_by_height)
-                # Apply text_scale multiplier
-                font_size = font_size * text_scale
+            if text_key in layout_bounds:
+                tb = layout_bounds[text_key]
+                # Largest size that fits the box: the baseline sits 3/4 of the way
+                # down, so capitals get the top 3/4 and descenders the rest
+                max_width = tb["width"] * TEXT_FIT_MARGIN
+                font_size = fit_font_size(line, max_width, tb["height"] * 0.75, font)
+                # Apply text_scale multiplier, but never past the box's width
+                font_size = min(font_size * text_scale, fit_font_size(line, max_width, font=font))
                 text_elements.append({
                     "text": line,
                     "x": tb["x"] + tb["width"] / 2,  # Center of text box
@@ -449,7 +498,7 @@ def _calculate_layout(
 
         if active_lines:
             # Text sized to fit width, with larger max
-            font_size = _fit_text_width(active_lines[0], inner_w * 0.95, max_font_size * 2.0, min_font_size)
+            font_size = _fit_text_width(active_lines[0], inner_w * 0.95, max_font_size * 2.0, min_font_size, font)
             text_y = text_zone_top + font_size * 1.0
             text_elements.append({
                 "text": active_lines[0],
@@ -463,7 +512,7 @@ def _calculate_layout(
         # Icon(s) top, 2+ text lines below
         num_lines = len(active_lines) if active_lines else 1
         # Calculate text sizes first to determine space needed
-        text_sizes = [_fit_text_width(line, inner_w * 0.9, max_font_size, min_font_size) for line in active_lines]
+        text_sizes = [_fit_text_width(line, inner_w * 0.9, max_font_size, min_font_size, font) for line in active_lines]
         avg_font = sum(text_sizes) / len(text_sizes) if text_sizes else max_font_size
         text_block_height = num_lines * avg_font * line_spacing + avg_font
         
@@ -493,7 +542,7 @@ def _calculate_layout(
         icon_y = inner_y + text_height + (inner_h - text_height - icon_height) / 2
 
         if active_lines:
-            font_size = _fit_text_width(active_lines[0], inner_w * 0.9, max_font_size, min_font_size)
+            font_size = _fit_text_width(active_lines[0], inner_w * 0.9, max_font_size, min_font_size, font)
             text_elements.append({
                 "text": active_lines[0],
                 "x": bounds.center_x,
@@ -505,7 +554,7 @@ def _calculate_layout(
     elif layout_mode == "E":
         # Icon(s) bottom, 2+ text lines above
         num_lines = len(active_lines)
-        text_sizes = [_fit_text_width(line, inner_w * 0.9, max_font_size, min_font_size) for line in active_lines]
+        text_sizes = [_fit_text_width(line, inner_w * 0.9, max_font_size, min_font_size, font) for line in active_lines]
         avg_font = sum(text_sizes) / len(text_sizes) if text_sizes else max_font_size
         text_block_height = num_lines * avg_font * line_spacing
         
@@ -535,7 +584,7 @@ def _calculate_layout(
         icon_y = inner_y + text_area_each + (icon_area_height - icon_height) / 2
 
         if len(active_lines) >= 1:
-            font_size = _fit_text_width(active_lines[0], inner_w * 0.85, max_font_size, min_font_size)
+            font_size = _fit_text_width(active_lines[0], inner_w * 0.85, max_font_size, min_font_size, font)
             text_elements.append({
                 "text": active_lines[0],
                 "x": bounds.center_x,
@@ -544,7 +593,7 @@ def _calculate_layout(
                 "anchor": "middle",
             })
         if len(active_lines) >= 2:
-            font_size = _fit_text_width(active_lines[1], inner_w * 0.85, max_font_size, min_font_size)
+            font_size = _fit_text_width(active_lines[1], inner_w * 0.85, max_font_size, min_font_size, font)
             text_elements.append({
                 "text": active_lines[1],
                 "x": bounds.center_x,
@@ -569,31 +618,43 @@ def _calculate_layout(
     )
 
 
-def _fit_text_width(text: str, max_width_mm: float, max_font: float, min_font: float) -> float:
+def _fit_text_width(text: str, max_width_mm: float, max_font: float, min_font: float,
+                    font: str = "arial_bold") -> float:
     """
-    Calculate font size to fit text within max_width.
-    Very conservative calculation - SVG mm font-size renders larger than expected.
+    Calculate the largest font size at which text fits within max_width,
+    measured with the font's advance widths and kerning (text_metrics.py).
     """
     if not text:
         return max_font
 
-    # Very conservative ratio - actual rendering is much wider than theoretical
-    # Using 1.0 as ratio (each char takes full font-size width on average)
-    char_width_ratio = 1.0
-    
-    # Calculate with large safety margin (0.7x)
-    required_font = (max_width_mm / (len(text) * char_width_ratio)) * 0.7
-    
+    required_font = fit_font_size(text, max_width_mm * TEXT_FIT_MARGIN, font=font)
+
     # Clamp to min/max range
     return max(min_font, min(max_font, required_font))
 
 
-def _load_template_svg(templates_dir: Path, color: str, size: str, template_type: str, orientation: str = "landscape") -> etree._Element:
+# Parsed templates, keyed by path and invalidated when the file's mtime changes.
+# Callers get a deep copy, so injected content never leaks into the cache.
+TEMPLATE_CACHE_SIZE = 64
+_TEMPLATE_CACHE: "OrderedDict[str, tuple[int, etree._Element]]" = OrderedDict()
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+
+
+def _resolve_template_path(
+    templates_dir: Path,
+    color: str,
+    size: str,
+    template_type: str,
+    orientation: str = "landscape",
+    compiled: bool = True,
+) -> Path:
     """
-    Load a template SVG file.
+    Find a template file.
     Naming convention: {color}_{size}_{type}.svg for landscape
                        {color}_{size}_portrait_{type}.svg for portrait
     e.g., silver_saville_main.svg or silver_dick_portrait_main.svg
+    With compiled=True the stripped render form from compile_templates.py is
+    returned when it is up to date with the source.
     """
     if orientation == "portrait":
         filename = f"{color}_{size}_portrait_{template_type}.svg"
@@ -613,44 +674,197 @@ def _load_template_svg(templates_dir: Path, color: str, size: str, template_type
                 raise FileNotFoundError(f"Template not found: {template_path}")
         else:
             raise FileNotFoundError(f"Template not found: {template_path}")
+    if compiled:
+        return compiled_template_path(template_path) or template_path
+    return template_path
+
+
+def _parse_template_cached(template_path: Path) -> etree._Element:
+    """Return the cached parse of a template. Shared between callers - do not modify."""
+    key = str(template_path.resolve())
+    mtime = template_path.stat().st_mtime_ns
+    with _TEMPLATE_CACHE_LOCK:
+        cached = _TEMPLATE_CACHE.get(key)
+        if cached and cached[0] == mtime:
+            _TEMPLATE_CACHE.move_to_end(key)
+            return cached[1]
 
     parser = etree.XMLParser(remove_blank_text=False)
-    tree = etree.parse(str(template_path), parser)
-    return tree.getroot()
+    root = etree.parse(str(template_path), parser).getroot()
+
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE[key] = (mtime, root)
+        _TEMPLATE_CACHE.move_to_end(key)
+        while len(_TEMPLATE_CACHE) > TEMPLATE_CACHE_SIZE:
+            _TEMPLATE_CACHE.popitem(last=False)
+    return root
 
 
-def _load_icon(icons_dir: Path, icon_filename: str) -> Optional[tuple[str, any]]:
+def _load_template_svg(
+    templates_dir: Path,
+    color: str,
+    size: str,
+    template_type: str,
+    orientation: str = "landscape",
+    compiled: bool = True,
+) -> etree._Element:
     """
-    Load an icon file (SVG or PNG).
-    Returns tuple of (type, data) where:
-      - type is 'svg' or 'png'
-      - data is etree._Element for SVG, or (base64_data, width, height) for PNG
+    Load a template SVG as a private copy the caller may modify.
+    See _resolve_template_path for the naming convention; compiled=False
+    loads the Inkscape source (with layers and editor data).
     """
-    # Try exact match first
-    icon_path = icons_dir / icon_filename
-    if not icon_path.exists():
-        # Try case-insensitive search
-        icon_lower = icon_filename.lower()
-        for f in icons_dir.iterdir():
-            if f.is_file() and f.name.lower() == icon_lower:
-                icon_path = f
-                break
-        else:
-            # Try without numeric prefix (e.g., "022 DOG.svg" -> "DOG.svg")
-            parts = icon_filename.split(" ", 1)
-            if len(parts) == 2:
-                return _load_icon(icons_dir, parts[1])
+    template_path = _resolve_template_path(templates_dir, color, size, template_type, orientation, compiled)
+    return copy.deepcopy(_parse_template_cached(template_path))
+
+
+def _canvas_size_px(svg_root: etree._Element, dpi: int = 300) -> tuple[int, int]:
+    """Convert a template's mm canvas size to pixels at the given DPI."""
+    canvas_width_mm = float(svg_root.get("width", "159.4mm").replace("mm", ""))
+    canvas_height_mm = float(svg_root.get("height", "139.4mm").replace("mm", ""))
+    return int(canvas_width_mm / 25.4 * dpi), int(canvas_height_mm / 25.4 * dpi)
+
+
+def _template_canvas_px(templates_dir: Path, color: str, size: str, template_type: str, orientation: str = "landscape", dpi: int = 300) -> tuple[int, int]:
+    """Canvas size of a template in pixels, read from the cache without copying."""
+    template_path = _resolve_template_path(templates_dir, color, size, template_type, orientation)
+    return _canvas_size_px(_parse_template_cached(template_path), dpi)
+
+
+@dataclass(frozen=True)
+class IconData:
+    """
+    A loaded icon, compiled once into a <symbol> and shared by every product
+    that uses it. Never modified after loading: injection copies `symbol`
+    into the document's <defs> once and places it with <use>.
+    """
+    kind: str  # 'svg' or 'png'
+    path: Path
+    view_box: tuple[float, float, float, float]  # original (min_x, min_y, width, height)
+    width: float  # intrinsic size: viewBox units for SVG, pixels for raster
+    height: float
+    symbol_id: str  # content-addressed, so equal icons share one definition
+    symbol: etree._Element  # <symbol viewBox="0 0 width height"> with the icon artwork
+
+
+# Icon lookups: one directory index per icons_dir (rebuilt when the directory
+# changes) and one parsed IconData per file (invalidated by mtime).
+_ICON_INDEXES: dict[str, tuple[int, dict[str, dict[str, Path]]]] = {}
+_ICON_CACHE: dict[str, tuple[int, IconData]] = {}
+_ICON_LOCK = threading.Lock()
+_NUMERIC_PREFIX = re.compile(r"^\d+\s+")
+
+
+def _icon_index(icons_dir: Path) -> dict[str, dict[str, Path]]:
+    """
+    Map icon names to paths: exact names, lowercased names, and lowercased
+    names with their numeric prefix stripped ("022 DOG.svg" -> "dog.svg").
+    """
+    key = str(icons_dir.resolve())
+    mtime = icons_dir.stat().st_mtime_ns
+    with _ICON_LOCK:
+        cached = _ICON_INDEXES.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    index = {"exact": {}, "lower": {}, "alias": {}}
+    for f in sorted(icons_dir.iterdir()):
+        if not f.is_file():
+            continue
+        index["exact"][f.name] = f
+        index["lower"].setdefault(f.name.lower(), f)
+        stripped = _NUMERIC_PREFIX.sub("", f.name).lower()
+        if stripped != f.name.lower():
+            index["alias"].setdefault(stripped, f)
+
+    with _ICON_LOCK:
+        _ICON_INDEXES[key] = (mtime, index)
+    return index
+
+
+def _find_icon_path(icons_dir: Path, icon_filename: str) -> Optional[Path]:
+    """Resolve a CSV icon name against the icon index."""
+    index = _icon_index(icons_dir)
+    name = icon_filename
+    while True:
+        # Try exact match, then case-insensitive, then prefix-stripped library names
+        found = index["exact"].get(name) or index["lower"].get(name.lower()) or index["alias"].get(name.lower())
+        if found:
+            return found
+        # Try without numeric prefix (e.g., "022 DOG.svg" -> "DOG.svg")
+        parts = name.split(" ", 1)
+        if len(parts) != 2:
             return None
+        name = parts[1]
+
 
+def _icon_symbol(symbol_id: str, width: float, height: float) -> etree._Element:
+    """Empty library entry with a viewBox normalized to start at the origin."""
+    symbol = etree.Element(f"{{{SVG_NS}}}symbol", nsmap={None: SVG_NS, "xlink": XLINK_NS})
+    symbol.set("id", symbol_id)
+    symbol.set("viewBox", f"0 0 {width} {height}")
+    symbol.set("preserveAspectRatio", "xMidYMid meet")
+    return symbol
+
+
+def _namespace_icon_ids(symbol: etree._Element, prefix: str) -> None:
+    """Prefix ids inside an icon (and references to them) so they cannot clash with the template's."""
+    ids = {elem.get("id") for elem in symbol.iter() if elem is not symbol and elem.get("id")}
+    if not ids:
+        return
+    ref = re.compile(r"(url\(#|^#)(" + "|".join(re.escape(i) for i in ids) + r")(?=\)|$)")
+    for elem in symbol.iter():
+        if not isinstance(elem.tag, str) or elem is symbol:
+            continue
+        for name, value in elem.attrib.items():
+            if name == "id":
+                elem.set(name, f"{prefix}-{value}")
+            elif "#" in value:
+                elem.set(name, ref.sub(lambda m: f"{m.group(1)}{prefix}-{m.group(2)}", value))
+
+
+def _parse_icon(icon_path: Path) -> Optional[IconData]:
+    """Read an icon file and compile it into a symbol library entry."""
     suffix = icon_path.suffix.lower()
+    symbol_id = f"icon-{file_digest(icon_path)[:12]}"
     
     if suffix == ".svg":
         parser = etree.XMLParser(remove_blank_text=False)
-        tree = etree.parse(str(icon_path), parser)
-        return ("svg", tree.getroot())
+        icon_root = etree.parse(str(icon_path), parser).getroot()
+
+        # Get icon's original viewBox or dimensions
+        icon_viewbox = icon_root.get("viewBox")
+        if icon_viewbox:
+            min_x, min_y, icon_w, icon_h = (float(v) for v in icon_viewbox.replace(",", " ").split())
+        else:
+            min_x = min_y = 0.0
+            icon_w = float(icon_root.get("width", "100").replace("mm", "").replace("px", ""))
+            icon_h = float(icon_root.get("height", "100").replace("mm", "").replace("px", ""))
+
+        symbol = _icon_symbol(symbol_id, icon_w, icon_h)
+        content = symbol
+        if min_x or min_y:
+            content = etree.SubElement(symbol, f"{{{SVG_NS}}}g")
+            content.set("transform", f"translate({-min_x},{-min_y})")
+
+        # Keep visible content only (skip defs, editor metadata and comments)
+        for child in icon_root:
+            if isinstance(child.tag, str) and etree.QName(child).localname not in (
+                "defs", "sodipodi:namedview", "namedview", "metadata"
+            ):
+                content.append(copy.deepcopy(child))
+        _namespace_icon_ids(symbol, symbol_id)
+        return IconData(
+            kind="svg",
+            path=icon_path,
+            view_box=(min_x, min_y, icon_w, icon_h),
+            width=icon_w,
+            height=icon_h,
+            symbol_id=symbol_id,
+            symbol=symbol,
+        )
     
     elif suffix in (".png", ".jpg", ".jpeg"):
-        # Read and encode as base64
+        # Read and encode as base64 - embedded once per document, however often it is placed
         with open(icon_path, "rb") as f:
             img_data = f.read()
         b64_data = base64.b64encode(img_data).decode("utf-8")
@@ -663,103 +877,104 @@ def _load_icon(icons_dir: Path, icon_filename: str) -> Optional[tuple[str, any]]
             height = int.from_bytes(img_data[20:24], "big")
         
         mime = "image/png" if suffix == ".png" else "image/jpeg"
-        return ("png", (b64_data, width, height, mime))
+        symbol = _icon_symbol(symbol_id, width, height)
+        img_elem = etree.SubElement(symbol, f"{{{SVG_NS}}}image")
+        img_elem.set("width", str(width))
+        img_elem.set("height", str(height))
+        img_elem.set(f"{{{XLINK_NS}}}href", f"data:{mime};base64,{b64_data}")
+        return IconData(
+            kind="png",
+            path=icon_path,
+            view_box=(0.0, 0.0, float(width), float(height)),
+            width=width,
+            height=height,
+            symbol_id=symbol_id,
+            symbol=symbol,
+        )
     
     return None
 
 
-def _load_icon_svg(icons_dir: Path, icon_filename: str) -> Optional[etree._Element]:
-    """Load an icon SVG file (legacy wrapper)."""
-    result = _load_icon(icons_dir, icon_filename)
-    if result and result[0] == "svg":
-        return result[1]
-    return None
-
-
-def _inject_icon(
-    root: etree._Element,
-    icon_root: etree._Element,
-    x: float,
-    y: float,
-    width: float,
-    height: float,
-) -> None:
+def _load_icon(icons_dir: Path, icon_filename: str) -> Optional[tuple[str, IconData]]:
     """
-    Inject an icon SVG into the template at the specified position and size.
-    Creates a new group with the icon content, scaled and positioned.
+    Load an icon file (SVG or PNG) through the icon index and cache.
+    Returns tuple of (type, data) where type is 'svg' or 'png' and data is
+    a shared, read-only IconData.
     """
-    # Get icon's original viewBox or dimensions
-    icon_viewbox = icon_root.get("viewBox")
-    if icon_viewbox:
-        parts = icon_viewbox.split()
-        icon_w = float(parts[2])
-        icon_h = float(parts[3])
+    icon_path = _find_icon_path(icons_dir, icon_filename)
+    if icon_path is None:
+        return None
+
+    key = str(icon_path.resolve())
+    mtime = icon_path.stat().st_mtime_ns
+    with _ICON_LOCK:
+        cached = _ICON_CACHE.get(key)
+    if cached and cached[0] == mtime:
+        icon = cached[1]
     else:
-        icon_w = float(icon_root.get("width", "100").replace("mm", "").replace("px", ""))
-        icon_h = float(icon_root.get("height", "100").replace("mm", "").replace("px", ""))
+        icon = _parse_icon(icon_path)
+        if icon is None:
+            return None
+        with _ICON_LOCK:
+            _ICON_CACHE[key] = (mtime, icon)
+    return (icon.kind, icon)
 
-    # Calculate scale to fit within bounds while maintaining aspect ratio
-    scale_x = width / icon_w if icon_w else 1
-    scale_y = height / icon_h if icon_h else 1
-    scale = min(scale_x, scale_y)
 
-    # Center the icon within the bounds
-    scaled_w = icon_w * scale
-    scaled_h = icon_h * scale
-    offset_x = x + (width - scaled_w) / 2
-    offset_y = y + (height - scaled_h) / 2
+def _load_icon_svg(icons_dir: Path, icon_filename: str) -> Optional[etree._Element]:
+    """Load an icon SVG file as a private tree (legacy wrapper)."""
+    icon_path = _find_icon_path(icons_dir, icon_filename)
+    if icon_path and icon_path.suffix.lower() == ".svg":
+        return etree.parse(str(icon_path)).getroot()
+    return None
 
-    # Create a group for the icon
-    icon_group = etree.SubElement(root, f"{{{SVG_NS}}}g")
-    icon_group.set("id", "injected_icon")
-    icon_group.set("transform", f"translate({offset_x},{offset_y}) scale({scale})")
 
-    # Copy icon content (skip defs, copy visible elements)
-    for child in icon_root:
-        tag_local = etree.QName(child).localname
-        if tag_local not in ("defs", "sodipodi:namedview", "namedview", "metadata"):
-            icon_group.append(child)
+def _icon_library(root: etree._Element) -> etree._Element:
+    """The document's icon <defs>, created on first use."""
+    for child in root.iterchildren(f"{{{SVG_NS}}}defs"):
+        if child.get("id") == "icon_library":
+            return child
+    library = etree.Element(f"{{{SVG_NS}}}defs")
+    library.set("id", "icon_library")
+    root.insert(0, library)
+    return library
 
 
-def _inject_png_icon(
+def _inject_icon(
     root: etree._Element,
-    png_data: tuple,
+    icon: IconData,
     x: float,
     y: float,
     width: float,
     height: float,
 ) -> None:
     """
-    Inject a PNG icon into the SVG as an embedded image.
-    png_data is (base64_data, orig_width, orig_height, mime_type)
+    Place an icon (SVG or raster) in the template, fitted and centred within
+    the given bounds. The icon's symbol is added to the document's <defs> on
+    first placement; every placement is a <use> referencing it.
     """
-    b64_data, orig_w, orig_h, mime = png_data
-    
-    # Calculate size to fit within bounds while maintaining aspect ratio
-    scale_x = width / orig_w if orig_w else 1
-    scale_y = height / orig_h if orig_h else 1
+    library = _icon_library(root)
+    if not any(child.get("id") == icon.symbol_id for child in library):
+        library.append(copy.deepcopy(icon.symbol))
+
+    # Calculate scale to fit within bounds while maintaining aspect ratio
+    scale_x = width / icon.width if icon.width else 1
+    scale_y = height / icon.height if icon.height else 1
     scale = min(scale_x, scale_y)
-    
-    scaled_w = orig_w * scale
-    scaled_h = orig_h * scale
-    
-    # Center within bounds
-    offset_x = x + (width - scaled_w) / 2
-    offset_y = y + (height - scaled_h) / 2
-    
-    # Create image element
-    img_elem = etree.SubElement(root, f"{{{SVG_NS}}}image")
-    img_elem.set("x", str(offset_x))
-    img_elem.set("y", str(offset_y))
-    img_elem.set("width", str(scaled_w))
-    img_elem.set("height", str(scaled_h))
-    img_elem.set(f"{{{XLINK_NS}}}href", f"data:{mime};base64,{b64_data}")
-    img_elem.set("preserveAspectRatio", "xMidYMid meet")
+
+    # Center the icon within the bounds
+    scaled_w = icon.width * scale
+    scaled_h = icon.height * scale
+    use = etree.SubElement(root, f"{{{SVG_NS}}}use")
+    use.set(f"{{{XLINK_NS}}}href", f"#{icon.symbol_id}")
+    use.set("x", str(x + (width - scaled_w) / 2))
+    use.set("y", str(y + (height - scaled_h) / 2))
+    use.set("width", str(scaled_w))
+    use.set("height", str(scaled_h))
 
 
 def _inject_icons_stacked(
     root: etree._Element,
-    icons: list[tuple[str, any]],
+    icons: list[tuple[str, IconData]],
     x: float,
     y: float,
     width: float,
@@ -779,10 +994,7 @@ def _inject_icons_stacked(
     for idx, (icon_type, icon_data) in enumerate(icons):
         icon_y = y + idx * (icon_height + spacing)
         actual_height = icon_height - spacing if idx < num_icons - 1 else icon_height
-        if icon_type == "svg":
-            _inject_icon(root, icon_data, x, icon_y, width, actual_height)
-        elif icon_type == "png":
-            _inject_png_icon(root, icon_data, x, icon_y, width, actual_height)
+        _inject_icon(root, icon_data, x, icon_y, width, actual_height)
 
 
 def _add_text_element(
@@ -840,218 +1052,184 @@ def _add_prohibition_overlay(
     )
 
 
-def _export_png(svg_path: Path, png_path: Path, width_px: int, height_px: int, dpi: int = 300, export_area: str = "page", max_dimension: int = 10000) -> bool:
-    """Export SVG to PNG using Inkscape CLI.
-    
-    Args:
-        export_area: 'page' for canvas only, 'drawing' for all elements including outside canvas
-        max_dimension: Maximum pixel dimension for longest side (Amazon limit is 10000)
-    """
-    cmd = [
-        "inkscape",
-        str(svg_path),
-        "--export-type=png",
-        f"--export-filename={png_path}",
-        f"--export-dpi={dpi}",
-    ]
-    
-    if export_area == "drawing":
-        cmd.append("--export-area-drawing")
-    else:
-        cmd.extend([f"--export-width={width_px}", f"--export-height={height_px}"])
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode != 0:
-            logging.error("Inkscape export failed: %s", result.stderr)
-            return False
-        
-        # Resize if image exceeds max dimension (Amazon limit)
-        if png_path.exists():
-            from PIL import Image
-            with Image.open(png_path) as img:
-                w, h = img.size
-                if w > max_dimension or h > max_dimension:
-                    # Calculate new size maintaining aspect ratio
-                    if w > h:
-                        new_w = max_dimension
-                        new_h = int(h * max_dimension / w)
-                    else:
-                        new_h = max_dimension
-                        new_w = int(w * max_dimension / h)
-                    logging.info("Resizing %s from %dx%d to %dx%d (Amazon max: %d)", 
-                                png_path.name, w, h, new_w, new_h, max_dimension)
-                    resized = img.resize((new_w, new_h), Image.LANCZOS)
-                    resized.save(png_path)
-        
-        return True
-    except subprocess.TimeoutExpired:
-        logging.error("Inkscape export timed out")
-        return False
-    except FileNotFoundError:
-        logging.error("Inkscape not found in PATH")
-        return False
+# Active rasterizer backend (see rasterizers.py). Configured by main() or
+# in-process callers, and re-applied in each --jobs worker.
+RENDER_SETTINGS = {
+    "renderer": "inkscape",
+    "inkscape_shell": True,
+    "inkscape_sessions": 1,
+    "composite": False,
+    "png_compression": None,  # zlib level 0-9; None keeps the renderer's own encoding
+    "png_optimize": False,
+    "derivatives": True,  # Etsy/eBay JPEG + thumbnail per image (image_derivatives.py)
+}
+_RASTERIZER: Optional[Rasterizer] = None
 
+# Declared image limits per sales channel (longest side in pixels)
+CHANNEL_MAX_DIMENSION = {
+    "amazon": 10000,
+}
 
-def _review_with_claude(image_path: Path, product: ProductRow, api_key: str) -> dict:
-    """
-    Send generated image to Claude Vision API for review.
-    Returns a dict with 'approved', 'score', 'feedback'.
-    """
-    try:
-        import anthropic
-    except ImportError:
-        logging.warning("anthropic package not installed, skipping AI review")
-        return {"approved": True, "score": None, "feedback": "AI review skipped (package not installed)"}
+# QA draft tier (--draft): main image only, screen-sized, written under exports/.drafts
+# so finals in 002 Images are only ever full resolution
+DRAFT_DPI = 72
+DRAFT_MAX_DIMENSION = 1200
+DRAFTS_DIRNAME = ".drafts"
 
-    if not api_key:
-        return {"approved": True, "score": None, "feedback": "AI review skipped (no API key)"}
 
-    # Read and encode image
-    with open(image_path, "rb") as f:
-        image_data = base64.b64encode(f.read()).decode("utf-8")
+def draft_path(exports_dir: Path, m_number: str, image_num: str = "001") -> Path:
+    """Where a product's QA draft image is written (and served from, until finalized)."""
+    return exports_dir / DRAFTS_DIRNAME / f"{m_number} - {image_num}.png"
 
-    client = anthropic.Anthropic(api_key=api_key)
 
-    prompt = f"""Review this product sign image for Amazon listing quality.
+def _configure_renderer(
+    renderer: str = "inkscape",
+    inkscape_shell: bool = True,
+    inkscape_sessions: int = 1,
+    composite: bool = False,
+    png_compression: Optional[int] = None,
+    png_optimize: bool = False,
+    derivatives: bool = True,
+) -> None:
+    """Select the rasterizer backend, compositing mode and output encoding for this process."""
+    global _RASTERIZER
+    RENDER_SETTINGS.update(
+        renderer=renderer,
+        inkscape_shell=inkscape_shell,
+        inkscape_sessions=max(1, inkscape_sessions),
+        composite=composite,
+        png_compression=png_compression,
+        png_optimize=png_optimize,
+        derivatives=derivatives,
+    )
+    _RASTERIZER = None
+
+
+def _png_save_options() -> dict:
+    """Pillow PNG options for the configured compression; empty = Pillow/renderer defaults."""
+    options = {}
+    if RENDER_SETTINGS["png_compression"] is not None:
+        options["compress_level"] = RENDER_SETTINGS["png_compression"]
+    if RENDER_SETTINGS["png_optimize"]:
+        options["optimize"] = True
+    return options
+
+
+def _get_rasterizer() -> Rasterizer:
+    """Return this process's rasterizer, creating it on first use."""
+    global _RASTERIZER
+    if _RASTERIZER is None:
+        if RENDER_SETTINGS["renderer"] == "inkscape":
+            _RASTERIZER = get_rasterizer(
+                "inkscape",
+                use_shell=RENDER_SETTINGS["inkscape_shell"],
+                sessions=RENDER_SETTINGS["inkscape_sessions"],
+            )
+        else:
+            _RASTERIZER = get_rasterizer(RENDER_SETTINGS["renderer"])
+    return _RASTERIZER
 
-Product details:
-- SKU: {product.sku_parent}
-- Size: {product.size}
-- Layout: {product.layout_mode}
-- Sign type: {product.sign_type}
-- Text: {product.text_line_1} / {product.text_line_2} / {product.text_line_3}
 
-Evaluate:
-1. Text readability (is it clear and properly sized?)
-2. Icon visibility (is it clear and well-positioned?)
-3. Overall balance (is the layout visually balanced?)
-4. Professional appearance (does it look like a quality product image?)
+# Content-addressed PNG cache (see render_cache.py), configured per run
+_RENDER_CACHE: Optional[RenderCache] = None
 
-If adjustments are needed, suggest percentage changes for icon_scale and text_scale (e.g., 1.2 = 20% larger, 0.8 = 20% smaller).
 
-Respond with JSON only:
-{{"approved": true/false, "score": 1-10, "feedback": "brief feedback", "icon_scale": 1.0, "text_scale": 1.0}}
-"""
+def _configure_render_cache(cache_dir: Path, enabled: bool = True, force: bool = False) -> None:
+    """Set up the render cache for this process (force = ignore existing entries)."""
+    global _RENDER_CACHE
+    _RENDER_CACHE = RenderCache(cache_dir, enabled=enabled, force=force)
 
-    try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=200,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/png",
-                                "data": image_data,
-                            },
-                        },
-                        {"type": "text", "text": prompt},
-                    ],
-                }
-            ],
-        )
 
-        result_text = response.content[0].text
-        logging.debug("Claude raw response: %s", result_text)
-        
-        # Extract JSON from response (may be wrapped in markdown code blocks)
-        import re
-        json_match = re.search(r'\{[^{}]*\}', result_text, re.DOTALL)
-        if json_match:
-            result = json.loads(json_match.group())
-            return result
-        else:
-            logging.warning("No JSON found in Claude response: %s", result_text[:200])
-            return {"approved": True, "score": None, "feedback": result_text[:200]}
-    except Exception as e:
-        logging.warning("Claude review failed: %s", e)
-        return {"approved": True, "score": None, "feedback": f"Review error: {e}"}
+def _clamp_export_size(width_px: int, height_px: int, dpi: float, max_dimension: int) -> tuple[int, int, float]:
+    """Scale export size and DPI together so the longest side fits max_dimension."""
+    longest = max(width_px, height_px)
+    if longest <= max_dimension:
+        return width_px, height_px, dpi
+    if width_px > height_px:
+        new_w, new_h = max_dimension, int(height_px * max_dimension / width_px)
+    else:
+        new_w, new_h = int(width_px * max_dimension / height_px), max_dimension
+    return new_w, new_h, round(dpi * max_dimension / longest, 3)
 
 
-def _review_with_openai(image_path: Path, product: ProductRow, api_key: str) -> dict:
+def _render_png_batch(
+    exports: list[tuple[etree._Element, Path, int, int, float, str]],
+    max_dimension: int = CHANNEL_MAX_DIMENSION["amazon"],
+) -> list[Optional[bytes]]:
     """
-    Send generated image to OpenAI GPT-4 Vision API for review.
-    Returns a dict with 'approved', 'score', 'feedback', 'icon_scale', 'text_scale'.
+    Rasterize several (svg_root, png_path, width_px, height_px, dpi, export_area)
+    exports in one renderer call. Returns final PNG bytes per export, None where
+    that export failed. png_path is only used in log messages.
     """
-    try:
-        import openai
-    except ImportError:
-        logging.warning("openai package not installed, skipping AI review")
-        return {"approved": True, "score": None, "feedback": "AI review skipped (package not installed)"}
-
-    if not api_key:
-        return {"approved": True, "score": None, "feedback": "AI review skipped (no API key)"}
-
-    # Read and encode image
-    with open(image_path, "rb") as f:
-        image_data = base64.b64encode(f.read()).decode("utf-8")
-
-    client = openai.OpenAI(api_key=api_key)
-
-    prompt = f"""You are a graphic design expert reviewing a product sign image for Amazon listing quality.
-
-Product details:
-- SKU: {product.sku_parent}
-- Size: {product.size} (physical sign dimensions)
-- Layout: {product.layout_mode}
-- Sign type: {product.sign_type}
-- Text: {product.text_line_1} / {product.text_line_2} / {product.text_line_3}
-
-Critically evaluate for VISUAL PRESENCE and IMPACT:
-1. Is the icon large enough to be immediately recognizable? Should it be bigger?
-2. Is the text bold and readable at a glance? Should it be larger?
-3. Is the icon positioned optimally (not too centered, good use of space)?
-4. Does the overall design have strong visual impact for a product listing?
-
-Be critical - if elements are too small or poorly positioned, suggest specific scale adjustments.
-icon_scale: 1.0 = current size, 1.3 = 30% larger, 0.8 = 20% smaller
-text_scale: 1.0 = current size, 1.5 = 50% larger, etc.
-
-Respond with JSON only:
-{{"approved": true/false, "score": 1-10, "feedback": "specific feedback", "icon_scale": 1.0, "text_scale": 1.0}}
-"""
+    from io import BytesIO
+    from PIL import Image
+
+    jobs = []
+    for svg_root, png_path, width_px, height_px, dpi, export_area in exports:
+        if export_area == "page":
+            # Render at the final size directly instead of rendering large and shrinking
+            clamped = _clamp_export_size(width_px, height_px, dpi, max_dimension)
+            if clamped[:2] != (width_px, height_px):
+                logging.info("Exporting %s at %dx%d instead of %dx%d (max: %d)",
+                             png_path.name, clamped[0], clamped[1], width_px, height_px, max_dimension)
+            width_px, height_px, dpi = clamped
+        jobs.append(RenderJob(svg_root, width_px, height_px, dpi, export_area))
+
+    save_options = _png_save_options()
+    results = []
+    for (_, png_path, *_rest), job, png_bytes in zip(exports, jobs, _get_rasterizer().render_many(jobs)):
+        if png_bytes is None:
+            logging.error("%s render failed for %s", RENDER_SETTINGS["renderer"], png_path.name)
+            results.append(None)
+            continue
+        with span("resize"), Image.open(BytesIO(png_bytes)) as img:
+            w, h = img.size
+            if w > max_dimension or h > max_dimension:
+                # Drawing-area exports only know their size after rendering
+                new_w, new_h, _ = _clamp_export_size(w, h, job.dpi, max_dimension)
+                logging.info("Resizing %s from %dx%d to %dx%d (max: %d)",
+                             png_path.name, w, h, new_w, new_h, max_dimension)
+                png_bytes = encode_png(img.resize((new_w, new_h), Image.LANCZOS), **save_options)
+            elif save_options:
+                png_bytes = encode_png(img, **save_options)
+        results.append(png_bytes)
+    return results
+
+
+def _render_png(
+    svg_root: etree._Element,
+    png_path: Path,
+    width_px: int,
+    height_px: int,
+    dpi: int = 300,
+    export_area: str = "page",
+    max_dimension: int = CHANNEL_MAX_DIMENSION["amazon"],
+) -> Optional[bytes]:
+    """Rasterize an SVG tree in memory with the configured renderer. Returns final PNG bytes, or None.
+    
+    Args:
+        png_path: Output path the bytes are destined for (used in log messages)
+        export_area: 'page' for canvas only, 'drawing' for all elements including outside canvas
+        max_dimension: Maximum pixel dimension for longest side (Amazon limit is 10000)
+    """
+    return _render_png_batch([(svg_root, png_path, width_px, height_px, dpi, export_area)], max_dimension)[0]
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            max_tokens=300,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{image_data}",
-                                "detail": "high"
-                            }
-                        },
-                    ],
-                }
-            ],
-        )
 
-        result_text = response.choices[0].message.content
-        logging.debug("OpenAI raw response: %s", result_text)
-        
-        # Extract JSON from response
-        import re
-        json_match = re.search(r'\{[^{}]*\}', result_text, re.DOTALL)
-        if json_match:
-            result = json.loads(json_match.group())
-            return result
-        else:
-            logging.warning("No JSON found in OpenAI response: %s", result_text[:200])
-            return {"approved": True, "score": None, "feedback": result_text[:200]}
-    except Exception as e:
-        logging.warning("OpenAI review failed: %s", e)
-        return {"approved": True, "score": None, "feedback": f"Review error: {e}"}
+def _export_png(
+    svg_root: etree._Element,
+    png_path: Path,
+    width_px: int,
+    height_px: int,
+    dpi: int = 300,
+    export_area: str = "page",
+    max_dimension: int = CHANNEL_MAX_DIMENSION["amazon"],
+) -> bool:
+    """Render an SVG tree and write the PNG once, atomically. Returns True on success."""
+    png_bytes = _render_png(svg_root, png_path, width_px, height_px, dpi, export_area, max_dimension)
+    if png_bytes is None:
+        return False
+    write_atomic(png_path, png_bytes)
+    return True
 
 
 def _inject_graphic_design(
@@ -1094,64 +1272,441 @@ def _inject_graphic_design(
         )
 
 
-def _generate_main_image(
-    product: ProductRow,
+def _use_compositing(template_type: str, export_area: str, inject_design: bool) -> bool:
+    """Compositing applies to page-area renders of designed templates with a raster store."""
+    return (RENDER_SETTINGS["composite"] and _RENDER_CACHE is not None and inject_design
+            and export_area == "page" and template_type in COMPOSITE_TEMPLATE_TYPES)
+
+
+def _render_cache_key(
+    ctx: RenderContext,
+    template_path: Path,
+    template_type: str,
+    width_px: int,
+    height_px: int,
+    export_area: str,
+    inject_design: bool,
+) -> str:
+    """Hash every input that determines a rendered PNG."""
+    product = ctx.product
+    parts = {
+        "template": file_digest(template_path),
+        "template_type": template_type,
+        "size_px": [width_px, height_px],
+        "dpi": ctx.dpi,
+        "export_area": export_area,
+        "renderer": _get_rasterizer().version(),
+        "composite": _use_compositing(template_type, export_area, inject_design) and not ctx.draft,
+        "max_dimension": ctx.max_dimension,
+        "png": _png_save_options(),
+    }
+    if inject_design:
+        parts.update(
+            icons=[file_digest(icon.path) for _, icon in ctx.icons],
+            layout=asdict(ctx.layout),
+            font=FONTS.get(product.font, ("Arial", "bold")),
+            sign_type=product.sign_type,
+        )
+    return cache_key(**parts)
+
+
+@dataclass
+class ImageRequest:
+    """One of a product's template images, for _render_template_images()."""
+    template_type: str
+    png_path: Path
+    inject_design: bool = True
+    export_area: str = "page"
+    own_canvas: bool = False  # size the export from this template instead of the main canvas
+
+
+@dataclass
+class _PlannedImage:
+    """A product image after cache lookup, waiting for its PNG bytes."""
+    png_path: Path
+    key: Optional[str]
+    root: Optional[etree._Element] = None
+    width_px: int = 0
+    height_px: int = 0
+    export_area: str = "page"
+    png_bytes: Optional[bytes] = None
+    derivatives: bool = True
+
+
+def _plan_template_image(ctx: RenderContext, templates_dir: Path, request: ImageRequest) -> Optional[_PlannedImage]:
+    """
+    Serve an image from the render cache, composite it, or build its SVG tree for rendering.
+    Returns None on a cache hit (the image is already in place).
+    Raises FileNotFoundError if the template does not exist.
+    """
+    product = ctx.product
+    template_type, png_path, export_area = request.template_type, request.png_path, request.export_area
+    with span("template_load", image=template_type):
+        template_path = _resolve_template_path(templates_dir, product.color, product.size, template_type,
+                                               product.orientation)
+        cached_root = _parse_template_cached(template_path)
+    if request.own_canvas:
+        width_px, height_px = _canvas_size_px(cached_root, ctx.dpi)
+    else:
+        width_px, height_px = ctx.width_px, ctx.height_px
+
+    key = None
+    if _RENDER_CACHE is not None and _RENDER_CACHE.enabled:
+        key = _render_cache_key(ctx, template_path, template_type, width_px, height_px, export_area,
+                                request.inject_design)
+        if _RENDER_CACHE.fetch(key, png_path):
+            logging.info("Render cache hit: %s", png_path.name)
+            if RENDER_SETTINGS["derivatives"] and not ctx.draft:
+                ensure_derivatives(png_path)
+            return None
+
+    planned = _PlannedImage(png_path, key, width_px=width_px, height_px=height_px, export_area=export_area,
+                            derivatives=RENDER_SETTINGS["derivatives"] and not ctx.draft)
+    # Drafts are rendered whole: their size limit differs from the stored full-size backgrounds
+    if _use_compositing(template_type, export_area, request.inject_design) and not ctx.draft:
+        planned.png_bytes = _render_composited(ctx, templates_dir, template_type, template_path, png_path)
+    if planned.png_bytes is None:
+        with span("inject", image=template_type):
+            planned.root = copy.deepcopy(cached_root)
+            if request.inject_design:
+                _inject_graphic_design(planned.root, product, ctx.icons, ctx.layout)
+    return planned
+
+
+def _write_planned_image(planned: _PlannedImage) -> bool:
+    """Write a rendered image once, then fill the render cache and derivatives from it."""
+    if planned.png_bytes is None:
+        return False
+    # Outputs are replaced atomically, never written in place, so cache entries hardlinked
+    # to a previous output are left untouched
+    with span("write"):
+        write_atomic(planned.png_path, planned.png_bytes)
+        if planned.key is not None:
+            _RENDER_CACHE.store(planned.key, planned.png_path)
+    if planned.derivatives:
+        # Channel JPEGs and thumbnail from the bytes still in memory
+        with span("derivatives"):
+            write_derivatives(planned.png_path, planned.png_bytes)
+    return True
+
+
+def _render_template_images(
+    ctx: RenderContext,
     templates_dir: Path,
-    icons_dir: Path,
-    output_path: Path,
-    bounds: SignBounds,
-    icons: list,
-    icon_scale: float = 1.0,
-    text_scale: float = 1.0,
-    dry_run: bool = False,
+    requests: list[ImageRequest],
+) -> dict[str, Optional[bool]]:
+    """
+    Render a product's images together: cache hits and composites skip the
+    renderer, everything else goes out as one batch (one Inkscape round trip).
+    Returns per template type True/False, or None if that template does not exist.
+    """
+    results: dict[str, Optional[bool]] = {}
+    planned: list[tuple[ImageRequest, _PlannedImage]] = []
+    for request in requests:
+        try:
+            item = _plan_template_image(ctx, templates_dir, request)
+        except FileNotFoundError:
+            results[request.template_type] = None
+            continue
+        if item is None:
+            results[request.template_type] = True
+        else:
+            planned.append((request, item))
+
+    to_render = [item for _, item in planned if item.png_bytes is None]
+    if to_render:
+        rendered = _render_png_batch([
+            (item.root, item.png_path, item.width_px, item.height_px, ctx.dpi, item.export_area)
+            for item in to_render
+        ], ctx.max_dimension)
+        for item, png_bytes in zip(to_render, rendered):
+            item.png_bytes = png_bytes
+
+    for request, item in planned:
+        results[request.template_type] = _write_planned_image(item)
+    return results
+
+
+def _preview_template_images(
+    ctx: RenderContext,
+    templates_dir: Path,
+    requests: list[ImageRequest],
+) -> dict[str, Optional[bool]]:
+    """Dry-run counterpart of _render_template_images: check templates and log what would be exported."""
+    product = ctx.product
+    results: dict[str, Optional[bool]] = {}
+    for request in requests:
+        try:
+            _resolve_template_path(templates_dir, product.color, product.size, request.template_type, product.orientation)
+        except FileNotFoundError:
+            results[request.template_type] = None
+            continue
+        logging.info("[DRY RUN] Would export: %s", request.png_path)
+        results[request.template_type] = True
+    return results
+
+
+def _render_template_image(
+    ctx: RenderContext,
+    templates_dir: Path,
+    template_type: str,
+    png_path: Path,
+    inject_design: bool = True,
+    export_area: str = "page",
+    own_canvas: bool = False,
 ) -> bool:
-    """Generate a single main image with given scale parameters. Returns True on success."""
-    text_lines = [product.text_line_1, product.text_line_2, product.text_line_3]
-    
-    # Calculate layout with scale factors
-    layout = _calculate_layout(
-        bounds=bounds,
-        layout_mode=product.layout_mode,
-        num_icons=len(product.icon_files),
-        text_lines=text_lines,
-        icon_scale=icon_scale,
-        text_scale=text_scale,
-        size=product.size,
-        orientation=product.orientation,
+    """
+    Render one template for a product, reusing a cached PNG when nothing changed.
+    Raises FileNotFoundError if the template does not exist.
+    """
+    request = ImageRequest(template_type, png_path, inject_design, export_area, own_canvas)
+    planned = _plan_template_image(ctx, templates_dir, request)
+    if planned is None:
+        return True
+    if planned.png_bytes is None:
+        planned.png_bytes = _render_png(planned.root, png_path, planned.width_px, planned.height_px,
+                                        ctx.dpi, export_area, ctx.max_dimension)
+    return _write_planned_image(planned)
+
+
+# Templates rendered without any per-product content: identical for every
+# product of the same color/size/orientation, so rendered once per run.
+STATIC_TEMPLATE_TYPES = ("rear",)
+_STATIC_LOCK = threading.Lock()
+_STATIC_SCRATCH: Optional[Path] = None
+_STATIC_SCRATCH_LOCK = threading.Lock()
+
+
+def _static_scratch_dir() -> Path:
+    """Private store for static renders when the render cache is disabled, removed at exit."""
+    global _STATIC_SCRATCH
+    with _STATIC_SCRATCH_LOCK:
+        if _STATIC_SCRATCH is None:
+            _STATIC_SCRATCH = Path(tempfile.mkdtemp(prefix="signmaker-static-"))
+            atexit.register(shutil.rmtree, _STATIC_SCRATCH, True)
+        return _STATIC_SCRATCH
+
+
+def _static_store_dir() -> Path:
+    """Where static rasters and compositing markers live: .render_cache/static, or scratch under --no-cache."""
+    if _RENDER_CACHE.enabled:
+        return _RENDER_CACHE.cache_dir / "static"
+    return _static_scratch_dir()
+
+
+def _static_raster(
+    templates_dir: Path,
+    template_type: str,
+    color: str,
+    size: str,
+    orientation: str,
+    dpi: int = 300,
+    refresh: bool = False,
+) -> Optional[Path]:
+    """
+    Return the shared PNG for a static template, rendering it into the raster
+    store (.render_cache/static) if it is missing or refresh is set. With the
+    render cache disabled (--no-cache) the store is a per-process temp directory,
+    so .render_cache is neither read nor written.
+    Returns None when there is no render cache configured or the render fails.
+    Raises FileNotFoundError if the template does not exist.
+    """
+    template_path = _resolve_template_path(templates_dir, color, size, template_type, orientation)
+    if _RENDER_CACHE is None:
+        return None
+    # Static images share the main canvas size, like the per-product render did
+    width_px, height_px = _template_canvas_px(templates_dir, color, size, "main", orientation, dpi)
+    key = cache_key(
+        static=file_digest(template_path),
+        template_type=template_type,
+        size_px=[width_px, height_px],
+        dpi=dpi,
+        renderer=_get_rasterizer().version(),
     )
+    name = f"{template_type}-{color}-{size}-{orientation}-{dpi}dpi-{key[:12]}.png"
+
+    with _STATIC_LOCK:
+        store_path = _static_store_dir() / name
+        if store_path.exists() and not refresh:
+            return store_path
+        store_path.parent.mkdir(parents=True, exist_ok=True)
+        # Export does not modify the tree, so the shared parsed template is rendered directly
+        if not _export_png(_parse_template_cached(template_path), store_path, width_px, height_px, dpi):
+            return None
+        logging.info("Rendered static %s image: %s", template_type, store_path.name)
+        return store_path
+
+
+def _prerender_static_rasters(products: list[ProductRow], templates_dir: Path, refresh: bool = False) -> None:
+    """Render each static template once up front so products (and --jobs workers) only reuse it."""
+    combos = sorted({(p.color, p.size, p.orientation) for p in products if p.m_number})
+    template_types = STATIC_TEMPLATE_TYPES
+    if RENDER_SETTINGS["composite"]:
+        # Backgrounds for layered compositing are static renders too
+        template_types += COMPOSITE_TEMPLATE_TYPES
+    for template_type in template_types:
+        for color, size, orientation in combos:
+            try:
+                _static_raster(templates_dir, template_type, color, size, orientation, refresh=refresh)
+            except FileNotFoundError:
+                pass  # Optional template
+
+
+# Layered compositing (--composite): the template background is rendered once
+# into the raster store and only the injected design is rasterized per product.
+COMPOSITE_TEMPLATE_TYPES = ("main", "dimensions")
+COMPOSITE_MAX_MEAN_DIFF = 1.0  # tolerance vs a full render, checked once per template
+COMPOSITE_MAX_BAD_PIXELS = 0.002
+_LAYER_KEEP_TAGS = {f"{{{SVG_NS}}}defs", f"{{{SVG_NS}}}style"}
+
+
+@functools.lru_cache(maxsize=8)
+def _load_background(png_path: str):
+    """Decode a stored background once per process (store paths are content-addressed)."""
+    from PIL import Image
+    with Image.open(png_path) as img:
+        return img.convert("RGBA")
+
+
+def _design_layer_root(template_root: etree._Element) -> etree._Element:
+    """
+    Empty canvas with the template's size, viewBox and defs but none of its
+    artwork (and no namedview, so the page background stays transparent).
+    """
+    layer = etree.Element(template_root.tag, attrib=dict(template_root.attrib), nsmap=template_root.nsmap)
+    for child in template_root:
+        if child.tag in _LAYER_KEEP_TAGS:
+            layer.append(copy.deepcopy(child))
+    return layer
+
+
+def _composite_verdict(template_path: Path, template_type: str, dpi: int) -> tuple[Path, Optional[bool]]:
+    """Marker file recording whether compositing matched a full render for this template."""
+    key = cache_key(composite=file_digest(template_path), dpi=dpi, renderer=_get_rasterizer().version(),
+                    tolerance=[COMPOSITE_MAX_MEAN_DIFF, COMPOSITE_MAX_BAD_PIXELS])
+    marker = _static_store_dir() / f"composite-{template_type}-{key[:16]}.txt"
+    if not marker.exists():
+        return marker, None
+    return marker, marker.read_text().startswith("pass")
+
 
-    # Load fresh template
+def _render_composited(
+    ctx: RenderContext,
+    templates_dir: Path,
+    template_type: str,
+    template_path: Path,
+    png_path: Path,
+) -> Optional[bytes]:
+    """
+    Render the design layer on a transparent canvas and alpha-composite it over
+    the cached background. The first render of each template is also rendered
+    in full and compared; templates outside tolerance are not composited again.
+    Returns the PNG bytes, or None when compositing does not apply so the
+    caller renders in full.
+    """
+    product = ctx.product
+    marker, verdict = _composite_verdict(template_path, template_type, ctx.dpi)
+    if verdict is False:
+        return None
+    background_png = _static_raster(templates_dir, template_type, product.color, product.size,
+                                    product.orientation, ctx.dpi)
+    if background_png is None:
+        return None
+    background = _load_background(str(background_png))
+
+    cached_root = _parse_template_cached(template_path)
+    with span("inject", image=template_type):
+        layer_root = _design_layer_root(cached_root)
+        _inject_graphic_design(layer_root, product, ctx.icons, ctx.layout)
+    # Same clamped size the background was exported at
+    width_px, height_px, dpi = _clamp_export_size(ctx.width_px, ctx.height_px, ctx.dpi,
+                                                  CHANNEL_MAX_DIMENSION["amazon"])
     try:
-        template_root = _load_template_svg(templates_dir, product.color, product.size, "main", product.orientation)
-    except FileNotFoundError as e:
-        logging.error("Template not found: %s", e)
-        return False
+        layer = _get_rasterizer().render(layer_root, width_px, height_px, dpi)
+    except Exception as e:
+        logging.warning("Design layer render failed for %s (%s), rendering in full", png_path.name, e)
+        return None
+    from PIL import Image
+    if layer.size != background.size:
+        layer = layer.resize(background.size, Image.LANCZOS)
+    composited = Image.alpha_composite(background, layer)
+
+    if verdict is None:
+        full_root = copy.deepcopy(cached_root)
+        _inject_graphic_design(full_root, product, ctx.icons, ctx.layout)
+        try:
+            reference = _get_rasterizer().render(full_root, width_px, height_px, dpi)
+        except Exception as e:
+            logging.warning("Full render for composite check failed (%s), rendering in full", e)
+            return None
+        mean_diff, bad_fraction = compare_images(reference, composited)
+        passed = mean_diff <= COMPOSITE_MAX_MEAN_DIFF and bad_fraction <= COMPOSITE_MAX_BAD_PIXELS
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(f"{'pass' if passed else 'fail'} mean_diff={mean_diff:.3f} bad_pixels={bad_fraction:.4%}\n")
+        if not passed:
+            logging.warning("Compositing %s differs from a full render (mean diff %.2f, bad pixels %.2f%%), "
+                            "rendering it in full", template_path.name, mean_diff, bad_fraction * 100)
+            composited = reference if reference.size == background.size else None
+            if composited is None:
+                return None
+
+    return encode_png(composited, **_png_save_options())
+
+
+def _build_render_context(product: ProductRow, templates_dir: Path, icons_dir: Path, dpi: int = 300) -> Optional[RenderContext]:
+    """Load icons and compute bounds, layout and canvas size once per product."""
+    # Get sign bounds
+    bounds = _get_sign_bounds(product.size, product.orientation)
 
-    # Inject graphic design (icons + text)
-    _inject_graphic_design(template_root, product, icons, layout)
+    # Load icons once (supports both SVG and PNG)
+    icons = []
+    with span("icon_load"):
+        for icon_file in product.icon_files:
+            icon_result = _load_icon(icons_dir, icon_file)
+            if icon_result is None:
+                logging.warning("Icon not found: %s (skipping product %s)", icon_file, product.m_number)
+                return None
+            icons.append(icon_result)
+
+    # Calculate layout once for reuse across templates, using scale factors from CSV tuning
+    text_lines = [product.text_line_1, product.text_line_2, product.text_line_3]
+    with span("layout"):
+        layout = _calculate_layout(
+            bounds=bounds,
+            layout_mode=product.layout_mode,
+            num_icons=len(product.icon_files),
+            text_lines=text_lines,
+            font=product.font,
+            icon_scale=product.icon_scale,
+            text_scale=product.text_scale,
+            size=product.size,
+            orientation=product.orientation,
+        )
 
-    # Save modified SVG to temp file
-    with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp:
-        tmp_svg_path = Path(tmp.name)
-        tree = etree.ElementTree(template_root)
-        tree.write(str(tmp_svg_path), encoding="utf-8", xml_declaration=True)
+    # Main canvas size is shared by the main, dimensions and rear images
+    try:
+        width_px, height_px = _template_canvas_px(
+            templates_dir, product.color, product.size, "main", product.orientation, dpi
+        )
+    except FileNotFoundError:
+        width_px, height_px = 1882, 1647  # Default fallback
 
-    # Get template canvas dimensions
-    svg_width = template_root.get("width", "159.4mm").replace("mm", "")
-    svg_height = template_root.get("height", "139.4mm").replace("mm", "")
-    canvas_width_mm = float(svg_width)
-    canvas_height_mm = float(svg_height)
+    return RenderContext(
+        product=product,
+        bounds=bounds,
+        icons=icons,
+        layout=layout,
+        width_px=width_px,
+        height_px=height_px,
+        dpi=dpi,
+    )
 
-    # Convert mm to pixels at 300 DPI
-    dpi = 300
-    width_px = int(canvas_width_mm / 25.4 * dpi)
-    height_px = int(canvas_height_mm / 25.4 * dpi)
 
-    if dry_run:
-        logging.info("[DRY RUN] Would export: %s (%dx%d px)", output_path, width_px, height_px)
-        return True
-    
-    return _export_png(tmp_svg_path, output_path, width_px, height_px, dpi)
+def _m_folder_path(exports_dir: Path, product: ProductRow) -> Path:
+    """A product's M Number folder, e.g. exports/M1075 No Dogs Silver Saville."""
+    color_title = product.color.title()  # silver -> Silver
+    size_title = product.size.title()  # saville -> Saville
+    return exports_dir / f"{product.m_number} {product.description} {color_title} {size_title}"
 
 
 def _create_m_number_folder_structure(
@@ -1166,12 +1721,7 @@ def _create_m_number_folder_structure(
     if not product.m_number:
         return None
     
-    # Build folder name: M1075 No Dogs Silver Saville
-    color_title = product.color.title()  # silver -> Silver
-    size_title = product.size.title()  # saville -> Saville
-    folder_name = f"{product.m_number} {product.description} {color_title} {size_title}"
-    
-    m_folder = exports_dir / folder_name
+    m_folder = _m_folder_path(exports_dir, product)
     
     # Copy folder structure from template
     if template_folder.exists():
@@ -1217,30 +1767,14 @@ def _generate_master_design_file(
         return False
     
     # Load master design template (with portrait support)
-    if product.orientation == "portrait":
-        template_name = f"{product.color}_{product.size}_portrait_master_design_file.svg"
-    else:
-        template_name = f"{product.color}_{product.size}_master_design_file.svg"
-    template_path = templates_dir / template_name
-    
-    if not template_path.exists():
-        # Fallback to landscape if portrait not found
-        if product.orientation == "portrait":
-            fallback_name = f"{product.color}_{product.size}_master_design_file.svg"
-            fallback_path = templates_dir / fallback_name
-            if fallback_path.exists():
-                logging.warning("Portrait master design not found, using landscape: %s", fallback_name)
-                template_path = fallback_path
-            else:
-                logging.warning("Master design template not found: %s", template_path)
-                return False
-        else:
-            logging.warning("Master design template not found: %s", template_path)
-            return False
-    
     try:
-        tree = etree.parse(str(template_path))
-        template_root = tree.getroot()
+        # Source form: the master file is opened in Inkscape, so it keeps layers and editor data
+        template_root = _load_template_svg(
+            templates_dir, product.color, product.size, "master_design_file", product.orientation, compiled=False
+        )
+    except FileNotFoundError as e:
+        logging.warning("Master design template not found: %s", e)
+        return False
     except Exception as e:
         logging.error("Failed to load master design template: %s", e)
         return False
@@ -1265,19 +1799,37 @@ def _generate_master_design_file(
         return False
 
 
+def _generate_draft_image(ctx: RenderContext, templates_dir: Path, exports_dir: Path, dry_run: bool = False) -> bool:
+    """Render a product's QA draft: the main image at DRAFT_DPI, capped at DRAFT_MAX_DIMENSION."""
+    product = ctx.product
+    ctx.max_dimension = DRAFT_MAX_DIMENSION
+    ctx.draft = True
+    png_path = draft_path(exports_dir, product.m_number)
+    png_path.parent.mkdir(parents=True, exist_ok=True)
+
+    render = _preview_template_images if dry_run else _render_template_images
+    result = render(ctx, templates_dir, [ImageRequest("main", png_path)])["main"]
+    if result is None:
+        logging.error("Template not found: main %s/%s (%s)", product.color, product.size, product.orientation)
+        return False
+    if result and not dry_run:
+        logging.info("Exported draft: %s", png_path.name)
+    return bool(result)
+
+
 def _generate_product_images(
     product: ProductRow,
     templates_dir: Path,
     icons_dir: Path,
     exports_dir: Path,
     dry_run: bool = False,
-    ai_review: bool = False,
-    ai_provider: str = "openai",
-    api_key: str = "",
-    max_ai_iterations: int = 3,
     main_only: bool = False,
+    draft: bool = False,
 ) -> bool:
-    """Generate all images for a single product with optional AI-driven adjustment."""
+    """
+    Generate all images for a single product (AI review runs afterwards, see _ai_review_stage).
+    With draft, only a low-resolution main image is rendered, to exports/.drafts.
+    """
     # Require m_number for output
     if not product.m_number:
         logging.warning("Skipping product %s: no m_number specified", product.sku_parent)
@@ -1287,21 +1839,20 @@ def _generate_product_images(
     logging.info("Processing %s (size=%s, color=%s, layout=%s, icon_scale=%.2f, text_scale=%.2f)", 
                  m_number, product.size, product.color, product.layout_mode, product.icon_scale, product.text_scale)
 
-    # Get sign bounds
-    bounds = _get_sign_bounds(product.size, product.orientation)
-
-    # Load icons once (supports both SVG and PNG)
-    icons = []
-    for icon_file in product.icon_files:
-        icon_result = _load_icon(icons_dir, icon_file)
-        if icon_result is None:
-            logging.warning("Icon not found: %s (skipping product %s)", icon_file, m_number)
-            return False
-        icons.append(icon_result)
+    ctx = _build_render_context(product, templates_dir, icons_dir, dpi=DRAFT_DPI if draft else 300)
+    if ctx is None:
+        return False
+    if draft:
+        return _generate_draft_image(ctx, templates_dir, exports_dir, dry_run)
 
     # Create M Number folder structure first
     template_folder = Path("examples/EMPTY COPY FOLDER")
-    m_folder = _create_m_number_folder_structure(exports_dir, product, template_folder)
+    with span("folder_setup"):
+        m_folder = _create_m_number_folder_structure(exports_dir, product, template_folder)
+        if m_folder:
+            # Images go directly to 002 Images folder with M Number naming
+            images_dir = m_folder / "002 Images"
+            images_dir.mkdir(parents=True, exist_ok=True)
     
     if not m_folder:
         logging.error("Failed to create M Number folder for %s", m_number)
@@ -1309,126 +1860,721 @@ def _generate_product_images(
     
     logging.info("Created M Number folder: %s", m_folder.name)
     
-    # Images go directly to 002 Images folder with M Number naming
-    images_dir = m_folder / "002 Images"
-    images_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Use scale factors from product (set via CSV tuning)
-    icon_scale = product.icon_scale
-    text_scale = product.text_scale
-    
     # File naming: M1075 - 001.png, M1075 - 002.png, etc.
     main_png = images_dir / f"{m_number} - 001.png"
-
-    # No AI review - just generate once
-    if not _generate_main_image(
-        product, templates_dir, icons_dir, main_png, bounds, icons,
-        icon_scale, text_scale, dry_run
-    ):
+    dim_png = images_dir / f"{m_number} - 002.png"
+    peel_png = images_dir / f"{m_number} - 003.png"
+
+    # Main, dimensions and peel_and_stick are rendered as one batch. peel_and_stick uses
+    # export_area="drawing" to include elements outside its canvas, which may differ from main.
+    requests = [ImageRequest("main", main_png)]
+    if not main_only:
+        requests += [
+            ImageRequest("dimensions", dim_png),
+            ImageRequest("peel_and_stick", peel_png, export_area="drawing", own_canvas=True),
+        ]
+    render = _preview_template_images if dry_run else _render_template_images
+    results = render(ctx, templates_dir, requests)
+
+    if results["main"] is None:
+        logging.error("Template not found: main %s/%s (%s)", product.color, product.size, product.orientation)
+        return False
+    if not results["main"]:
         return False
     logging.info("Exported: %s", main_png.name)
-
-    # Get canvas dimensions for additional images
-    try:
-        template_root = _load_template_svg(templates_dir, product.color, product.size, "main", product.orientation)
-        svg_width = template_root.get("width", "159.4mm").replace("mm", "")
-        svg_height = template_root.get("height", "139.4mm").replace("mm", "")
-        canvas_width_mm = float(svg_width)
-        canvas_height_mm = float(svg_height)
-        dpi = 300
-        width_px = int(canvas_width_mm / 25.4 * dpi)
-        height_px = int(canvas_height_mm / 25.4 * dpi)
-    except FileNotFoundError:
-        width_px, height_px, dpi = 1882, 1647, 300  # Default fallback
-
-    # Calculate layout once for reuse across templates
-    text_lines = [product.text_line_1, product.text_line_2, product.text_line_3]
-    layout = _calculate_layout(
-        bounds=bounds,
-        layout_mode=product.layout_mode,
-        num_icons=len(product.icon_files),
-        text_lines=text_lines,
-        icon_scale=icon_scale,
-        text_scale=text_scale,
-        size=product.size,
-        orientation=product.orientation,
-    )
+    if not dry_run:
+        # The final supersedes any QA draft
+        draft_path(exports_dir, m_number).unlink(missing_ok=True)
 
     # Skip additional images if main_only mode (for fast QA preview)
     if main_only:
         logging.info("Main-only mode: skipping dimensions, peel_and_stick, rear images")
         return True
 
-    # Generate dimensions image with graphic design
-    try:
-        dim_template = _load_template_svg(templates_dir, product.color, product.size, "dimensions", product.orientation)
-        _inject_graphic_design(dim_template, product, icons, layout)
-        with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp:
-            tmp_dim_path = Path(tmp.name)
-            tree = etree.ElementTree(dim_template)
-            tree.write(str(tmp_dim_path), encoding="utf-8", xml_declaration=True)
-
-        dim_png = images_dir / f"{m_number} - 002.png"
-        if dry_run:
-            logging.info("[DRY RUN] Would export: %s", dim_png)
-        else:
-            if _export_png(tmp_dim_path, dim_png, width_px, height_px, dpi):
-                logging.info("Exported: %s", dim_png.name)
-        tmp_dim_path.unlink(missing_ok=True)
-    except FileNotFoundError:
+    if results["dimensions"] is None:
         logging.warning("Dimensions template not found for %s/%s", product.color, product.size)
-
-    # Generate peel_and_stick with graphic design (same position as main)
-    try:
-        peel_template = _load_template_svg(templates_dir, product.color, product.size, "peel_and_stick", product.orientation)
-        _inject_graphic_design(peel_template, product, icons, layout)
-        with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp:
-            tmp_peel_path = Path(tmp.name)
-            tree = etree.ElementTree(peel_template)
-            tree.write(str(tmp_peel_path), encoding="utf-8", xml_declaration=True)
-
-        # Get peel_and_stick canvas dimensions (may differ from main)
-        peel_width = peel_template.get("width", "159.4mm").replace("mm", "")
-        peel_height = peel_template.get("height", "139.4mm").replace("mm", "")
-        peel_width_px = int(float(peel_width) / 25.4 * dpi)
-        peel_height_px = int(float(peel_height) / 25.4 * dpi)
-
-        peel_png = images_dir / f"{m_number} - 003.png"
-        if dry_run:
-            logging.info("[DRY RUN] Would export: %s", peel_png)
-        else:
-            # Use export_area="drawing" to include elements outside canvas
-            if _export_png(tmp_peel_path, peel_png, peel_width_px, peel_height_px, dpi, export_area="drawing"):
-                logging.info("Exported: %s", peel_png.name)
-        tmp_peel_path.unlink(missing_ok=True)
-    except FileNotFoundError:
-        pass  # Optional template
-
-    # Generate rear image (static, no graphic design needed)
+    elif results["dimensions"] and not dry_run:
+        logging.info("Exported: %s", dim_png.name)
+    # peel_and_stick template is optional
+    if results["peel_and_stick"] and not dry_run:
+        logging.info("Exported: %s", peel_png.name)
+
+    # Rear image is static (no graphic design): link the shared render from the raster store
+    rear_png = images_dir / f"{m_number} - 004.png"
     try:
-        rear_template = _load_template_svg(templates_dir, product.color, product.size, "rear", product.orientation)
-        with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp:
-            tmp_rear_path = Path(tmp.name)
-            tree = etree.ElementTree(rear_template)
-            tree.write(str(tmp_rear_path), encoding="utf-8", xml_declaration=True)
-
-        rear_png = images_dir / f"{m_number} - 004.png"
         if dry_run:
+            _resolve_template_path(templates_dir, product.color, product.size, "rear", product.orientation)
             logging.info("[DRY RUN] Would export: %s", rear_png)
         else:
-            if _export_png(tmp_rear_path, rear_png, width_px, height_px, dpi):
+            static_png = _static_raster(templates_dir, "rear", product.color, product.size,
+                                        product.orientation, ctx.dpi)
+            if static_png is not None:
+                link_or_copy(static_png, rear_png)
+                if RENDER_SETTINGS["derivatives"]:
+                    ensure_derivatives(rear_png)
+                logging.info("Exported: %s (shared)", rear_png.name)
+            elif _render_template_image(ctx, templates_dir, "rear", rear_png, inject_design=False):
                 logging.info("Exported: %s", rear_png.name)
-        tmp_rear_path.unlink(missing_ok=True)
     except FileNotFoundError:
         pass  # Optional template
 
     # Generate master design file
     if not dry_run:
-        _generate_master_design_file(product, templates_dir, icons, layout, m_folder)
+        with span("master_design"):
+            _generate_master_design_file(product, templates_dir, ctx.icons, ctx.layout, m_folder)
 
     return True
 
 
+class _BufferingHandler(logging.Handler):
+    """Collects log records in memory so a worker's output can be replayed in order."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Flatten message/args so the record pickles cleanly back to the parent
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        self.records.append(record)
+
+
+def _init_worker(tmp_root: str, render_settings: dict, cache_settings: Optional[tuple]) -> None:
+    """Process pool initializer: give each worker its own temp directory, renderer and cache."""
+    global _STATIC_SCRATCH
+    worker_tmp = Path(tmp_root) / f"worker-{os.getpid()}"
+    worker_tmp.mkdir(parents=True, exist_ok=True)
+    tempfile.tempdir = str(worker_tmp)
+    _STATIC_SCRATCH = None  # a forked worker must not share (or clean up) the parent's scratch store
+    _configure_renderer(**render_settings)
+    if cache_settings is not None:
+        _configure_render_cache(*cache_settings)
+    take_spans()  # forked workers start with a copy of the parent's spans, which the parent writes itself
+
+    # Forked workers inherit the parent's console/run.log handlers; records are
+    # buffered per product instead and emitted by the parent in CSV order.
+    logger = logging.getLogger()
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+
+
+def _process_product_worker(
+    product: ProductRow, options: dict, task=None
+) -> tuple[object, list[logging.LogRecord], dict, list[dict]]:
+    """Run task (_generate_product_images) in a pool worker, capturing its log output, cache stats and timings."""
+    handler = _BufferingHandler()
+    logger = logging.getLogger()
+    logger.addHandler(handler)
+    try:
+        with product_scope(product.m_number):
+            ok = (task or _generate_product_images)(product, **options)
+    except Exception as e:
+        logging.error("Error processing %s: %s", product.sku_parent, e)
+        ok = False
+    finally:
+        logger.removeHandler(handler)
+    cache_stats = _RENDER_CACHE.take_stats() if _RENDER_CACHE is not None else {}
+    return ok, handler.records, cache_stats, take_spans()
+
+
+def _run_products(
+    products: list[ProductRow],
+    options: dict,
+    jobs: int = 1,
+    on_done=None,
+    task=None,
+) -> tuple[int, int]:
+    """
+    Generate images for every product, serially or across a process pool.
+    task(product, **options) replaces _generate_product_images for other
+    per-product work (a falsy result counts as a failure).
+    on_done(product, result) is called in this process as each product finishes.
+    Returns (success_count, fail_count).
+    """
+    success_count = 0
+    fail_count = 0
+    on_done = on_done or (lambda product, ok: None)
+    task = task or _generate_product_images
+
+    if jobs <= 1 or len(products) <= 1:
+        for product in products:
+            try:
+                with product_scope(product.m_number):
+                    ok = task(product, **options)
+            except Exception as e:
+                logging.error("Error processing %s: %s", product.sku_parent, e)
+                ok = False
+            if ok:
+                success_count += 1
+            else:
+                fail_count += 1
+            on_done(product, ok)
+        return success_count, fail_count
+
+    jobs = min(jobs, len(products))
+    logging.info("Rendering %d products with %d worker processes", len(products), jobs)
+    tmp_root = tempfile.mkdtemp(prefix="signmaker-")
+    cache_settings = None
+    if _RENDER_CACHE is not None:
+        cache_settings = (_RENDER_CACHE.cache_dir, _RENDER_CACHE.enabled, _RENDER_CACHE.force)
+    logger = logging.getLogger()
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(tmp_root, dict(RENDER_SETTINGS), cache_settings)) as pool:
+            futures = [pool.submit(_process_product_worker, product, options, task) for product in products]
+            # Collect in submission order so each product's log lines stay grouped and ordered
+            for product, future in zip(products, futures):
+                try:
+                    ok, records, cache_stats, spans = future.result()
+                except Exception as e:
+                    logging.error("Error processing %s: %s", product.sku_parent, e)
+                    fail_count += 1
+                    on_done(product, False)
+                    continue
+                for record in records:
+                    logger.handle(record)
+                if _RENDER_CACHE is not None:
+                    _RENDER_CACHE.add_stats(cache_stats)
+                record_spans(spans)
+                if ok:
+                    success_count += 1
+                else:
+                    fail_count += 1
+                on_done(product, ok)
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+    return success_count, fail_count
+
+
+def _tune_product_scales(
+    product: ProductRow,
+    templates_dir: Path,
+    icons_dir: Path,
+    **_options,
+) -> Optional[dict]:
+    """
+    Render a product's auto-tune candidates (auto_tune.py) as design-only main
+    images at draft resolution, in one renderer batch, and score them.
+    Returns the winning scales and every candidate's score, or None if the
+    current scales could not be rendered.
+    """
+    from io import BytesIO
+    from PIL import Image
+    from auto_tune import candidate_scales, pick, score_layer
+    from layout_lint import icon_extent, lint_products, sign_edges
+
+    template_path = _resolve_template_path(templates_dir, product.color, product.size, "main", product.orientation)
+    layer_base = _design_layer_root(_parse_template_cached(template_path))
+    candidates: list[tuple[ProductRow, RenderContext]] = []
+    render_jobs = []
+    seen = set()
+    with span("auto_tune"):
+        for icon_scale, text_scale in candidate_scales(product.icon_scale, product.text_scale):
+            candidate = replace(product, icon_scale=icon_scale, text_scale=text_scale)
+            ctx = _build_render_context(candidate, templates_dir, icons_dir, dpi=DRAFT_DPI)
+            if ctx is None:
+                return None
+            # Text already at its width limit does not grow, so some candidates repeat a layout
+            layout_key = json.dumps(asdict(ctx.layout), sort_keys=True)
+            if layout_key in seen:
+                continue
+            seen.add(layout_key)
+            root = copy.deepcopy(layer_base)
+            _inject_graphic_design(root, candidate, ctx.icons, ctx.layout)
+            width_px, height_px, dpi = _clamp_export_size(ctx.width_px, ctx.height_px, ctx.dpi, DRAFT_MAX_DIMENSION)
+            render_jobs.append(RenderJob(root, width_px, height_px, dpi))
+            candidates.append((candidate, ctx))
+
+        # lint_products keys its results by m_number, so candidates are numbered
+        issues = lint_products([replace(c, m_number=str(i)) for i, (c, _) in enumerate(candidates)], templates_dir)
+        sign_box = sign_edges(product.size, product.orientation, product.color, templates_dir)
+        has_text = any((product.text_line_1, product.text_line_2, product.text_line_3))
+        scores = []
+        for i, ((candidate, ctx), job, png_bytes) in enumerate(
+                zip(candidates, render_jobs, _get_rasterizer().render_many(render_jobs))):
+            if png_bytes is None:
+                continue
+            with Image.open(BytesIO(png_bytes)) as img:
+                scored = score_layer(
+                    img.convert("RGBA"),
+                    px_per_mm=job.dpi / 25.4,
+                    sign_box=sign_box,
+                    circular=ctx.bounds.is_circular,
+                    icon_box=icon_extent(candidate, ctx.layout) if candidate.icon_files else None,
+                    has_text=has_text,
+                    icon_scale=candidate.icon_scale,
+                    text_scale=candidate.text_scale,
+                    lint_errors=sum(x.severity == "error" for x in issues[str(i)]),
+                )
+            if scored is not None:
+                scores.append(scored)
+    if not scores or (scores[0].icon_scale, scores[0].text_scale) != (product.icon_scale, product.text_scale):
+        logging.warning("Auto-tune %s: could not render the current scales", product.m_number)
+        return None
+    best = pick(scores)
+    return {
+        "icon_scale": best.icon_scale,
+        "text_scale": best.text_scale,
+        "score": best.score,
+        "current_score": scores[0].score,
+        "candidates": [asdict(s) for s in scores],
+    }
+
+
+def _update_product_rows(csv_path: Path, columns: tuple[str, ...], update) -> None:
+    """
+    Rewrite the products CSV with update(row) applied to every row, in place.
+    columns are added to the header if missing.
+    """
+    from io import StringIO
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        rows = list(reader)
+    for column in columns:
+        if column not in fieldnames:
+            fieldnames.append(column)
+    for row in rows:
+        update(row)
+    out = StringIO()
+    writer = csv.DictWriter(out, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+    write_atomic(csv_path, out.getvalue().encode("utf-8"))
+
+
+def _auto_tune_stage(
+    products: list[ProductRow],
+    csv_path: Path,
+    options: dict,
+    jobs: int,
+) -> dict[str, dict]:
+    """
+    Choose icon_scale/text_scale for each product from a grid of scored draft
+    candidates (see _tune_product_scales), across the process pool. Winning
+    scales are written back to the CSV and applied to products before they are
+    rendered; the scores go to exports/auto_tune.json. Returns {m_number: result}.
+    """
+    results: dict[str, dict] = {}
+
+    def on_done(product: ProductRow, result) -> None:
+        if result:
+            results[product.m_number] = result
+
+    logging.info("Auto-tune: scoring scale candidates for %d products", len(products))
+    _, failed = _run_products(products, options, jobs, on_done, task=_tune_product_scales)
+    changed: dict[str, tuple[float, float]] = {}
+    for product in products:
+        result = results.get(product.m_number)
+        if not result or (result["icon_scale"], result["text_scale"]) == (product.icon_scale, product.text_scale):
+            continue
+        logging.info("Auto-tune %s: icon_scale %.2f -> %.2f, text_scale %.2f -> %.2f (score %.3f -> %.3f)",
+                     product.m_number, product.icon_scale, result["icon_scale"], product.text_scale,
+                     result["text_scale"], result["current_score"], result["score"])
+        product.icon_scale, product.text_scale = result["icon_scale"], result["text_scale"]
+        changed[product.m_number] = (product.icon_scale, product.text_scale)
+    if changed:
+        def set_scales(row: dict) -> None:
+            scales = changed.get((row.get("m_number") or "").strip())
+            if scales:
+                row["icon_scale"], row["text_scale"] = (f"{v:g}" for v in scales)
+
+        try:
+            _update_product_rows(csv_path, ("icon_scale", "text_scale"), set_scales)
+        except OSError as e:
+            # The scales still apply to this run; only the CSV keeps the old ones
+            logging.warning("Could not write auto-tune scales to %s: %s", csv_path, e)
+    logging.info("Auto-tune: %d products scored, %d rescaled, %d failed", len(results), len(changed), failed)
+
+    report_path = options["exports_dir"] / "auto_tune.json"
+    try:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(report_path, json.dumps(results, indent=2).encode("utf-8"))
+    except OSError as e:
+        logging.warning("Could not write %s: %s", report_path, e)
+    return results
+
+
+def _main_image_path(exports_dir: Path, product: ProductRow, draft: bool = False) -> Path:
+    if draft:
+        return draft_path(exports_dir, product.m_number)
+    return _m_folder_path(exports_dir, product) / "002 Images" / f"{product.m_number} - 001.png"
+
+
+def _pixel_qa_product(
+    product: ProductRow,
+    templates_dir: Path,
+    icons_dir: Path,
+    exports_dir: Path,
+    draft: bool = False,
+    **_options,
+) -> Optional[dict]:
+    """
+    Check a product's rendered main image against its template background
+    (pixel_qa.py). Returns {"ok", "image", "metrics", "issues"}, or None if the
+    image or background is unavailable.
+    """
+    from PIL import Image
+    from layout_lint import sign_edges
+    from pixel_qa import check_image, text_boxes
+
+    image_path = _main_image_path(exports_dir, product, draft)
+    if not image_path.exists():
+        logging.warning("Pixel QA: no main image for %s", product.m_number)
+        return None
+    dpi = DRAFT_DPI if draft else 300
+    with span("pixel_qa"):
+        background_png = _static_raster(templates_dir, "main", product.color, product.size, product.orientation, dpi)
+        if background_png is None:
+            logging.warning("Pixel QA: no template background for %s", product.m_number)
+            return None
+        bounds = _get_sign_bounds(product.size, product.orientation)
+        layout = _calculate_layout(
+            bounds=bounds,
+            layout_mode=product.layout_mode,
+            num_icons=len(product.icon_files),
+            text_lines=[product.text_line_1, product.text_line_2, product.text_line_3],
+            font=product.font,
+            icon_scale=product.icon_scale,
+            text_scale=product.text_scale,
+            size=product.size,
+            orientation=product.orientation,
+        )
+        canvas_width_px, _ = _template_canvas_px(templates_dir, product.color, product.size, "main",
+                                                 product.orientation, dpi)
+        with Image.open(image_path) as img, Image.open(background_png) as background:
+            metrics, issues = check_image(
+                img,
+                background,
+                px_per_mm=img.width / (canvas_width_px / dpi * 25.4),
+                sign_box=sign_edges(product.size, product.orientation, product.color, templates_dir),
+                drawing_box=(bounds.x, bounds.y, bounds.x + bounds.width, bounds.y + bounds.height),
+                circular=bounds.is_circular,
+                texts=text_boxes(layout.text_elements, product.font),
+            )
+    return {
+        "ok": not any(x.severity == "error" for x in issues),
+        "image": str(image_path),
+        "metrics": metrics,
+        "issues": [vars(x) for x in issues],
+    }
+
+
+def _pixel_qa_stage(
+    products: list[ProductRow],
+    csv_path: Path,
+    options: dict,
+    jobs: int,
+) -> set[str]:
+    """
+    Run the pixel checks on every rendered product across the process pool and
+    merge the results into exports/pixel_qa.json. Products with errors are
+    auto-flagged in the CSV (qa_status "rejected", qa_comment AUTO_QA_PREFIX...);
+    pending rows only, and earlier auto-flags that now pass go back to pending.
+    Returns the flagged M numbers.
+    """
+    from pixel_qa import AUTO_QA_PREFIX, PixelIssue, flag_comment
+
+    results: dict[str, dict] = {}
+
+    def on_done(product: ProductRow, result) -> None:
+        if result:
+            results[product.m_number] = result
+
+    _run_products(products, options, jobs, on_done, task=_pixel_qa_product)
+    flags: dict[str, Optional[str]] = {}
+    for product in products:
+        result = results.get(product.m_number)
+        if result is None:
+            continue
+        comment = flag_comment([PixelIssue(**x) for x in result["issues"]])
+        flags[product.m_number] = comment
+        if comment:
+            logging.warning("Pixel QA %s: %s", product.m_number, comment)
+    flagged = {m for m, comment in flags.items() if comment}
+    logging.info("Pixel QA: %d checked, %d flagged", len(results), len(flagged))
+
+    def set_flag(row: dict) -> None:
+        m_number = (row.get("m_number") or "").strip()
+        if m_number not in flags:
+            return
+        status = (row.get("qa_status") or "pending").strip().lower()
+        auto_flagged = (row.get("qa_comment") or "").startswith(AUTO_QA_PREFIX)
+        if flags[m_number] and status == "pending":
+            row["qa_status"], row["qa_comment"] = "rejected", flags[m_number]
+        elif auto_flagged:
+            # Auto-flag from an earlier run: re-check result replaces it
+            row["qa_status"], row["qa_comment"] = ("rejected", flags[m_number]) if flags[m_number] else ("pending", "")
+
+    if flags:
+        try:
+            _update_product_rows(csv_path, ("qa_status", "qa_comment"), set_flag)
+        except OSError as e:
+            logging.warning("Could not write QA flags to %s: %s", csv_path, e)
+
+    report_path = options["exports_dir"] / "pixel_qa.json"
+    try:
+        report = json.loads(report_path.read_text(encoding="utf-8")) if report_path.exists() else {}
+    except ValueError:
+        report = {}
+    report.update(results)
+    try:
+        write_atomic(report_path, json.dumps(report, indent=2).encode("utf-8"))
+    except OSError as e:
+        logging.warning("Could not write %s: %s", report_path, e)
+    return flagged
+
+
+def _ai_review_stage(
+    products: list[ProductRow],
+    csv_path: Path,
+    options: dict,
+    jobs: int,
+    provider: str,
+    api_key: str,
+    max_iterations: int,
+    on_done=None,
+) -> dict[str, dict]:
+    """
+    Review rendered main images (ai_review.py) and re-render the products the
+    reviewer wants rescaled, for up to max_iterations review rounds. Between
+    rounds only main images are re-rendered; adjusted products get their full
+    image set once at the end. Adjusted scales are written back to the CSV,
+    and on_done(product, ok) is called for each final re-render (as in
+    _run_products). Verdicts are written to exports/ai_review.json.
+    Returns {m_number: verdict}.
+    """
+    from ai_review import adjusted_scales, review_images
+
+    exports_dir = options["exports_dir"]
+    draft = bool(options.get("draft"))
+    round_options = {**options, "main_only": True}
+    # A main-only run's round re-renders are its final outputs
+    round_done = on_done if options.get("main_only") else None
+    results: dict[str, dict] = {}
+    adjusted: dict[str, ProductRow] = {}
+    pending = list(products)
+    for round_num in range(1, max_iterations + 1):
+        verdicts = review_images([(p, _main_image_path(exports_dir, p, draft)) for p in pending],
+                                 provider, api_key, exports_dir)
+        rescale = []
+        for product in pending:
+            verdict = verdicts.get(product.m_number)
+            if verdict is None:
+                continue
+            results[product.m_number] = {**verdict, "rounds": round_num,
+                                         "final_icon_scale": product.icon_scale,
+                                         "final_text_scale": product.text_scale}
+            if not verdict.get("approved"):
+                logging.info("AI review %s (score %s): %s", product.m_number, verdict.get("score"),
+                             verdict.get("feedback"))
+            scales = None if verdict.get("approved") else adjusted_scales(product, verdict)
+            if scales and round_num < max_iterations:
+                product.icon_scale, product.text_scale = scales
+                adjusted[product.m_number] = product
+                rescale.append(product)
+        if not rescale:
+            break
+        logging.info("AI review round %d: re-rendering %d products with adjusted scales", round_num, len(rescale))
+        _run_products(rescale, round_options, jobs, round_done)
+        pending = rescale
+
+    if adjusted and not options.get("main_only") and not draft:
+        logging.info("AI review: rendering all images for %d rescaled products", len(adjusted))
+        _run_products(list(adjusted.values()), options, jobs, on_done)
+
+    if adjusted:
+        def set_scales(row: dict) -> None:
+            product = adjusted.get((row.get("m_number") or "").strip())
+            if product:
+                row["icon_scale"], row["text_scale"] = f"{product.icon_scale:g}", f"{product.text_scale:g}"
+
+        try:
+            _update_product_rows(csv_path, ("icon_scale", "text_scale"), set_scales)
+            logging.info("AI review: %d rescaled products written to %s", len(adjusted), csv_path)
+        except OSError as e:
+            logging.warning("Could not write AI review scales to %s: %s", csv_path, e)
+
+    report_path = exports_dir / "ai_review.json"
+    try:
+        write_atomic(report_path, json.dumps(results, indent=2).encode("utf-8"))
+    except OSError as e:
+        logging.warning("Could not write %s: %s", report_path, e)
+    return results
+
+
+def _product_inputs(product: ProductRow, templates_dir: Path, icons_dir: Path, options: dict) -> str:
+    """Hash everything a product's outputs depend on, for the run manifest."""
+    suffix = "_portrait" if product.orientation == "portrait" else ""
+    templates = sorted(templates_dir.glob(f"{product.color}_{product.size}{suffix}_*.svg"))
+    icons = [_find_icon_path(icons_dir, name) for name in product.icon_files]
+    layout_modes = templates_dir / "layout_modes.csv"
+    return inputs_digest(
+        product=asdict(product),
+        templates={t.name: file_digest(t) for t in templates},
+        icons=[file_digest(i) if i else None for i in icons],
+        layout_modes=file_digest(layout_modes) if layout_modes.exists() else None,
+        pipeline=RENDER_PIPELINE_VERSION,
+        font_metrics=metrics_signature(product.font),
+        settings={k: v for k, v in RENDER_SETTINGS.items() if k not in ("inkscape_shell", "inkscape_sessions")},
+        main_only=bool(options.get("main_only")),
+    )
+
+
+def _product_outputs(exports_dir: Path, product: ProductRow) -> list[Path]:
+    """Files a product's run produced: its numbered images and master design file."""
+    m_folder = _m_folder_path(exports_dir, product)
+    outputs = [m_folder / "002 Images" / f"{product.m_number} - {n:03d}.png" for n in range(1, 5)]
+    outputs.append(m_folder / "001 Design" / "001 MASTER FILE" / f"{product.m_number} MASTER FILE.svg")
+    return [p for p in outputs if p.exists()]
+
+
+def generate_from_csv(
+    csv_path: Path,
+    templates_dir: Path,
+    icons_dir: Path,
+    exports_dir: Path,
+    m_number: Optional[str] = None,
+    jobs: int = 1,
+    use_cache: bool = True,
+    force: bool = False,
+    resume: bool = False,
+    lint: Optional[str] = None,
+    auto_tune: bool = False,
+    pixel_qa: bool = True,
+    ai_review: bool = False,
+    ai_provider: str = "openai",
+    api_key: str = "",
+    max_ai_iterations: int = 3,
+    master_csv: Optional[Path] = None,
+    **options,
+) -> tuple[int, int]:
+    """
+    Generate images for every product in a CSV (or a single M number).
+    Used by main() and in-process by the web servers, which keep the
+    Inkscape shell pool warm between requests.
+    Unchanged images are reused from exports/.render_cache unless force is set.
+    Per-stage timings are appended to exports/metrics.jsonl and summarized in the log.
+    Each finished product is checkpointed in exports/.run_manifests/images.jsonl; with
+    resume, products completed with unchanged inputs and intact outputs are skipped
+    (and counted as successes).
+    lint="report" only checks layouts (layout_lint.py) and writes exports/layout_lint.json;
+    lint="skip" also renders, leaving out (and counting as failed) products that fail the lint.
+    With auto_tune, each product's icon/text scales are first chosen from scored
+    draft candidates (see _auto_tune_stage) and written back to the CSV.
+    With pixel_qa, rendered main images are checked locally and failing products
+    are auto-flagged in the CSV (see _pixel_qa_stage).
+    With ai_review, the remaining rendered main images are then reviewed (see
+    _ai_review_stage). Both are advisory and do not change the counts.
+    Scales and QA flags are written back to master_csv (default: csv_path); callers
+    that render from a filtered copy of products.csv pass products.csv here.
+    Returns (success_count, fail_count). Raises on unreadable CSV or unknown M number.
+    """
+    # Long-lived callers may have edited layout_modes.csv since the last run
+    _reload_layout_bounds()
+    _configure_render_cache(exports_dir / ".render_cache", enabled=use_cache, force=force)
+
+    master_csv = master_csv or csv_path
+
+    # Spans are kept per run: the web servers run concurrent generations in one process
+    with collect_spans() as spans:
+        with span("csv_parse"):
+            products = _read_products_csv(csv_path)
+        logging.info("Loaded %d products from CSV", len(products))
+
+        # Filter to specific M number if requested
+        if m_number:
+            products = [p for p in products if p.m_number == m_number]
+            if not products:
+                raise ValueError(f"M number {m_number} not found in CSV")
+            logging.info("Filtered to M number: %s", m_number)
+
+        lint_failed = 0
+        if lint:
+            from layout_lint import failed_products, lint_products, log_report, write_report
+
+            issues = lint_products(products, templates_dir)
+            report_path = exports_dir / "layout_lint.json"
+            log_report(issues, write_report(report_path, issues), report_path)
+            failing = failed_products(issues)
+            if lint == "report":
+                return len(products) - len(failing), len(failing)
+            products = [p for p in products if p.m_number not in failing]
+            lint_failed = len(failing)
+
+        if auto_tune and products:
+            if options.get("dry_run"):
+                logging.info("[DRY RUN] Skipping auto-tune")
+            else:
+                tune_options = {"templates_dir": templates_dir, "icons_dir": icons_dir, "exports_dir": exports_dir}
+                _auto_tune_stage(products, master_csv, tune_options, jobs)
+
+        manifest = None
+        inputs: dict[str, str] = {}
+        skipped = 0
+        if not options.get("dry_run") and not options.get("draft"):
+            manifest = RunManifest(exports_dir, "images")
+            inputs = {p.m_number: _product_inputs(p, templates_dir, icons_dir, options) for p in products}
+            if resume and force:
+                logging.warning("--force re-renders everything: ignoring --resume")
+            elif resume:
+                remaining = []
+                for product in products:
+                    if manifest.completed(product.m_number, inputs[product.m_number]):
+                        # Its finals are current, so a leftover QA draft is stale
+                        draft_path(exports_dir, product.m_number).unlink(missing_ok=True)
+                    else:
+                        remaining.append(product)
+                skipped = len(products) - len(remaining)
+                logging.info("Resume: %d products already complete, %d to run", skipped, len(remaining))
+                products = remaining
+
+        rendered: list[ProductRow] = []
+
+        def on_done(product: ProductRow, ok: bool) -> None:
+            if ok:
+                rendered.append(product)
+            if manifest is not None:
+                manifest.record(product.m_number, inputs[product.m_number], ok,
+                                _product_outputs(exports_dir, product) if ok else ())
+
+        if products and not any(options.get(o) for o in ("dry_run", "main_only", "draft")):
+            _prerender_static_rasters(products, templates_dir, refresh=force)
+
+        options = {
+            "templates_dir": templates_dir,
+            "icons_dir": icons_dir,
+            "exports_dir": exports_dir,
+            **options,
+        }
+        success_count, fail_count = _run_products(products, options, jobs, on_done)
+        counts = (success_count + skipped, fail_count + lint_failed)
+        if pixel_qa and rendered and not options.get("dry_run"):
+            flagged = _pixel_qa_stage(rendered, master_csv, options, jobs)
+            rendered = [p for p in rendered if p.m_number not in flagged]
+        if ai_review and rendered and not options.get("dry_run"):
+            def on_rerendered(product: ProductRow, ok: bool) -> None:
+                # Re-rendered with the reviewer's scales: checkpoint against the new inputs
+                if manifest is not None:
+                    inputs[product.m_number] = _product_inputs(product, templates_dir, icons_dir, options)
+                    manifest.record(product.m_number, inputs[product.m_number], ok,
+                                    _product_outputs(exports_dir, product) if ok else ())
+
+            _ai_review_stage(rendered, master_csv, options, jobs, ai_provider, api_key, max_ai_iterations,
+                             on_rerendered)
+
+    try:
+        write_spans(exports_dir / "metrics.jsonl", new_run_id(), spans)
+    except OSError as e:
+        logging.warning("Could not write metrics: %s", e)
+    log_summary(spans)
+    return counts
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate Amazon product images from templates")
     parser.add_argument("--csv", type=Path, default=Path("products.csv"), help="Input CSV file")
@@ -1439,13 +2585,52 @@ def main():
     parser.add_argument("--ai-review", action="store_true", help="Enable AI Vision review")
     parser.add_argument("--ai-provider", type=str, default="openai", choices=["openai", "claude"],
                         help="AI provider for review (default: openai)")
+    parser.add_argument("--no-pixel-qa", action="store_true",
+                        help="Skip the local pixel checks of rendered main images (exports/pixel_qa.json)")
+    parser.add_argument("--max-ai-iterations", type=int, default=3,
+                        help="AI review rounds: rescale and re-review rejected images up to this many times (default: 3)")
     parser.add_argument("--api-key", type=str, 
                         default=os.environ.get("OPENAI_API_KEY", os.environ.get("ANTHROPIC_API_KEY", "")),
                         help="API key (or set OPENAI_API_KEY or ANTHROPIC_API_KEY env var)")
     parser.add_argument("--main-only", action="store_true", 
                         help="Generate only the main image (001) for faster QA preview")
+    parser.add_argument("--lint", action="store_const", const="report", dest="lint",
+                        help="Check layouts for text overflow, overlaps, edge clearance and font floors "
+                             "without rendering; writes exports/layout_lint.json")
+    parser.add_argument("--lint-skip", action="store_const", const="skip", dest="lint",
+                        help="Lint first, then render only the products that pass")
+    parser.add_argument("--draft", action="store_true",
+                        help=f"QA draft: render only the main image at {DRAFT_DPI} DPI (max {DRAFT_MAX_DIMENSION}px) "
+                             f"to exports/{DRAFTS_DIRNAME}; finals in 002 Images are left untouched")
+    parser.add_argument("--auto-tune", action="store_true",
+                        help="Before rendering, pick each product's icon_scale/text_scale from a grid of scored "
+                             "draft candidates and write them back to the CSV")
     parser.add_argument("--m-number", type=str, default=None,
                         help="Process only a specific M number (e.g., M1220)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of products to render in parallel worker processes (default: 1)")
+    parser.add_argument("--composite", action="store_true",
+                        help="Render main/dimensions images as a cached template background plus a "
+                             "per-product design layer (checked against a full render once per template)")
+    parser.add_argument("--png-compression", type=int, choices=range(10), default=None, metavar="0-9",
+                        help="Re-encode PNGs at this zlib level (default: keep the renderer's encoding)")
+    parser.add_argument("--png-optimize", action="store_true",
+                        help="Re-encode PNGs with Pillow's optimize pass (smaller files, slower)")
+    parser.add_argument("--no-derivatives", action="store_true",
+                        help="Skip the Etsy/eBay JPEG and thumbnail derivatives (002 Images/derivatives)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render every image, ignoring the render cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the render cache entirely (no reads or writes)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip products a previous run completed (exports/.run_manifests/images.jsonl) "
+                             "whose inputs and outputs are unchanged; rerun failed or missing ones")
+    parser.add_argument("--renderer", type=str, default="inkscape", choices=sorted(RASTERIZERS),
+                        help="Rasterizer backend: inkscape (production) or resvg (in-process, for drafts)")
+    parser.add_argument("--inkscape-shell", action=argparse.BooleanOptionalAction, default=True,
+                        help="Render through warm 'inkscape --shell' sessions (default: on)")
+    parser.add_argument("--inkscape-sessions", type=int, default=1,
+                        help="Warm Inkscape sessions per process (default: 1)")
 
     args = parser.parse_args()
 
@@ -1457,9 +2642,15 @@ def main():
     logging.info("Icons: %s", args.icons)
     logging.info("Exports: %s", args.exports)
     logging.info("Dry run: %s", args.dry_run)
+    logging.info("Jobs: %d", args.jobs)
+    logging.info("Renderer: %s (Inkscape shell: %s, sessions: %d, composite: %s)",
+                 args.renderer, args.inkscape_shell, args.inkscape_sessions, args.composite)
     logging.info("AI review: %s (provider: %s)", args.ai_review, args.ai_provider if args.ai_review else "N/A")
     logging.info("=" * 60)
 
+    _configure_renderer(args.renderer, args.inkscape_shell, args.inkscape_sessions, args.composite,
+                        args.png_compression, args.png_optimize, not args.no_derivatives)
+
     # Validate directories
     if not args.templates.exists():
         logging.error("Templates directory not found: %s", args.templates)
@@ -1468,49 +2659,37 @@ def main():
         logging.error("Icons directory not found: %s", args.icons)
         sys.exit(1)
 
-    # Read products
     try:
-        products = _read_products_csv(args.csv)
+        success_count, fail_count = generate_from_csv(
+            args.csv,
+            args.templates,
+            args.icons,
+            args.exports,
+            m_number=args.m_number,
+            jobs=args.jobs,
+            dry_run=args.dry_run,
+            ai_review=args.ai_review,
+            ai_provider=args.ai_provider,
+            api_key=args.api_key,
+            max_ai_iterations=args.max_ai_iterations,
+            main_only=args.main_only,
+            draft=args.draft,
+            use_cache=not args.no_cache,
+            force=args.force,
+            resume=args.resume,
+            lint=args.lint,
+            auto_tune=args.auto_tune,
+            pixel_qa=not args.no_pixel_qa,
+        )
     except Exception as e:
-        logging.error("Failed to read CSV: %s", e)
+        logging.error("Failed to generate images: %s", e)
         sys.exit(1)
 
-    logging.info("Loaded %d products from CSV", len(products))
-
-    # Filter to specific M number if requested
-    if args.m_number:
-        products = [p for p in products if p.m_number == args.m_number]
-        if not products:
-            logging.error("M number %s not found in CSV", args.m_number)
-            sys.exit(1)
-        logging.info("Filtered to M number: %s", args.m_number)
-
-    # Process each product
-    success_count = 0
-    fail_count = 0
-
-    for product in products:
-        try:
-            if _generate_product_images(
-                product,
-                args.templates,
-                args.icons,
-                args.exports,
-                args.dry_run,
-                args.ai_review,
-                args.ai_provider,
-                args.api_key,
-                main_only=args.main_only,
-            ):
-                success_count += 1
-            else:
-                fail_count += 1
-        except Exception as e:
-            logging.error("Error processing %s: %s", product.sku_parent, e)
-            fail_count += 1
-
     logging.info("=" * 60)
     logging.info("Completed: %d success, %d failed", success_count, fail_count)
+    if _RENDER_CACHE is not None and _RENDER_CACHE.enabled:
+        logging.info("Render cache: %d hits, %d misses%s", _RENDER_CACHE.hits, _RENDER_CACHE.misses,
+                     " (--force)" if _RENDER_CACHE.force else "")
     logging.info("=" * 60)
 
     sys.exit(0 if fail_count == 0 else 1)
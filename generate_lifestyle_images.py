@@ -12,10 +12,14 @@ import io
 import logging
 import os
 from pathlib import Path
+from typing import Optional
 
 from openai import OpenAI
 from PIL import Image
 
+from render_cache import file_digest
+from run_manifest import RunManifest, inputs_digest
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -199,6 +203,8 @@ def generate_lifestyle_for_product(
     sign_text: str,
     api_key: str,
     force: bool = False,
+    manifest: Optional[RunManifest] = None,
+    resume: bool = False,
 ) -> Path | None:
     """
     Generate a lifestyle image for a product in its M folder.
@@ -208,6 +214,9 @@ def generate_lifestyle_for_product(
         sign_text: Text on the sign
         api_key: OpenAI API key
         force: If True, regenerate even if file exists
+        manifest: Run manifest to checkpoint the result in
+        resume: Skip only if the manifest shows this product done with the same
+            main image and sign text; regenerate if either changed
         
     Returns:
         Path to generated lifestyle image, or None if failed
@@ -229,15 +238,26 @@ def generate_lifestyle_for_product(
     # Output path for lifestyle image
     lifestyle_path = images_dir / f"{m_number} - 005.png"
     
+    inputs = inputs_digest(main_image=file_digest(main_image), sign_text=sign_text,
+                           scene=get_scene_prompt(sign_text), model="dall-e-3")
+    if manifest is not None and resume and not force:
+        if manifest.completed(m_number, inputs):
+            logging.info("Skipping %s: completed in a previous run (--resume)", m_number)
+            return lifestyle_path
+        if m_number in manifest.entries:
+            force = True  # recorded, but the main image or sign text changed (or the output was damaged)
+    
     # Skip if file already exists (unless force=True)
     if lifestyle_path.exists() and not force:
         logging.info("Skipping %s: lifestyle image already exists (use --force to regenerate)", m_number)
+        if manifest is not None:
+            manifest.record(m_number, inputs, True, [lifestyle_path])
         return lifestyle_path
     
-    if generate_lifestyle_image_dalle(main_image, sign_text, api_key, lifestyle_path):
-        return lifestyle_path
-    
-    return None
+    ok = generate_lifestyle_image_dalle(main_image, sign_text, api_key, lifestyle_path)
+    if manifest is not None:
+        manifest.record(m_number, inputs, ok, [lifestyle_path])
+    return lifestyle_path if ok else None
 
 
 def read_lifestyle_products_from_csv(csv_path: Path, require_approved: bool = True) -> dict[str, dict]:
@@ -285,7 +305,11 @@ def main():
     parser.add_argument("--sign-text", type=str, help="Sign text for context")
     parser.add_argument("--force", action="store_true", help="Regenerate even if file exists")
     parser.add_argument("--skip-qa-check", action="store_true", help="Skip qa_status='approved' requirement")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip products a previous run completed (exports/.run_manifests/lifestyle.jsonl) "
+                             "and regenerate those whose main image or sign text changed")
     args = parser.parse_args()
+    manifest = RunManifest(args.exports, "lifestyle")
     
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
@@ -309,7 +333,8 @@ def main():
                 logging.info("Skipping %s: not eligible for lifestyle image (use --force to override)", args.m_number)
                 return 0
         
-        result = generate_lifestyle_for_product(m_folder, sign_text, api_key, force=args.force)
+        result = generate_lifestyle_for_product(m_folder, sign_text, api_key, force=args.force,
+                                                manifest=manifest, resume=args.resume)
         if result:
             logging.info("Generated: %s", result)
         else:
@@ -342,7 +367,8 @@ def main():
             
             logging.info("Processing %s (%s)...", m_number, sign_text)
             
-            result = generate_lifestyle_for_product(m_folder, sign_text, api_key, force=args.force)
+            result = generate_lifestyle_for_product(m_folder, sign_text, api_key, force=args.force,
+                                                    manifest=manifest, resume=args.resume)
             if result:
                 success += 1
             else:
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Channel image derivatives.
+
+generate_images_v2 writes every product image once as the Amazon PNG and,
+from the same in-memory raster, the declared derivative set below into
+"002 Images/derivatives", recorded in a manifest.json. Uploaders and fixers
+look derivatives up here instead of decoding and converting PNGs again.
+
+Manifest layout:
+    {"images": {"M1234 - 001.png": {
+        "source": {"size": 123456, "mtime_ns": 1700000000000000000},
+        "amazon_png": "M1234 - 001.png",
+        "derivatives": {"marketplace_jpeg": {"file": "M1234 - 001.jpg", "width": 3000, "height": 2000}, ...}
+    }}}
+"""
+
+import io
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from rasterizers import write_atomic
+
+DERIVATIVES_DIRNAME = "derivatives"
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass(frozen=True)
+class DerivativeSpec:
+    """One derived output: format, file suffix and optional size cap."""
+    name: str
+    suffix: str  # replaces ".png" on the source file name
+    format: str
+    max_dimension: Optional[int] = None
+    quality: int = 85
+
+
+# Amazon takes the rendered PNG itself; everything else is derived from it
+DERIVATIVE_SPECS = (
+    # Etsy / eBay: baseline JPEG flattened on white, no ICC profile (Shop Uploader rejects some)
+    DerivativeSpec("marketplace_jpeg", ".jpg", "JPEG"),
+    # Web thumbnail for the QA grid and listings previews
+    DerivativeSpec("thumbnail", ".thumb.jpg", "JPEG", max_dimension=400, quality=80),
+)
+
+
+def derivatives_dir(png_path: Path) -> Path:
+    return Path(png_path).parent / DERIVATIVES_DIRNAME
+
+
+def _source_stamp(png_path: Path) -> dict:
+    stat = Path(png_path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_manifest(images_dir: Path) -> dict:
+    """Read an M folder's derivative manifest (empty if missing or unreadable)."""
+    manifest_path = Path(images_dir) / DERIVATIVES_DIRNAME / MANIFEST_NAME
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"images": {}}
+
+
+def _save_manifest(images_dir: Path, manifest: dict) -> None:
+    manifest_path = Path(images_dir) / DERIVATIVES_DIRNAME / MANIFEST_NAME
+    write_atomic(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+
+def flatten_on_white(img: Image.Image, background_color=(255, 255, 255)) -> Image.Image:
+    """Composite transparency onto a solid background and return an RGB image."""
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, background_color)
+        background.paste(img, mask=img.split()[3])
+        return background
+    return img.convert("RGB")
+
+
+def write_derivatives(png_path: Path, png_bytes: bytes) -> dict:
+    """
+    Write the derivative set for a freshly written PNG from its encoded bytes
+    (decoded once, in memory) and record it in the manifest. Returns the entry.
+    """
+    png_path = Path(png_path)
+    out_dir = derivatives_dir(png_path)
+    out_dir.mkdir(exist_ok=True)
+
+    with Image.open(io.BytesIO(png_bytes)) as img:
+        flat = flatten_on_white(img)
+
+    entry = {"source": _source_stamp(png_path), "amazon_png": png_path.name, "derivatives": {}}
+    for spec in DERIVATIVE_SPECS:
+        out = flat
+        if spec.max_dimension and max(out.size) > spec.max_dimension:
+            out = out.copy()
+            out.thumbnail((spec.max_dimension, spec.max_dimension), Image.LANCZOS)
+        buf = io.BytesIO()
+        out.save(buf, spec.format, quality=spec.quality, optimize=True)
+        file_name = png_path.name[: -len(png_path.suffix)] + spec.suffix
+        write_atomic(out_dir / file_name, buf.getvalue())
+        entry["derivatives"][spec.name] = {"file": file_name, "width": out.width, "height": out.height}
+
+    manifest = load_manifest(png_path.parent)
+    manifest["images"][png_path.name] = entry
+    _save_manifest(png_path.parent, manifest)
+    return entry
+
+
+def _current_entry(png_path: Path, manifest: dict) -> Optional[dict]:
+    """Manifest entry for png_path if it still matches the PNG on disk and its files exist."""
+    entry = manifest.get("images", {}).get(png_path.name)
+    if not entry or entry.get("source") != _source_stamp(png_path):
+        return None
+    out_dir = derivatives_dir(png_path)
+    if not all((out_dir / d["file"]).exists() for d in entry["derivatives"].values()):
+        return None
+    return entry
+
+
+def ensure_derivatives(png_path: Path) -> bool:
+    """Bring a PNG's derivatives up to date (e.g. after a render cache hit). Returns True if written."""
+    png_path = Path(png_path)
+    if _current_entry(png_path, load_manifest(png_path.parent)) is not None:
+        return False
+    write_derivatives(png_path, png_path.read_bytes())
+    return True
+
+
+def find_derivative(png_path: Path, name: str) -> Optional[Path]:
+    """Path of a current derivative of png_path, or None if missing or stale."""
+    png_path = Path(png_path)
+    try:
+        entry = _current_entry(png_path, load_manifest(png_path.parent))
+    except OSError as e:
+        logging.debug("No derivatives for %s: %s", png_path.name, e)
+        return None
+    if entry is None or name not in entry["derivatives"]:
+        return None
+    return derivatives_dir(png_path) / entry["derivatives"][name]["file"]
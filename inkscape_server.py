@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Persistent Inkscape render server.
+
+Keeps a pool of warm `inkscape --shell` sessions and sends them export
+commands over stdin, so each PNG no longer pays for Inkscape's startup and
+font-cache scan. Sessions are health-checked before use, restarted when they
+crash, and killed when a single export runs past its timeout.
+
+Usage:
+    pool = get_render_pool(size=2)
+    png_bytes = pool.render(svg_bytes, width_px, height_px, dpi=300)
+    results = pool.render_many([(svg_bytes, width_px, height_px, 300, "page"), ...])
+
+The shell only reads documents from disk, so each session owns scratch
+SVG/PNG files that it overwrites on every render; callers never see a file.
+A batch (e.g. all of one product's images) goes out as a single command line.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+INKSCAPE_BIN = os.environ.get("INKSCAPE_BIN", "inkscape")
+SHELL_PROMPT = b"> "
+STARTUP_TIMEOUT = 60  # seconds - first start includes the font cache scan
+EXPORT_TIMEOUT = 60  # seconds per export
+PING_TIMEOUT = 5  # seconds for the health check round trip
+MAX_EXPORTS_PER_SESSION = 250  # recycle sessions to bound Inkscape's memory growth
+
+
+class InkscapeShellError(RuntimeError):
+    """Raised when a shell session crashes, hangs or fails an export."""
+
+
+def _export_actions(svg_path: Path, png_path: Path, width_px: int, height_px: int, dpi: float, export_area: str) -> list[str]:
+    """Shell actions that open one document, export it and close it again."""
+    # Export settings persist between documents in shell mode, so every
+    # option is set explicitly on each call (width/height 0 = unset).
+    actions = [
+        f"file-open:{svg_path}",
+        "export-type:png",
+        f"export-filename:{png_path}",
+        f"export-dpi:{dpi}",
+    ]
+    if export_area == "drawing":
+        actions += ["export-area-drawing", "export-width:0", "export-height:0"]
+    else:
+        actions += ["export-area-page", f"export-width:{width_px}", f"export-height:{height_px}"]
+    return actions + ["export-do", "file-close"]
+
+
+class InkscapeShell:
+    """A single long-lived `inkscape --shell` process."""
+
+    def __init__(self, inkscape_bin: str = INKSCAPE_BIN, startup_timeout: float = STARTUP_TIMEOUT):
+        self.inkscape_bin = inkscape_bin
+        self.startup_timeout = startup_timeout
+        self.proc: Optional[subprocess.Popen] = None
+        self.exports = 0
+        self.scratch_dir: Optional[Path] = None
+        self._stdout: queue.Queue = queue.Queue()
+        self._stderr_tail: deque = deque(maxlen=20)
+
+    def start(self) -> None:
+        """Launch the process and wait for the first prompt."""
+        if self.scratch_dir is None:
+            self.scratch_dir = Path(tempfile.mkdtemp(prefix="inkscape-shell-"))
+        try:
+            self.proc = subprocess.Popen(
+                [self.inkscape_bin, "--shell"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=0,
+            )
+        except FileNotFoundError as e:
+            raise InkscapeShellError(f"Inkscape not found: {self.inkscape_bin}") from e
+
+        self._stdout = queue.Queue()
+        self._stderr_tail.clear()
+        threading.Thread(target=self._pump_stdout, args=(self.proc.stdout, self._stdout), daemon=True).start()
+        threading.Thread(target=self._pump_stderr, args=(self.proc.stderr,), daemon=True).start()
+        try:
+            self._wait_for_prompt(self.startup_timeout)
+        except InkscapeShellError:
+            self.proc.kill()
+            raise
+        logging.debug("Started Inkscape shell session (pid %s)", self.proc.pid)
+
+    @staticmethod
+    def _pump_stdout(stream, out: queue.Queue) -> None:
+        """Forward raw stdout chunks; the prompt is not newline-terminated."""
+        while True:
+            chunk = stream.read(4096)
+            if not chunk:
+                out.put(None)
+                return
+            out.put(chunk)
+
+    def _pump_stderr(self, stream) -> None:
+        """Drain stderr so the pipe never fills, keeping the tail for error messages."""
+        for line in iter(stream.readline, b""):
+            self._stderr_tail.append(line.decode("utf-8", "replace").rstrip())
+
+    def _wait_for_prompt(self, timeout: float) -> str:
+        """Read output until the shell prompt appears. Returns the output before it."""
+        buf = b""
+        deadline = time.monotonic() + timeout
+        while not buf.endswith(SHELL_PROMPT):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise InkscapeShellError(f"Inkscape shell timed out after {timeout:.0f}s")
+            try:
+                chunk = self._stdout.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                raise InkscapeShellError(f"Inkscape shell exited: {self.stderr_tail()}")
+            buf += chunk
+        return buf[: -len(SHELL_PROMPT)].decode("utf-8", "replace")
+
+    def stderr_tail(self) -> str:
+        return " | ".join(self._stderr_tail) or "no stderr output"
+
+    def is_alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def command(self, line: str, timeout: float = EXPORT_TIMEOUT) -> str:
+        """Send one line of actions and wait for the shell to return to its prompt."""
+        if not self.is_alive():
+            raise InkscapeShellError("Inkscape shell is not running")
+        try:
+            self.proc.stdin.write(line.encode("utf-8") + b"\n")
+            self.proc.stdin.flush()
+        except OSError as e:
+            raise InkscapeShellError(f"Inkscape shell stdin closed: {e}") from e
+        return self._wait_for_prompt(timeout)
+
+    def ping(self) -> bool:
+        """Health check: the session is alive and answers an empty command."""
+        if not self.is_alive():
+            return False
+        try:
+            self.command("", timeout=PING_TIMEOUT)
+            return True
+        except InkscapeShellError:
+            return False
+
+    def export(
+        self,
+        svg_path: Path,
+        png_path: Path,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+        timeout: float = EXPORT_TIMEOUT,
+    ) -> None:
+        """Export one SVG to PNG. Raises InkscapeShellError on failure."""
+        Path(png_path).unlink(missing_ok=True)
+        output = self.command("; ".join(_export_actions(svg_path, png_path, width_px, height_px, dpi, export_area)),
+                              timeout=timeout)
+        self.exports += 1
+        if not Path(png_path).exists():
+            raise InkscapeShellError(f"No PNG written for {Path(svg_path).name}: {output.strip() or self.stderr_tail()}")
+
+    def render(
+        self,
+        svg_bytes: bytes,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+        timeout: float = EXPORT_TIMEOUT,
+    ) -> bytes:
+        """Render SVG bytes to PNG bytes via this session's scratch files."""
+        svg_path = self.scratch_dir / "scratch.svg"
+        png_path = self.scratch_dir / "scratch.png"
+        svg_path.write_bytes(svg_bytes)
+        self.export(svg_path, png_path, width_px, height_px, dpi, export_area, timeout)
+        return png_path.read_bytes()
+
+    def render_many(self, items: list[tuple], timeout: float = EXPORT_TIMEOUT) -> list[Optional[bytes]]:
+        """
+        Render several (svg_bytes, width_px, height_px, dpi, export_area) items
+        with one command line. Returns PNG bytes per item, None where no PNG
+        was written. Raises InkscapeShellError if the session fails.
+        """
+        actions = []
+        png_paths = []
+        for i, (svg_bytes, width_px, height_px, dpi, export_area) in enumerate(items):
+            svg_path = self.scratch_dir / f"scratch-{i}.svg"
+            png_path = self.scratch_dir / f"scratch-{i}.png"
+            svg_path.write_bytes(svg_bytes)
+            png_path.unlink(missing_ok=True)
+            actions += _export_actions(svg_path, png_path, width_px, height_px, dpi, export_area)
+            png_paths.append(png_path)
+
+        self.command("; ".join(actions), timeout=timeout * len(items))
+        self.exports += len(items)
+        return [path.read_bytes() if path.exists() else None for path in png_paths]
+
+    def close(self) -> None:
+        """Ask the shell to quit, killing it if it does not exit promptly."""
+        if self.scratch_dir is not None:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+            self.scratch_dir = None
+        if self.proc is None:
+            return
+        if self.is_alive():
+            try:
+                self.proc.stdin.write(b"quit\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+        self.proc = None
+
+
+class InkscapeShellPool:
+    """Thread-safe pool of warm Inkscape shell sessions."""
+
+    def __init__(
+        self,
+        size: int = 1,
+        inkscape_bin: str = INKSCAPE_BIN,
+        export_timeout: float = EXPORT_TIMEOUT,
+        max_exports_per_session: int = MAX_EXPORTS_PER_SESSION,
+    ):
+        self.size = max(1, size)
+        self.inkscape_bin = inkscape_bin
+        self.export_timeout = export_timeout
+        self.max_exports_per_session = max_exports_per_session
+        self._idle: list[InkscapeShell] = []
+        # Guards _idle and _created; notified whenever a session goes idle or a slot frees up
+        self._available = threading.Condition()
+        self._created = 0
+        self._closed = False
+
+    def _new_session(self) -> InkscapeShell:
+        shell = InkscapeShell(self.inkscape_bin)
+        shell.start()
+        return shell
+
+    def _acquire(self) -> InkscapeShell:
+        """Take an idle session, start a new one if under size, else wait for either."""
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self._new_session()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, shell: InkscapeShell) -> None:
+        """Return a session to the pool, retiring dead or worn-out ones."""
+        if self._closed or not shell.is_alive() or shell.exports >= self.max_exports_per_session:
+            shell.close()
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            return
+        with self._available:
+            self._idle.append(shell)
+            self._available.notify()
+
+    def _ensure_healthy(self, shell: InkscapeShell) -> InkscapeShell:
+        """Restart a session that crashed or stopped answering since last use."""
+        if shell.ping():
+            return shell
+        logging.warning("Inkscape shell session unresponsive, restarting (%s)", shell.stderr_tail())
+        shell.close()
+        shell.start()
+        return shell
+
+    def render(
+        self,
+        svg_bytes: bytes,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+    ) -> Optional[bytes]:
+        """Render via a warm session, restarting and retrying once on crash or timeout."""
+        for attempt in (1, 2):
+            shell = self._acquire()
+            try:
+                shell = self._ensure_healthy(shell)
+                return shell.render(svg_bytes, width_px, height_px, dpi, export_area, self.export_timeout)
+            except InkscapeShellError as e:
+                logging.warning("Inkscape shell export failed (attempt %d): %s", attempt, e)
+                # Kill the session so _release retires it; a fresh one replaces it on demand
+                if shell.proc is not None:
+                    shell.proc.kill()
+            finally:
+                self._release(shell)
+        return None
+
+    def render_many(self, items: list[tuple]) -> Optional[list[Optional[bytes]]]:
+        """
+        Render a batch of (svg_bytes, width_px, height_px, dpi, export_area) items
+        in one round trip on one session, retrying once on crash or timeout.
+        Returns per-item PNG bytes (None where that export failed), or None if
+        the session failed both times.
+        """
+        for attempt in (1, 2):
+            shell = self._acquire()
+            try:
+                shell = self._ensure_healthy(shell)
+                return shell.render_many(items, self.export_timeout)
+            except InkscapeShellError as e:
+                logging.warning("Inkscape shell batch of %d failed (attempt %d): %s", len(items), attempt, e)
+                if shell.proc is not None:
+                    shell.proc.kill()
+            finally:
+                self._release(shell)
+        return None
+
+    def close(self) -> None:
+        """Shut down all idle sessions."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._available.notify_all()
+        for shell in idle:
+            shell.close()
+
+
+_POOL: Optional[InkscapeShellPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _forget_pool_in_child() -> None:
+    """A forked worker must not share the parent's sessions (their pipes belong to the parent)."""
+    global _POOL, _POOL_LOCK
+    _POOL = None
+    _POOL_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool_in_child)
+
+
+def get_render_pool(size: int = 1) -> InkscapeShellPool:
+    """Return the process-wide session pool, creating it on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = InkscapeShellPool(size=size)
+            atexit.register(_POOL.close)
+        return _POOL
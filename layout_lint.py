@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Pre-render layout linter.
+
+Computes every product's layout with the same code the renderer uses
+(generate_images_v2._calculate_layout), packs the resulting geometry into
+arrays and checks the whole catalog at once, before anything is rendered:
+
+  text_overflow    estimated text extent wider or taller than its box
+                   (the layout_modes.csv text box, else the sign's inner area)
+  missing_box      a text line the layout has no place for (never drawn)
+  out_of_bounds    icon or text extends past the edge of the sign
+  edge_clearance   icon or text closer than MIN_EDGE_CLEARANCE_MM to the edge
+  overlap          icon and text, or two text lines, intersect
+  font_floor       font size below MIN_FONT_SIZE (unreadable when printed)
+
+Text extents come from the font's glyph metrics (text_metrics.py), or an
+estimate where the font is not installed; TEXT_TOLERANCE_MM absorbs small
+errors. Only "error" issues fail a row. The report is JSON:
+
+    {"summary": {"products": 500, "failed": 12, "issues": {"overlap": 9, ...}},
+     "products": [{"m_number": "M1075", "ok": false, "issues": [{"check": "overlap", ...}]}, ...]}
+
+Usage:
+    python layout_lint.py --csv products.csv [--output exports/layout_lint.json]
+    python generate_images_v2.py --csv products.csv --lint         # report only
+    python generate_images_v2.py --csv products.csv --lint-skip    # render passing rows
+"""
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+import generate_images_v2
+from generate_images_v2 import (
+    PROHIBITION_STROKE_WIDTH,
+    ProductRow,
+    _calculate_layout,
+    _get_sign_bounds,
+    _read_products_csv,
+)
+from compile_templates import template_sign_outline
+from text_metrics import CSS_MM, font_metrics
+
+TEMPLATES_DIR = Path("assets")
+
+MIN_FONT_SIZE = 2.0
+MIN_EDGE_CLEARANCE_MM = 2.0
+TEXT_TOLERANCE_MM = 1.0
+OVERLAP_TOLERANCE_MM = 0.5
+MAX_TEXT_LINES = 3
+
+
+@dataclass
+class LintIssue:
+    check: str
+    severity: str  # "error" fails the row, "warning" is reported only
+    element: str  # "icon", "text_1"...
+    message: str
+
+
+def sign_edges(
+    size: str,
+    orientation: str = "landscape",
+    color: str = "silver",
+    templates_dir: Path = TEMPLATES_DIR,
+) -> tuple[float, float, float, float]:
+    """
+    The sign's physical outline as (x0, y0, x1, y1) in mm, measured from its
+    main template (compile_templates.template_sign_outline). Falls back to the
+    drawing area from _get_sign_bounds, which is inset from the edge, when
+    there is no such template.
+    """
+    suffix = "_portrait" if orientation == "portrait" else ""
+    template_path = Path(templates_dir) / f"{color}_{size}{suffix}_main.svg"
+    outline = template_sign_outline(template_path) if template_path.exists() else None
+    if outline is not None:
+        return outline
+    bounds = _get_sign_bounds(size, orientation)
+    return (bounds.x, bounds.y, bounds.x + bounds.width, bounds.y + bounds.height)
+
+
+def icon_extent(product: ProductRow, layout) -> tuple[float, float, float, float]:
+    """Box the icon occupies, (x0, y0, x1, y1) in mm, including any prohibition overlay."""
+    box = (layout.icon_x, layout.icon_y, layout.icon_x + layout.icon_width, layout.icon_y + layout.icon_height)
+    if product.sign_type != "prohibition":
+        return box
+    # Overlay circle (see _add_prohibition_overlay), stroke centred on the radius
+    cx, cy = layout.icon_x + layout.icon_width / 2, layout.icon_y + layout.icon_height / 2
+    r = min(layout.icon_width, layout.icon_height) / 2 * 1.1 + PROHIBITION_STROKE_WIDTH * CSS_MM / 2
+    return (min(box[0], cx - r), min(box[1], cy - r), max(box[2], cx + r), max(box[3], cy + r))
+
+
+def _layout_arrays(products: list[ProductRow], templates_dir: Path = TEMPLATES_DIR) -> dict[str, np.ndarray]:
+    """
+    Lay out every product and pack the geometry as arrays, one row per product:
+    boxes are (x0, y0, x1, y1) in mm, text arrays have one slot per text line.
+    """
+    n = len(products)
+    sign = np.zeros((n, 4))
+    circular = np.zeros(n, dtype=bool)
+    icon = np.full((n, 4), np.nan)
+    anchor = np.full((n, MAX_TEXT_LINES, 2), np.nan)  # text x (centre), baseline y
+    font = np.full((n, MAX_TEXT_LINES), np.nan)
+    slot = np.full((n, MAX_TEXT_LINES, 4), np.nan)  # box each line must fit
+    width_em = np.zeros((n, MAX_TEXT_LINES))
+    cap_em = np.zeros(n)
+    descent_em = np.zeros(n)
+    descends = np.zeros((n, MAX_TEXT_LINES), dtype=bool)
+    dropped = np.zeros((n, MAX_TEXT_LINES), dtype=bool)
+
+    for i, p in enumerate(products):
+        bounds = _get_sign_bounds(p.size, p.orientation)
+        lines = [t for t in (p.text_line_1, p.text_line_2, p.text_line_3) if t]
+        layout = _calculate_layout(
+            bounds=bounds,
+            layout_mode=p.layout_mode,
+            num_icons=len(p.icon_files),
+            text_lines=[p.text_line_1, p.text_line_2, p.text_line_3],
+            font=p.font,
+            icon_scale=p.icon_scale,
+            text_scale=p.text_scale,
+            size=p.size,
+            orientation=p.orientation,
+        )
+        sign[i] = sign_edges(p.size, p.orientation, p.color, templates_dir)
+        circular[i] = bounds.is_circular
+        if p.icon_files:
+            icon[i] = icon_extent(p, layout)
+        metrics = font_metrics(p.font)
+        cap_em[i], descent_em[i] = metrics.cap_height, metrics.descent
+
+        csv_boxes = [_text_box(p, j) for j in range(MAX_TEXT_LINES)]
+        # Elements come in line order, skipping lines the layout has no place for;
+        # match by position so repeated lines are not mistaken for each other
+        drawn = layout.text_elements
+        k = 0
+        for j, line in enumerate(lines[:MAX_TEXT_LINES]):
+            if k >= len(drawn) or drawn[k]["text"] != line:
+                dropped[i, j] = True
+                continue
+            element = drawn[k]
+            k += 1
+            anchor[i, j] = (element["x"], element["y"])
+            font[i, j] = element["font_size"]
+            width_em[i, j] = metrics.width(line)
+            descends[i, j] = any(c.islower() for c in line)
+            box = csv_boxes[j]
+            slot[i, j] = box if box is not None else (bounds.inner_x, bounds.inner_y,
+                                                      bounds.inner_x + bounds.inner_width,
+                                                      bounds.inner_y + bounds.inner_height)
+
+    # Estimated ink box of each text line (anchor is middle / baseline)
+    em = font * CSS_MM
+    width = width_em * em
+    text = np.stack([
+        anchor[..., 0] - width / 2,
+        anchor[..., 1] - em * cap_em[:, None],
+        anchor[..., 0] + width / 2,
+        anchor[..., 1] + np.where(descends, em * descent_em[:, None], 0.0),
+    ], axis=-1)
+    return {"sign": sign, "circular": circular, "icon": icon, "text": text,
+            "slot": slot, "font": font, "dropped": dropped}
+
+
+def _text_box(product: ProductRow, index: int):
+    """The layout_modes.csv box for text line index, or None (fallback layouts use the sign area)."""
+    key = ("main", product.size, product.orientation, product.layout_mode, f"text_{index + 1}")
+    tb = generate_images_v2._layout_bounds().get(key)
+    if tb is None:
+        return None
+    return (tb["x"], tb["y"], tb["x"] + tb["width"], tb["y"] + tb["height"])
+
+
+def _clearance(boxes: np.ndarray, sign: np.ndarray, circular: np.ndarray) -> np.ndarray:
+    """Distance (mm) from each box to the sign edge: negative when the box sticks out."""
+    sign = sign[:, None, :]
+    rect = np.min(np.stack([
+        boxes[..., 0] - sign[..., 0], boxes[..., 1] - sign[..., 1],
+        sign[..., 2] - boxes[..., 2], sign[..., 3] - boxes[..., 3],
+    ]), axis=0)
+    # Circular signs: the farthest corner must stay inside the circle
+    cx, cy = (sign[..., 0] + sign[..., 2]) / 2, (sign[..., 1] + sign[..., 3]) / 2
+    radius = np.minimum(sign[..., 2] - sign[..., 0], sign[..., 3] - sign[..., 1]) / 2
+    dx = np.maximum(np.abs(boxes[..., 0] - cx), np.abs(boxes[..., 2] - cx))
+    dy = np.maximum(np.abs(boxes[..., 1] - cy), np.abs(boxes[..., 3] - cy))
+    circle = radius - np.hypot(dx, dy)
+    return np.where(circular[:, None], circle, rect)
+
+
+def _overlap(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Width and height of the intersection of boxes a and b (<= 0: no overlap)."""
+    return np.minimum(a[..., 2:], b[..., 2:]) - np.maximum(a[..., :2], b[..., :2])
+
+
+def lint_products(products: list[ProductRow], templates_dir: Path = TEMPLATES_DIR) -> dict[str, list[LintIssue]]:
+    """Lint every product's layout. Returns {m_number: [LintIssue, ...]} (empty list: clean)."""
+    issues: dict[str, list[LintIssue]] = {p.m_number: [] for p in products}
+    if not products:
+        return issues
+    g = _layout_arrays(products, templates_dir)
+    names = ["icon"] + [f"text_{j + 1}" for j in range(MAX_TEXT_LINES)]
+    elements = np.concatenate([g["icon"][:, None, :], g["text"]], axis=1)  # (n, 4, 4)
+
+    def report(mask, check, severity, message):
+        for i, k in zip(*np.nonzero(mask)):
+            issues[products[i].m_number].append(LintIssue(check, severity, names[k], message(i, k)))
+
+    # Comparisons with NaN (absent elements) are False, so they never report
+    with np.errstate(invalid="ignore"):
+        text, slot = g["text"], g["slot"]
+        over_w = (text[..., 2] - text[..., 0]) - (slot[..., 2] - slot[..., 0])
+        over_h = (text[..., 3] - text[..., 1]) - (slot[..., 3] - slot[..., 1])
+        report(np.pad(over_w > TEXT_TOLERANCE_MM, ((0, 0), (1, 0))), "text_overflow", "error",
+               lambda i, k: f"text ~{over_w[i, k - 1]:.1f}mm wider than its {slot[i, k - 1, 2] - slot[i, k - 1, 0]:.1f}mm box")
+        report(np.pad(over_h > TEXT_TOLERANCE_MM, ((0, 0), (1, 0))), "text_overflow", "error",
+               lambda i, k: f"text ~{over_h[i, k - 1]:.1f}mm taller than its {slot[i, k - 1, 3] - slot[i, k - 1, 1]:.1f}mm box")
+        # Layout A is icon-only by design, so its ignored text is only a warning
+        icon_only = np.array([p.layout_mode == "A" for p in products])[:, None]
+        dropped = np.pad(g["dropped"], ((0, 0), (1, 0)))
+        message = lambda i, k: f"layout {products[i].layout_mode} has no place for line {k}; it is not drawn"
+        report(dropped & ~icon_only, "missing_box", "error", message)
+        report(dropped & icon_only, "missing_box", "warning", message)
+
+        clearance = _clearance(elements, g["sign"], g["circular"])
+        report(clearance < 0, "out_of_bounds", "error",
+               lambda i, k: f"extends {-clearance[i, k]:.1f}mm past the sign edge")
+        report((clearance >= 0) & (clearance < MIN_EDGE_CLEARANCE_MM), "edge_clearance", "warning",
+               lambda i, k: f"only {clearance[i, k]:.1f}mm from the sign edge")
+
+        for j in range(MAX_TEXT_LINES):
+            size = _overlap(elements[:, 0], elements[:, j + 1])
+            mask = np.zeros(elements.shape[:2], dtype=bool)
+            mask[:, j + 1] = np.all(size > OVERLAP_TOLERANCE_MM, axis=-1)
+            report(mask, "overlap", "error", lambda i, k: f"overlaps the icon by {size[i, 0]:.1f}x{size[i, 1]:.1f}mm")
+            for other in range(j + 1, MAX_TEXT_LINES):
+                size2 = _overlap(elements[:, j + 1], elements[:, other + 1])
+                mask = np.zeros(elements.shape[:2], dtype=bool)
+                mask[:, other + 1] = np.all(size2 > OVERLAP_TOLERANCE_MM, axis=-1)
+                report(mask, "overlap", "error",
+                       lambda i, k, j=j, size2=size2: f"overlaps text_{j + 1} by {size2[i, 0]:.1f}x{size2[i, 1]:.1f}mm")
+
+        font = g["font"]
+        report(np.pad(font < MIN_FONT_SIZE, ((0, 0), (1, 0))), "font_floor", "error",
+               lambda i, k: f"font size {font[i, k - 1]:.2f} is below the {MIN_FONT_SIZE} minimum")
+    return issues
+
+
+def failed_products(issues: dict[str, list[LintIssue]]) -> set[str]:
+    """M numbers with at least one error."""
+    return {m for m, found in issues.items() if any(x.severity == "error" for x in found)}
+
+
+def write_report(path: Path, issues: dict[str, list[LintIssue]]) -> dict:
+    """Write the JSON lint report. Returns its summary."""
+    counts: dict[str, int] = {}
+    for found in issues.values():
+        for issue in found:
+            counts[issue.check] = counts.get(issue.check, 0) + 1
+    failed = failed_products(issues)
+    summary = {"products": len(issues), "failed": len(failed), "issues": counts}
+    report = {
+        "summary": summary,
+        "products": [
+            {"m_number": m, "ok": m not in failed, "issues": [vars(x) for x in found]}
+            for m, found in issues.items()
+        ],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return summary
+
+
+def log_report(issues: dict[str, list[LintIssue]], summary: dict, path: Path) -> None:
+    """Log each failing product's errors and the totals."""
+    for m_number, found in issues.items():
+        for issue in found:
+            if issue.severity == "error":
+                logging.warning("Lint %s %s [%s]: %s", m_number, issue.element, issue.check, issue.message)
+    logging.info("Layout lint: %d of %d products fail (%s); report: %s", summary["failed"], summary["products"],
+                 ", ".join(f"{k} {v}" for k, v in sorted(summary["issues"].items())) or "no issues", path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check product layouts for overflow and collisions without rendering")
+    parser.add_argument("--csv", type=Path, default=Path("products.csv"), help="Products CSV")
+    parser.add_argument("--templates", type=Path, default=TEMPLATES_DIR, help="Templates directory")
+    parser.add_argument("--output", type=Path, default=Path("exports/layout_lint.json"), help="JSON report path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    issues = lint_products(_read_products_csv(args.csv), args.templates)
+    summary = write_report(args.output, issues)
+    log_report(issues, summary, args.output)
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
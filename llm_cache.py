@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of parsed LLM responses for listing content.
+
+The Amazon, eBay and Etsy content generators look up each Claude call here
+before sending it. The key is a hash of the model, the prompt text and the
+request parameters (max_tokens, ...), so any change to the product data,
+theme, use cases or prompt wording is a miss. The value is the JSON parsed
+from the response, before the channel's length limits are applied.
+
+Entries expire after CACHE_TTL_DAYS. When the stored values exceed
+CACHE_MAX_BYTES the least recently used entries are evicted. With
+refresh=True (--refresh-content) lookups always miss, and the new responses
+replace the cached ones.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+CACHE_PATH = Path(__file__).parent / "llm_cache.db"
+CACHE_TTL_DAYS = 30
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_key(model: str, prompt: str, **params) -> str:
+    """Hash of everything that determines a response."""
+    payload = json.dumps({"model": model, "prompt": prompt, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of parsed responses, safe to share between threads (one connection per call)."""
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        ttl_days: float = CACHE_TTL_DAYS,
+        max_bytes: int = CACHE_MAX_BYTES,
+        refresh: bool = False,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl_days * 86400
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(str(self.path), timeout=10.0)
+        conn.execute('PRAGMA journal_mode=WAL')
+        try:
+            if not self._ready:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL,
+                        size INTEGER NOT NULL,
+                        value TEXT NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)')
+                conn.commit()
+                self._ready = True
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[dict]:
+        """The cached value, or None on a miss, an expired entry or refresh."""
+        if self.refresh:
+            return None
+        now = time.time()
+        try:
+            with self._db() as db:
+                row = db.execute('SELECT value FROM responses WHERE key = ? AND created_at > ?',
+                                 (key, now - self.ttl)).fetchone()
+                if row is None:
+                    return None
+                db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+                db.commit()
+            value = json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logging.warning("LLM cache read failed: %s", e)
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, model: str, value: dict) -> None:
+        """Store a parsed response, then evict expired and least recently used entries."""
+        text = json.dumps(value)
+        now = time.time()
+        try:
+            with self._db() as db:
+                db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                           (key, model, now, now, len(text), text))
+                db.execute('DELETE FROM responses WHERE created_at <= ?', (now - self.ttl,))
+                total = db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+                if total > self.max_bytes:
+                    self._evict(db, total)
+                db.commit()
+        except sqlite3.Error as e:
+            logging.warning("Could not cache LLM response: %s", e)
+
+    def _evict(self, db: sqlite3.Connection, total: int) -> None:
+        evicted = []
+        for key, size in db.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        logging.info("LLM cache: evicted %d least recently used entries", len(evicted))
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing for the image pipeline.
+
+Code under test wraps each stage in `span("stage")`; spans are timed with
+the monotonic perf counter and tagged with the product being processed.
+generate_images_v2 appends them to exports/metrics.jsonl, one JSON object
+per line:
+
+    {"run": "20260101-120000-1234", "product": "M1075", "stage": "rasterize", "seconds": 0.8123}
+
+and logs a p50/p95/max summary per stage at the end of the run. --jobs
+workers hand their spans back to the parent with their log records. A run
+collects its spans with collect_spans(), so concurrent runs in one process
+(web server request threads) keep their spans apart.
+
+Summarize a previous run (or all runs) from the file:
+    python pipeline_metrics.py exports/metrics.jsonl [--run RUN_ID]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Pipeline stages in the order a product passes through them (summary order)
+STAGES = (
+    "csv_parse",
+    "folder_setup",
+    "icon_load",
+    "layout",
+    "template_load",
+    "inject",
+    "serialize",
+    "rasterize",
+    "resize",
+    "write",
+    "derivatives",
+    "master_design",
+)
+
+_SPANS: list[dict] = []  # spans recorded outside collect_spans() (e.g. in a --jobs worker)
+_RUN_SPANS: ContextVar[Optional[list[dict]]] = ContextVar("run_spans", default=None)
+_LOCK = threading.Lock()
+_CONTEXT = threading.local()
+
+
+def _current_spans() -> list[dict]:
+    spans = _RUN_SPANS.get()
+    return _SPANS if spans is None else spans
+
+
+@contextmanager
+def collect_spans():
+    """Record spans from this thread into a fresh list (yielded) for the duration of the block."""
+    spans: list[dict] = []
+    token = _RUN_SPANS.set(spans)
+    try:
+        yield spans
+    finally:
+        _RUN_SPANS.reset(token)
+
+
+def new_run_id() -> str:
+    """Identifier shared by every span of one run."""
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+
+@contextmanager
+def product_scope(product: Optional[str]):
+    """Tag spans recorded inside the block with a product (M number)."""
+    previous = getattr(_CONTEXT, "product", None)
+    _CONTEXT.product = product
+    try:
+        yield
+    finally:
+        _CONTEXT.product = previous
+
+
+@contextmanager
+def span(stage: str, **fields):
+    """Time the block and record it under `stage` (recorded even if it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = {
+            "product": getattr(_CONTEXT, "product", None),
+            "stage": stage,
+            "seconds": round(time.perf_counter() - start, 6),
+            **fields,
+        }
+        with _LOCK:
+            _current_spans().append(record)
+
+
+def take_spans() -> list[dict]:
+    """Return and clear the spans recorded so far (in the current collect_spans() run, if any)."""
+    with _LOCK:
+        current = _current_spans()
+        spans = list(current)
+        current.clear()
+    return spans
+
+
+def record_spans(spans: list[dict]) -> None:
+    """Add spans taken in another process (a --jobs worker) to the current run."""
+    with _LOCK:
+        _current_spans().extend(spans)
+
+
+def write_spans(path: Path, run_id: str, spans: list[dict]) -> None:
+    """Append spans to a JSONL metrics file."""
+    if not spans:
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in spans:
+            f.write(json.dumps({"run": run_id, **record}) + "\n")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(spans: list[dict]) -> dict[str, dict]:
+    """Per-stage count, total, p50, p95 and max seconds, in pipeline order."""
+    by_stage: dict[str, list[float]] = {}
+    for record in spans:
+        by_stage.setdefault(record["stage"], []).append(record["seconds"])
+    order = [s for s in STAGES if s in by_stage] + sorted(s for s in by_stage if s not in STAGES)
+    summary = {}
+    for stage in order:
+        values = sorted(by_stage[stage])
+        summary[stage] = {
+            "count": len(values),
+            "total": sum(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": values[-1],
+        }
+    return summary
+
+
+def log_summary(spans: list[dict]) -> None:
+    """Log the per-stage summary table."""
+    summary = summarize(spans)
+    if not summary:
+        return
+    logging.info("Stage timings (seconds):")
+    logging.info("  %-14s %6s %9s %8s %8s %8s", "stage", "count", "total", "p50", "p95", "max")
+    for stage, s in summary.items():
+        logging.info("  %-14s %6d %9.3f %8.3f %8.3f %8.3f",
+                     stage, s["count"], s["total"], s["p50"], s["p95"], s["max"])
+
+
+def load_spans(path: Path, run_id: Optional[str] = None) -> list[dict]:
+    """Read spans back from a metrics file, optionally for one run ("last" = most recent)."""
+    spans = [json.loads(line) for line in Path(path).read_text(encoding="utf-8").splitlines() if line.strip()]
+    if run_id == "last" and spans:
+        run_id = spans[-1]["run"]
+    if run_id:
+        spans = [s for s in spans if s.get("run") == run_id]
+    return spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize image pipeline stage timings")
+    parser.add_argument("metrics", type=Path, nargs="?", default=Path("exports/metrics.jsonl"),
+                        help="Metrics file (default: exports/metrics.jsonl)")
+    parser.add_argument("--run", default="last", help="Run id to summarize, 'last' (default) or 'all'")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    spans = load_spans(args.metrics, None if args.run == "all" else args.run)
+    if not spans:
+        logging.error("No spans found in %s", args.metrics)
+        sys.exit(1)
+    log_summary(spans)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Pixel-level QA of rendered main images (generate_images_v2, after rendering).
+
+Each main image is compared with its template rendered without a design
+(the static background in the raster store); pixels that differ are the
+design's ink. The checks, all array operations over that mask:
+
+  near_empty       design ink covers almost none of the sign (blank render)
+  low_coverage     design ink covers little of the sign
+  out_of_bounds    ink past the sign's physical edge, or touching the canvas
+                   edge (clipped icon or text)
+  drawing_area     ink outside the drawing area from _get_sign_bounds
+  text_missing     little or no ink where a text line should be (not drawn,
+                   or the font failed to load)
+  text_width       a text line's ink is much narrower or wider than its
+                   glyph metrics predict (font fallback)
+
+Products with an "error" are auto-flagged: qa_status is set to "rejected"
+with a qa_comment starting AUTO_QA_PREFIX, so reviewers (and --ai-review)
+skip them. Results per product go to exports/pixel_qa.json:
+
+    {"M1075": {"ok": false, "image": "...", "metrics": {"coverage": 0.18, ...},
+               "issues": [{"check": "text_missing", "severity": "error", ...}]}}
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from image_derivatives import flatten_on_white
+from text_metrics import CSS_MM, font_metrics
+
+AUTO_QA_PREFIX = "[AUTO-QA]"
+
+DIFF_THRESHOLD = 24  # largest channel difference (0-255) from the background that still counts as unchanged
+NEAR_EMPTY_COVERAGE = 0.002  # design ink as a share of the sign area
+LOW_COVERAGE = 0.02
+BOUNDS_TOLERANCE_MM = 1.0
+TEXT_MIN_INK = 0.04  # share of a text line's expected box that must be ink
+TEXT_WIDTH_RANGE = (0.8, 1.25)  # measured / predicted text width
+
+
+@dataclass
+class PixelIssue:
+    check: str
+    severity: str  # "error" flags the product, "warning" is reported only
+    message: str
+
+
+@dataclass
+class TextBox:
+    """Where a text line should be drawn: (x0, y0, x1, y1) in mm, from the layout and glyph metrics."""
+    name: str
+    box: tuple[float, float, float, float]
+
+
+def text_boxes(text_elements: list[dict], font: str) -> list[TextBox]:
+    """Expected cap-height box of each laid-out text line (LayoutResult.text_elements)."""
+    metrics = font_metrics(font)
+    boxes = []
+    for i, element in enumerate(text_elements):
+        em = element["font_size"] * CSS_MM
+        width = metrics.width(element["text"]) * em
+        anchor = element.get("anchor", "middle")
+        x0 = element["x"] - (width / 2 if anchor == "middle" else width if anchor == "end" else 0)
+        y = element["y"]
+        boxes.append(TextBox(f"text_{i + 1}", (x0, y - em * metrics.cap_height, x0 + width, y)))
+    return boxes
+
+
+def ink_mask(image: Image.Image, background: Image.Image) -> np.ndarray:
+    """Boolean mask of pixels where the render differs from its template background."""
+    if background.size != image.size:
+        background = background.resize(image.size, Image.LANCZOS)
+    a = np.asarray(flatten_on_white(image), dtype=np.int16)
+    b = np.asarray(flatten_on_white(background), dtype=np.int16)
+    return np.abs(a - b).max(axis=-1) > DIFF_THRESHOLD
+
+
+def _mm_box(mm: tuple[float, float, float, float], px_per_mm: float, shape: tuple[int, int]) -> tuple[slice, slice]:
+    h, w = shape
+    x0, y0, x1, y1 = (int(round(v * px_per_mm)) for v in mm)
+    return slice(max(0, y0), max(0, min(h, y1))), slice(max(0, x0), max(0, min(w, x1)))
+
+
+def check_image(
+    image: Image.Image,
+    background: Image.Image,
+    px_per_mm: float,
+    sign_box: tuple[float, float, float, float],
+    drawing_box: tuple[float, float, float, float],
+    circular: bool,
+    texts: list[TextBox],
+) -> tuple[dict, list[PixelIssue]]:
+    """
+    Run every check on one main image. Boxes are (x0, y0, x1, y1) in mm:
+    sign_box the physical sign outline (measured from the template, see
+    layout_lint.sign_edges), drawing_box the _get_sign_bounds area.
+    Returns (metrics, issues).
+    """
+    mask = ink_mask(image, background)
+    issues: list[PixelIssue] = []
+    sx0, sy0, sx1, sy1 = sign_box
+    if circular:
+        radius = min(sx1 - sx0, sy1 - sy0) / 2
+        sign_area = np.pi * radius ** 2
+    else:
+        sign_area = (sx1 - sx0) * (sy1 - sy0)
+    coverage = mask.sum() / (sign_area * px_per_mm ** 2)
+    metrics: dict = {"coverage": round(float(coverage), 4), "ink_bbox_mm": None, "text_ink": {}}
+
+    if coverage < NEAR_EMPTY_COVERAGE:
+        issues.append(PixelIssue("near_empty", "error", f"design covers {coverage:.2%} of the sign (blank render?)"))
+        return metrics, issues
+    if coverage < LOW_COVERAGE:
+        issues.append(PixelIssue("low_coverage", "warning", f"design covers only {coverage:.1%} of the sign"))
+
+    ys, xs = np.nonzero(mask)
+    h, w = mask.shape
+    bbox = np.array([xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]) / px_per_mm
+    metrics["ink_bbox_mm"] = [round(float(v), 1) for v in bbox]
+    if xs.min() == 0 or ys.min() == 0 or xs.max() == w - 1 or ys.max() == h - 1:
+        issues.append(PixelIssue("out_of_bounds", "error", "design reaches the canvas edge (clipped)"))
+    if circular:
+        cx, cy = (sx0 + sx1) / 2, (sy0 + sy1) / 2
+        overrun = np.hypot((xs + 0.5) / px_per_mm - cx, (ys + 0.5) / px_per_mm - cy).max() - radius
+    else:
+        overrun = max(sx0 - bbox[0], sy0 - bbox[1], bbox[2] - sx1, bbox[3] - sy1)
+    if overrun > BOUNDS_TOLERANCE_MM:
+        issues.append(PixelIssue("out_of_bounds", "error", f"design extends {overrun:.1f}mm past the sign edge"))
+    dx0, dy0, dx1, dy1 = drawing_box
+    outside = max(dx0 - bbox[0], dy0 - bbox[1], bbox[2] - dx1, bbox[3] - dy1)
+    if outside > BOUNDS_TOLERANCE_MM:
+        issues.append(PixelIssue("drawing_area", "warning", f"design extends {outside:.1f}mm past the drawing area"))
+
+    columns = np.arange(w)
+    for text in texts:
+        rows, cols = _mm_box(text.box, px_per_mm, mask.shape)
+        region = mask[rows, cols]
+        share = float(region.mean()) if region.size else 0.0
+        metrics["text_ink"][text.name] = round(share, 4)
+        if share < TEXT_MIN_INK:
+            issues.append(PixelIssue("text_missing", "error",
+                                     f"{text.name}: {share:.1%} ink where the text should be (not drawn?)"))
+            continue
+        # Horizontal ink extent across the line's band, over the full width of the image
+        inked = columns[mask[rows].any(axis=0)]
+        measured = (inked.max() + 1 - inked.min()) / px_per_mm
+        predicted = text.box[2] - text.box[0]
+        ratio = measured / predicted if predicted > 0 else 1.0
+        lo, hi = TEXT_WIDTH_RANGE
+        if not lo <= ratio <= hi:
+            issues.append(PixelIssue("text_width", "warning",
+                                     f"{text.name} is {measured:.0f}mm wide, {predicted:.0f}mm expected (font fallback?)"))
+    return metrics, issues
+
+
+def flag_comment(issues: list[PixelIssue]) -> Optional[str]:
+    """qa_comment for a product with errors, or None if it passes."""
+    errors = [f"{x.check}: {x.message}" for x in issues if x.severity == "error"]
+    return f"{AUTO_QA_PREFIX} " + "; ".join(errors) if errors else None
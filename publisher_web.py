@@ -8,6 +8,7 @@ across Amazon, eBay, and Etsy channels.
 
 import csv
 import json
+import logging
 import os
 import subprocess
 import threading
@@ -1092,11 +1093,11 @@ HTML_TEMPLATE = '''
                     <div class="qa-card-images">
                         <img class="main-image" id="main-${p.m_number}" src="/api/image/${p.m_number}/001?t=${t}" onclick="showModal(this.src)" onerror="this.src='/api/preview/${p.m_number}?icon_scale=${p.icon_scale || 1.0}&text_scale=${p.text_scale || 1.0}'" alt="Main Product Image">
                         <div class="thumb-row">
-                            <img src="/api/image/${p.m_number}/001?t=${t}" onclick="showModal(this.src)" onerror="this.style.display='none'" title="Main">
-                            <img src="/api/image/${p.m_number}/002?t=${t}" onclick="showModal(this.src)" onerror="this.style.display='none'" title="Dimensions">
-                            <img src="/api/image/${p.m_number}/003?t=${t}" onclick="showModal(this.src)" onerror="this.style.display='none'" title="Peel">
-                            <img src="/api/image/${p.m_number}/004?t=${t}" onclick="showModal(this.src)" onerror="this.style.display='none'" title="Rear">
-                            <img src="/api/image/${p.m_number}/005?t=${t}" onclick="showModal(this.src)" onerror="this.style.display='none'" title="Lifestyle">
+                            <img src="/api/image/${p.m_number}/001?t=${t}&thumb=1" onclick="showModal(this.src.replace('&thumb=1', ''))" onerror="this.style.display='none'" title="Main">
+                            <img src="/api/image/${p.m_number}/002?t=${t}&thumb=1" onclick="showModal(this.src.replace('&thumb=1', ''))" onerror="this.style.display='none'" title="Dimensions">
+                            <img src="/api/image/${p.m_number}/003?t=${t}&thumb=1" onclick="showModal(this.src.replace('&thumb=1', ''))" onerror="this.style.display='none'" title="Peel">
+                            <img src="/api/image/${p.m_number}/004?t=${t}&thumb=1" onclick="showModal(this.src.replace('&thumb=1', ''))" onerror="this.style.display='none'" title="Rear">
+                            <img src="/api/image/${p.m_number}/005?t=${t}&thumb=1" onclick="showModal(this.src.replace('&thumb=1', ''))" onerror="this.style.display='none'" title="Lifestyle">
                         </div>
                     </div>
                     <div class="qa-card-body">
@@ -1723,6 +1724,73 @@ def stream_command(cmd):
         yield f"\n=== FAILED (exit code {process.returncode}) ===\n"
 
 
+# Warm Inkscape sessions shared by every in-process image generation request
+INKSCAPE_SESSIONS = int(os.environ.get('INKSCAPE_SESSIONS', '2'))
+
+
+class ThreadLogHandler(logging.Handler):
+    """Forward log records from a single thread into a queue for streaming."""
+
+    def __init__(self, thread_id, out):
+        super().__init__(logging.INFO)
+        self.thread_id = thread_id
+        self.out = out
+        self.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+
+    def emit(self, record):
+        if record.thread == self.thread_id:
+            self.out.put(self.format(record) + "\n")
+
+
+def stream_generation(csv_name, main_only=False, draft=False):
+    """Run image generation in-process and stream its log output.
+    
+    Unlike stream_command, this reuses the web app's warm Inkscape shell
+    sessions, so a regenerate does not pay Inkscape's startup per image.
+    """
+    import generate_images_v2
+    
+    generate_images_v2._configure_renderer("inkscape", True, INKSCAPE_SESSIONS)
+    logging.getLogger().setLevel(logging.INFO)
+    out = queue.Queue()
+    result = {}
+    
+    def run():
+        handler = ThreadLogHandler(threading.get_ident(), out)
+        logging.getLogger().addHandler(handler)
+        try:
+            success, failed = generate_images_v2.generate_from_csv(
+                APP_DIR / csv_name,
+                APP_DIR / "assets",
+                APP_DIR / "001 ICONS",
+                APP_DIR / "exports",
+                main_only=main_only,
+                draft=draft,
+                master_csv=APP_DIR / "products.csv",
+            )
+            out.put(f"Completed: {success} success, {failed} failed\n")
+            result['ok'] = failed == 0
+        except Exception as e:
+            out.put(f"ERROR: {e}\n")
+            result['ok'] = False
+        finally:
+            logging.getLogger().removeHandler(handler)
+            out.put(None)
+    
+    threading.Thread(target=run, daemon=True).start()
+    
+    while True:
+        line = out.get()
+        if line is None:
+            break
+        yield line
+    
+    if result.get('ok'):
+        yield "\n=== SUCCESS ===\n"
+    else:
+        yield "\n=== FAILED ===\n"
+
+
 @app.route('/api/run/amazon', methods=['POST'])
 def run_amazon():
     """Generate M folders and product images only (no content/lifestyle - that's done after QA)."""
@@ -1848,12 +1916,29 @@ def save_qa_product():
 
 @app.route('/api/image/<m_number>/<image_num>')
 def get_image(m_number, image_num):
-    """Serve product images from exports folder."""
+    """Serve product images from exports folder (?thumb=1 serves the render-time thumbnail).
+    
+    A QA draft (see generate_images_v2 --draft) is served in preference to the
+    final image; finalizing a product removes its draft.
+    """
     from flask import send_file
+    from generate_images_v2 import draft_path
+    from image_derivatives import find_derivative
+
+    def send_image(img_path):
+        if request.args.get("thumb"):
+            thumb = find_derivative(img_path, "thumbnail")
+            if thumb is not None:
+                return send_file(thumb, mimetype='image/jpeg')
+        return send_file(img_path, mimetype='image/png')
     
     # Find the product folder
     exports_dir = APP_DIR / "exports"
     
+    draft = draft_path(exports_dir, m_number, image_num)
+    if draft.exists():
+        return send_file(draft, mimetype='image/png')
+    
     # Look for folder starting with m_number
     for folder in exports_dir.iterdir():
         if folder.is_dir() and folder.name.startswith(m_number):
@@ -1862,13 +1947,13 @@ def get_image(m_number, image_num):
                 # Try exact format: M1150 - 001.png
                 img_path = images_dir / f"{m_number} - {image_num}.png"
                 if img_path.exists():
-                    return send_file(img_path, mimetype='image/png')
+                    return send_image(img_path)
                 
                 # Find image matching the number pattern
                 for img in sorted(images_dir.glob("*.png")):
                     # Match patterns like "M1150 - 001.png" or "001.png"
                     if f"- {image_num}" in img.name or img.name == f"{image_num}.png":
-                        return send_file(img, mimetype='image/png')
+                        return send_image(img)
     
     # Return placeholder SVG if not found
     svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="350" viewBox="0 0 400 350">
@@ -1906,10 +1991,8 @@ def run_regenerate_single():
         writer.writeheader()
         writer.writerows(rows)
     
-    # Run image generation for just this product - main image only for speed
-    cmd = f'python generate_images_v2.py --csv products_single.csv --main-only'
-    
-    return Response(stream_command(cmd), mimetype='text/plain')
+    # Low-resolution draft of the main image for QA; full resolution happens on finalize
+    return Response(stream_generation("products_single.csv", draft=True), mimetype='text/plain')
 
 
 @app.route('/api/run/finalize', methods=['POST'])
@@ -1940,9 +2023,7 @@ def run_finalize():
         writer.writerows(rows)
     
     # Run FULL image generation (all images + master design file)
-    cmd = f'python generate_images_v2.py --csv products_single.csv'
-    
-    return Response(stream_command(cmd), mimetype='text/plain')
+    return Response(stream_generation("products_single.csv"), mimetype='text/plain')
 
 
 @app.route('/api/run/finalize-approved', methods=['POST'])
@@ -1967,9 +2048,7 @@ def run_finalize_approved():
         writer.writerows(rows)
     
     # Run FULL image generation for all approved products
-    cmd = f'python generate_images_v2.py --csv products_approved.csv'
-    
-    return Response(stream_command(cmd), mimetype='text/plain')
+    return Response(stream_generation("products_approved.csv"), mimetype='text/plain')
 
 
 @app.route('/api/run/lifestyle', methods=['POST'])
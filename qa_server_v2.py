@@ -6,9 +6,11 @@ Features:
 - Real-time icon_scale and text_scale adjustment with live preview
 - Continue Pipeline button to regenerate pending products and proceed
 - Automatic CSV updates for qa_status, qa_comment, icon_scale, text_scale
+- Pixel QA results (exports/pixel_qa.json) shown on each card
 """
 
 import csv
+import json
 import logging
 import subprocess
 import sys
@@ -68,6 +70,10 @@ HTML_TEMPLATE = """
         }
         .card-header h3 { margin: 0; font-size: 16px; }
         .card-header .size { color: #888; font-size: 12px; }
+        .card-header .auto-qa {
+            background: #e74c3c; color: #fff; font-size: 11px; font-weight: bold;
+            padding: 2px 6px; border-radius: 3px; cursor: help;
+        }
         .card-images {
             display: flex; flex-wrap: wrap; gap: 5px; padding: 10px;
             background: #ffffff; justify-content: center;
@@ -230,6 +236,10 @@ HTML_TEMPLATE = """
              data-text-scale="{{ product.text_scale or '1.0' }}">
             <div class="card-header">
                 <h3>{{ product.m_number }} - {{ product.description }}</h3>
+                {% set qa = pixel_qa.get(product.m_number) %}
+                {% if qa and not qa.ok %}
+                <span class="auto-qa" title="{% for issue in qa.issues if issue.severity == 'error' %}{{ issue.check }}: {{ issue.message }}&#10;{% endfor %}">Auto-QA</span>
+                {% endif %}
                 <span class="size">{{ product.size }} / {{ product.color }}</span>
             </div>
             <div class="card-images">
@@ -595,6 +605,14 @@ def read_products():
     return products
 
 
+def read_pixel_qa() -> dict:
+    """Pixel QA results by M number, from the last image runs (empty if none)."""
+    try:
+        return json.loads((EXPORTS_DIR / "pixel_qa.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
 def save_product(m_number: str, qa_status: str, qa_comment: str, icon_scale: str = "", text_scale: str = ""):
     """Update a product's qa_status, qa_comment, and scale values in the CSV."""
     rows = []
@@ -679,6 +697,48 @@ def run_pipeline_async(command: str, description: str):
     thread.start()
 
 
+class PipelineLogHandler(logging.Handler):
+    """Append log records from the generation thread to PIPELINE_LOG."""
+
+    def __init__(self, thread_id):
+        super().__init__(logging.INFO)
+        self.thread_id = thread_id
+
+    def emit(self, record):
+        if record.thread == self.thread_id:
+            PIPELINE_LOG.append(record.getMessage())
+
+
+def run_generation_async(csv_path: Path, description: str, draft: bool = False):
+    """Regenerate images in-process, reusing warm Inkscape shell sessions (draft: QA preview tier)."""
+    global PIPELINE_RUNNING, PIPELINE_LOG
+    PIPELINE_RUNNING = True
+    PIPELINE_LOG = [f"Starting: {description}"]
+    
+    def run():
+        global PIPELINE_RUNNING
+        import generate_images_v2
+        
+        handler = PipelineLogHandler(threading.get_ident())
+        logging.getLogger().addHandler(handler)
+        try:
+            success, failed = generate_images_v2.generate_from_csv(
+                csv_path, Path("assets"), Path("001 ICONS"), EXPORTS_DIR, draft=draft, master_csv=CSV_PATH
+            )
+            if failed == 0:
+                PIPELINE_LOG.append("✓ Completed successfully")
+            else:
+                PIPELINE_LOG.append(f"✗ Failed: {failed} of {success + failed} products")
+        except Exception as e:
+            PIPELINE_LOG.append(f"ERROR: {str(e)}")
+        finally:
+            logging.getLogger().removeHandler(handler)
+            PIPELINE_RUNNING = False
+    
+    thread = threading.Thread(target=run)
+    thread.start()
+
+
 @app.route("/")
 def index():
     import time
@@ -690,6 +750,7 @@ def index():
     return render_template_string(
         HTML_TEMPLATE,
         products=products,
+        pixel_qa=read_pixel_qa(),
         total=len(products),
         pending=pending,
         approved=approved,
@@ -700,7 +761,12 @@ def index():
 
 @app.route("/image/<m_number>/<image_num>")
 def serve_image(m_number, image_num):
-    """Serve product image by number (001-005)."""
+    """Serve product image by number (001-005), preferring a pending QA draft."""
+    from generate_images_v2 import draft_path
+
+    draft = draft_path(EXPORTS_DIR, m_number, image_num)
+    if draft.exists():
+        return send_from_directory(draft.parent, draft.name)
     for folder in EXPORTS_DIR.glob(f"{m_number}*"):
         images_dir = folder / "002 Images"
         if images_dir.exists():
@@ -744,9 +810,9 @@ def regenerate():
     # Create retry CSV
     retry_path = create_retry_csv(m_numbers)
     
-    # Run image generation
-    command = f'cmd /c "config.bat && python generate_images_v2.py --csv {retry_path.name}"'
-    run_pipeline_async(command, f"Regenerating {len(m_numbers)} products")
+    # Run image generation in-process so the Inkscape sessions stay warm between regenerates.
+    # QA only needs low-resolution drafts; full resolution is rendered on continue-pipeline.
+    run_generation_async(retry_path, f"Regenerating {len(m_numbers)} products", draft=True)
     
     return jsonify({"success": True, "count": len(m_numbers)})
 
@@ -772,9 +838,12 @@ def continue_pipeline():
     if not approved:
         return jsonify({"error": "No approved products to process"}), 400
     
-    # Run the full pipeline continuation
+    # Render full-resolution finals for approved products (replacing their QA drafts;
+    # --resume skips any already final), then run the rest of the pipeline
+    retry_path = create_retry_csv([p["m_number"] for p in approved])
     command = (
         'cmd /c "config.bat && '
+        f'python generate_images_v2.py --csv {retry_path} --resume && '
         'python generate_lifestyle_images.py --csv products.csv && '
         'python generate_amazon_content.py --csv products.csv --upload-images --output amazon_flatfile.xlsx"'
     )
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Rasterizer backends for the image pipeline.
+
+Backends (selected with generate_images_v2.py --renderer):
+  inkscape - Inkscape via warm shell sessions (inkscape_server.py), or one
+             CLI process per export. Reference output for production images.
+  resvg    - In-process renderer (resvg-py). Renders the lxml tree straight
+             to a Pillow image with no process spawn and no temp file, for
+             previews and draft renders.
+
+Every backend takes an lxml SVG root plus the target pixel size, DPI and
+export area ('page' or 'drawing') and returns PNG bytes, so callers never
+deal with temp files. Output files are written once, atomically.
+"""
+
+import io
+import logging
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from lxml import etree
+from PIL import Image, ImageChops, ImageStat
+
+from pipeline_metrics import span
+
+PIXEL_THRESHOLD = 32  # per-channel difference that counts a pixel as "bad"
+CSS_DPI = 96.0  # resvg's unit conversion; the export DPI only sets the pixel size
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write a file in one step: readers (and sync clients) never see a partial file."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def encode_png(img: Image.Image, **save_options) -> bytes:
+    """Encode a Pillow image to PNG bytes."""
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", **save_options)
+    return buf.getvalue()
+
+
+@dataclass
+class RenderJob:
+    """One SVG tree to rasterize, for Rasterizer.render_many()."""
+    root: etree._Element
+    width_px: int
+    height_px: int
+    dpi: float = 300
+    export_area: str = "page"
+
+
+class Rasterizer:
+    """Base class: render an SVG tree to a Pillow image or a PNG file."""
+
+    name = ""
+
+    def version(self) -> str:
+        """Backend identity for render cache keys; changes when output may change."""
+        return self.name
+
+    def render(
+        self,
+        root: etree._Element,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+    ) -> Image.Image:
+        """Render to an in-memory RGBA image."""
+        raise NotImplementedError
+
+    def render_png(
+        self,
+        root: etree._Element,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+    ) -> bytes:
+        """Render to encoded PNG bytes. Raises on failure."""
+        return encode_png(self.render(root, width_px, height_px, dpi, export_area))
+
+    def render_many(self, jobs: list[RenderJob]) -> list[Optional[bytes]]:
+        """Render several trees. Returns PNG bytes per job, None where that render failed."""
+        results = []
+        for job in jobs:
+            try:
+                results.append(self.render_png(job.root, job.width_px, job.height_px, job.dpi, job.export_area))
+            except Exception as e:
+                logging.error("%s render failed: %s", self.name, e)
+                results.append(None)
+        return results
+
+    def render_to_file(
+        self,
+        root: etree._Element,
+        png_path: Path,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+    ) -> bool:
+        """Render straight to a PNG file. Returns True on success."""
+        try:
+            png = self.render_png(root, width_px, height_px, dpi, export_area)
+        except Exception as e:
+            logging.error("%s render failed: %s", self.name, e)
+            return False
+        write_atomic(png_path, png)
+        return True
+
+    def close(self) -> None:
+        """Release any processes or sessions held by the backend."""
+
+
+class InkscapeRasterizer(Rasterizer):
+    """Inkscape backend: warm shell sessions, falling back to the CLI."""
+
+    name = "inkscape"
+
+    def __init__(self, use_shell: bool = True, sessions: int = 1):
+        self.use_shell = use_shell
+        self.sessions = max(1, sessions)
+        self._version = None
+
+    def version(self) -> str:
+        if self._version is None:
+            try:
+                result = subprocess.run(["inkscape", "--version"], capture_output=True, text=True, timeout=30)
+                self._version = result.stdout.strip() or "inkscape unknown"
+            except (OSError, subprocess.TimeoutExpired):
+                self._version = "inkscape unknown"
+        return self._version
+
+    def _render_cli(self, svg: bytes, width_px: int, height_px: int, dpi: int, export_area: str) -> bytes:
+        """Render with a one-shot Inkscape process, SVG on stdin and PNG on stdout."""
+        cmd = [
+            "inkscape",
+            "--pipe",
+            "--export-type=png",
+            "--export-filename=-",
+            f"--export-dpi={dpi}",
+        ]
+
+        if export_area == "drawing":
+            cmd.append("--export-area-drawing")
+        else:
+            cmd.extend([f"--export-width={width_px}", f"--export-height={height_px}"])
+
+        try:
+            result = subprocess.run(cmd, input=svg, capture_output=True, timeout=60)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("Inkscape export timed out")
+        except FileNotFoundError:
+            raise RuntimeError("Inkscape not found in PATH")
+        if result.returncode != 0 or not result.stdout:
+            raise RuntimeError(f"Inkscape export failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+        return result.stdout
+
+    def _render_shell(self, svg: bytes, width_px: int, height_px: int, dpi: int, export_area: str) -> bytes:
+        """Render through the warm Inkscape shell pool, falling back to the CLI."""
+        from inkscape_server import InkscapeShellError, get_render_pool
+
+        try:
+            pool = get_render_pool(self.sessions)
+            png = pool.render(svg, width_px, height_px, dpi, export_area)
+            if png is not None:
+                return png
+            logging.warning("Inkscape shell export failed, retrying with CLI")
+        except InkscapeShellError as e:
+            # Shell mode unavailable (e.g. missing or pre-1.0 Inkscape) - stop trying in this process
+            logging.warning("Inkscape shell unavailable (%s), using one process per export", e)
+            self.use_shell = False
+        return self._render_cli(svg, width_px, height_px, dpi, export_area)
+
+    def render_png(
+        self,
+        root: etree._Element,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+    ) -> bytes:
+        with span("serialize"):
+            svg = etree.tostring(root, encoding="utf-8", xml_declaration=True)
+        with span("rasterize"):
+            if self.use_shell:
+                return self._render_shell(svg, width_px, height_px, dpi, export_area)
+            return self._render_cli(svg, width_px, height_px, dpi, export_area)
+
+    def render_many(self, jobs: list[RenderJob]) -> list[Optional[bytes]]:
+        """Send the whole batch to one shell session; failed outputs are retried one by one."""
+        if not self.use_shell or len(jobs) < 2:
+            return super().render_many(jobs)
+        from inkscape_server import InkscapeShellError, get_render_pool
+
+        with span("serialize", batch=len(jobs)):
+            items = [
+                (etree.tostring(job.root, encoding="utf-8", xml_declaration=True),
+                 job.width_px, job.height_px, job.dpi, job.export_area)
+                for job in jobs
+            ]
+        try:
+            with span("rasterize", batch=len(jobs)):
+                results = get_render_pool(self.sessions).render_many(items)
+        except InkscapeShellError as e:
+            logging.warning("Inkscape shell unavailable (%s), using one process per export", e)
+            self.use_shell = False
+            results = None
+        if results is None:
+            return super().render_many(jobs)
+
+        retry = [i for i, png in enumerate(results) if png is None]
+        if retry:
+            logging.warning("Inkscape batch missed %d of %d outputs, rendering them individually",
+                            len(retry), len(jobs))
+            for i, png in zip(retry, super().render_many([jobs[i] for i in retry])):
+                results[i] = png
+        return results
+
+    def render(
+        self,
+        root: etree._Element,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+    ) -> Image.Image:
+        png = self.render_png(root, width_px, height_px, dpi, export_area)
+        return Image.open(io.BytesIO(png)).convert("RGBA")
+
+
+class ResvgRasterizer(Rasterizer):
+    """In-process backend using resvg (pip install resvg-py)."""
+
+    name = "resvg"
+
+    def __init__(self):
+        try:
+            import resvg_py
+        except ImportError as e:
+            raise RuntimeError("resvg-py is not installed (pip install resvg-py)") from e
+        self._resvg = resvg_py
+
+    def version(self) -> str:
+        from importlib.metadata import PackageNotFoundError, version
+        try:
+            return f"resvg-py {version('resvg-py')}"
+        except PackageNotFoundError:
+            return "resvg-py unknown"
+
+    @staticmethod
+    def _expand_to_drawing(root: etree._Element) -> etree._Element:
+        """
+        Approximate Inkscape's --export-area-drawing: widen the page to three
+        times its size around the original, so content outside the canvas is
+        kept; render() then crops to the painted pixels.
+        """
+        root = etree.fromstring(etree.tostring(root))
+        vb = root.get("viewBox")
+        if not vb:
+            return root
+        x, y, w, h = (float(v) for v in vb.replace(",", " ").split())
+        root.set("viewBox", f"{x - w} {y - h} {3 * w} {3 * h}")
+        for attr, size in (("width", w), ("height", h)):
+            value = root.get(attr)
+            if value:
+                unit = value.lstrip("0123456789.-")
+                number = float(value[: len(value) - len(unit)] or size)
+                root.set(attr, f"{number * 3}{unit}")
+        return root
+
+    def render(
+        self,
+        root: etree._Element,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+    ) -> Image.Image:
+        if export_area == "drawing":
+            with span("serialize"):
+                svg = etree.tostring(self._expand_to_drawing(root), encoding="unicode")
+            with span("rasterize"):
+                # resvg's dpi only converts absolute units (mm, in); the output
+                # scale comes from zoom, so units stay at the CSS 96 px/in
+                png = self._resvg.svg_to_bytes(svg_string=svg, dpi=CSS_DPI, zoom=dpi / CSS_DPI)
+                img = Image.open(io.BytesIO(bytes(png))).convert("RGBA")
+            bbox = img.getbbox()
+            return img.crop(bbox) if bbox else img
+
+        # resvg keeps the aspect ratio, which can round one side by a pixel; render_png fixes that
+        return Image.open(io.BytesIO(self.render_png(root, width_px, height_px, dpi))).convert("RGBA")
+
+    def _render_page_png(self, root: etree._Element, width_px: int, height_px: int, dpi: int) -> bytes:
+        with span("serialize"):
+            svg = etree.tostring(root, encoding="unicode")
+        with span("rasterize"):
+            return bytes(self._resvg.svg_to_bytes(svg_string=svg, dpi=CSS_DPI, width=width_px, height=height_px))
+
+    def render_png(
+        self,
+        root: etree._Element,
+        width_px: int,
+        height_px: int,
+        dpi: int = 300,
+        export_area: str = "page",
+    ) -> bytes:
+        if export_area != "page":
+            return super().render_png(root, width_px, height_px, dpi, export_area)
+        png = self._render_page_png(root, width_px, height_px, dpi)
+        with Image.open(io.BytesIO(png)) as img:  # reads the header only
+            if img.size == (width_px, height_px):
+                return png
+            with span("resize"):
+                return encode_png(img.convert("RGBA").resize((width_px, height_px), Image.LANCZOS))
+
+
+def _on_white(img: Image.Image) -> Image.Image:
+    """Flatten RGBA onto white so transparent areas compare equal."""
+    background = Image.new("RGBA", img.size, (255, 255, 255, 255))
+    return Image.alpha_composite(background, img.convert("RGBA")).convert("RGB")
+
+
+def compare_images(reference: Image.Image, candidate: Image.Image) -> tuple[float, float]:
+    """Return (mean per-channel difference 0-255, fraction of bad pixels)."""
+    if candidate.size != reference.size:
+        candidate = candidate.resize(reference.size, Image.LANCZOS)
+    diff = ImageChops.difference(_on_white(reference), _on_white(candidate))
+    mean_diff = sum(ImageStat.Stat(diff).mean) / 3
+    # Max channel difference per pixel, thresholded to a bad-pixel mask
+    worst = diff.split()
+    mask = ImageChops.lighter(ImageChops.lighter(worst[0], worst[1]), worst[2])
+    bad = mask.point(lambda v: 255 if v > PIXEL_THRESHOLD else 0)
+    bad_fraction = ImageStat.Stat(bad).mean[0] / 255
+    return mean_diff, bad_fraction
+
+
+RASTERIZERS = {
+    "inkscape": InkscapeRasterizer,
+    "resvg": ResvgRasterizer,
+}
+
+
+def get_rasterizer(name: str = "inkscape", **kwargs) -> Rasterizer:
+    """Create a rasterizer backend by name."""
+    if name not in RASTERIZERS:
+        raise ValueError(f"Unknown renderer '{name}' (choose from: {', '.join(RASTERIZERS)})")
+    if name == "inkscape":
+        return InkscapeRasterizer(**kwargs)
+    return RASTERIZERS[name]()
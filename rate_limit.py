@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Client-side rate limiting for API calls made from worker threads.
+
+One RateLimiter is shared by every thread calling the same API; acquire()
+blocks until the call fits within the configured requests per minute (and,
+optionally, tokens per minute). Both limits are token buckets that refill
+continuously, so short bursts are allowed but the per-minute rate holds.
+call_with_retry() retries throttled calls (429/529), transient server errors
+(5xx) and dropped connections or timeouts with jittered backoff.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Bucket:
+    def __init__(self, per_minute: float, burst: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, burst)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until amount is available (amounts above capacity wait for a full bucket)."""
+        return max(0.0, min(amount, self.capacity) - self.level) / self.rate
+
+
+class RateLimiter:
+    """Thread-safe limit of requests_per_minute calls and, if set, tokens_per_minute tokens."""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: Optional[float] = None,
+        burst_seconds: float = 6.0,
+    ):
+        # Buckets hold burst_seconds' worth of calls / tokens
+        self._requests = _Bucket(requests_per_minute, requests_per_minute * burst_seconds / 60)
+        self._tokens = None
+        if tokens_per_minute:
+            self._tokens = _Bucket(tokens_per_minute, tokens_per_minute * burst_seconds / 60)
+        self._lock = threading.Lock()
+        self.waited = 0.0  # total seconds callers spent blocked, for logging
+
+    def acquire(self, tokens: float = 0) -> float:
+        """Block until one request (using `tokens` tokens) may be sent. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                buckets = [(self._requests, 1.0)]
+                if self._tokens is not None and tokens:
+                    buckets.append((self._tokens, float(tokens)))
+                for bucket, _ in buckets:
+                    bucket.refill(now)
+                delay = max(bucket.wait_for(amount) for bucket, amount in buckets)
+                if delay <= 0:
+                    for bucket, amount in buckets:
+                        bucket.level -= min(amount, bucket.capacity)
+                    self.waited += waited
+                    return waited
+            time.sleep(delay)
+            waited += delay
+
+    def consume(self, tokens: float) -> None:
+        """Charge tokens used beyond the estimate passed to acquire() (the bucket may go negative)."""
+        if self._tokens is not None and tokens > 0:
+            with self._lock:
+                self._tokens.refill(time.monotonic())
+                self._tokens.level -= tokens
+
+
+# Request timeout, rate limited, transient server errors, and Anthropic's "overloaded"
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504, 529)
+# Failures with no HTTP status; API clients add their own (e.g. anthropic.APIConnectionError)
+RETRY_ERRORS: tuple[type[BaseException], ...] = (ConnectionError, TimeoutError)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (retry-after header), if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    description: str = "API call",
+    retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    statuses: tuple[int, ...] = RETRY_STATUSES,
+    errors: tuple[type[BaseException], ...] = RETRY_ERRORS,
+) -> T:
+    """
+    Call fn(), retrying when it raises an API error whose status_code is in
+    statuses, or one of errors (connection failures and timeouts). Waits are
+    exponential with full jitter, so threads that were throttled together do
+    not retry together, and never shorter than the server's retry-after.
+    Other errors, and the last failure, are raised.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+            if (status not in statuses and not isinstance(e, errors)) or attempt >= retries:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            delay = max(delay, _retry_after(e) or 0.0)
+            attempt += 1
+            reason = f"HTTP {status}" if status is not None else type(e).__name__
+            logging.warning("%s: %s, retrying in %.1fs (%d of %d)", description, reason, delay,
+                            attempt, retries)
+            time.sleep(delay)
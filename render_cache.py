@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Content-addressed render cache.
+
+Maps a hash of everything that determines a rendered PNG (template bytes,
+icon bytes, computed layout, font, DPI, export area, renderer version) to a
+stored copy of that PNG. On a hit the PNG is hardlinked (or copied, where the
+filesystem cannot link) into place instead of calling the renderer.
+
+Layout:
+    exports/.render_cache/ab/abcdef0123....png
+    exports/.render_cache/static/rear-white-1010-landscape-300dpi-abcdef012345.png
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+
+# Bump when the SVG injection code changes in a way that alters output
+RENDER_PIPELINE_VERSION = "3"
+
+_DIGESTS: dict[str, tuple[int, str]] = {}
+_DIGESTS_LOCK = threading.Lock()
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's bytes, memoized by path and mtime."""
+    key = str(Path(path).resolve())
+    mtime = Path(path).stat().st_mtime_ns
+    with _DIGESTS_LOCK:
+        cached = _DIGESTS.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    with _DIGESTS_LOCK:
+        _DIGESTS[key] = (mtime, digest)
+    return digest
+
+
+def cache_key(**parts) -> str:
+    """Hash JSON-serializable key parts into a stable cache key."""
+    payload = json.dumps({"pipeline": RENDER_PIPELINE_VERSION, **parts}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def link_or_copy(src: Path, dest: Path) -> None:
+    """Hardlink src to dest (copying where the filesystem cannot link), replacing dest atomically."""
+    dest = Path(dest)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            # Cross-device or a filesystem without hardlinks (e.g. synced drives)
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class RenderCache:
+    """PNG store addressed by render-input hash, with hit/miss counters."""
+
+    def __init__(self, cache_dir: Path, enabled: bool = True, force: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.force = force  # skip lookups but still refresh stored entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """Place a cached PNG at dest. Returns True on a hit."""
+        if not self.enabled:
+            return False
+        entry = self._entry(key)
+        if self.force or not entry.exists():
+            with self._lock:
+                self.misses += 1
+            return False
+
+        link_or_copy(entry, dest)
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, src: Path) -> None:
+        """Copy a freshly rendered PNG into the cache."""
+        if not self.enabled or not Path(src).exists():
+            return
+        entry = self._entry(key)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            # Copy (never link) so later writes to the output cannot alter the entry
+            tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copy2(src, tmp)
+            os.replace(tmp, entry)
+        except OSError as e:
+            logging.warning("Could not store render cache entry for %s: %s", Path(src).name, e)
+
+    def take_stats(self) -> dict:
+        """Return and reset the hit/miss counters (used to merge --jobs workers)."""
+        with self._lock:
+            stats = {"hits": self.hits, "misses": self.misses}
+            self.hits = self.misses = 0
+        return stats
+
+    def add_stats(self, stats: dict) -> None:
+        with self._lock:
+            self.hits += stats.get("hits", 0)
+            self.misses += stats.get("misses", 0)
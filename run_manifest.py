@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Checkpoint manifests for resumable batch runs.
+
+Each batch script appends one JSON line per finished item to
+exports/.run_manifests/<stage>.jsonl as it goes, so a run that dies part
+way through leaves a record of everything it completed:
+
+    {"key": "M1075", "status": "done", "inputs": "<hash>", "outputs": {"M1075 .../002 Images/M1075 - 001.png": "<sha256>"}, ...}
+
+With --resume, an item is skipped when its latest record is "done", its
+input hash is unchanged and every recorded output still exists with the
+recorded hash. Failed, missing, changed or damaged items run again.
+Later lines win; the file is compacted when it grows well past one line
+per item.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from rasterizers import write_atomic
+from render_cache import file_digest
+
+MANIFEST_DIRNAME = ".run_manifests"
+
+
+def inputs_digest(**parts) -> str:
+    """Hash the JSON-serializable inputs that determine an item's outputs."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RunManifest:
+    """Append-only checkpoint log for one batch stage (images, lifestyle, upload...)."""
+
+    def __init__(self, exports_dir: Path, stage: str):
+        self.base_dir = Path(exports_dir)
+        self.path = self.base_dir / MANIFEST_DIRNAME / f"{stage}.jsonl"
+        self.entries: dict[str, dict] = {}
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash
+            self.entries[entry["key"]] = entry
+            self._lines += 1
+        if self._lines > 2 * len(self.entries) + 100:
+            self._compact()
+
+    def _compact(self) -> None:
+        data = "".join(json.dumps(entry) + "\n" for entry in self.entries.values())
+        write_atomic(self.path, data.encode("utf-8"))
+        self._lines = len(self.entries)
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return Path(path).relative_to(self.base_dir).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _outputs_intact(self, entry: dict) -> bool:
+        for name, digest in entry.get("outputs", {}).items():
+            path = Path(name) if Path(name).is_absolute() else self.base_dir / name
+            if not path.exists() or file_digest(path) != digest:
+                return False
+        return True
+
+    def completed(self, key: str, inputs: str) -> Optional[dict]:
+        """The item's record if it finished with these inputs and its outputs are intact, else None."""
+        entry = self.entries.get(key)
+        if entry is None or entry["status"] != "done" or entry["inputs"] != inputs:
+            return None
+        try:
+            intact = self._outputs_intact(entry)
+        except OSError:
+            intact = False
+        return entry if intact else None
+
+    def record(
+        self,
+        key: str,
+        inputs: str,
+        ok: bool,
+        outputs: Iterable[Path] = (),
+        result=None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Append an item's outcome (hashing its outputs) and flush it to disk."""
+        entry = {
+            "key": key,
+            "status": "done" if ok else "failed",
+            "inputs": inputs,
+            "outputs": {},
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        if ok:
+            entry["outputs"] = {self._relative(p): file_digest(p) for p in outputs if Path(p).exists()}
+        if result is not None:
+            entry["result"] = result
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self.entries[key] = entry
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+                self._lines += 1
+            except OSError as e:
+                logging.warning("Could not write run manifest %s: %s", self.path, e)
+
+    def summary(self) -> dict[str, int]:
+        """Count of items per status."""
+        counts: dict[str, int] = {}
+        for entry in self.entries.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
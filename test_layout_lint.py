@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Layout linter regression tests.
+
+Usage:
+    python -m pytest test_layout_lint.py
+"""
+
+import pytest
+
+from generate_images_v2 import ProductRow
+from layout_lint import lint_products
+
+
+@pytest.mark.parametrize("layout_mode", ["B", "C", "D", "E", "F"])
+def test_duplicate_text_lines(layout_mode):
+    """Two identical lines are linted as two lines, not one drawn twice."""
+    product = ProductRow(
+        sku_parent="LINT", size="dracula", color="silver", layout_mode=layout_mode,
+        icon_files=["001 PROHIBITION BAR.svg"], text_line_1="FIRE EXIT", text_line_2="FIRE EXIT",
+        text_line_3="", m_number="M9100",
+    )
+    distinct = ProductRow(**{**vars(product), "text_line_2": "KEEP CLEAR"})
+
+    issues = lint_products([product])["M9100"]
+    distinct_issues = lint_products([distinct])["M9100"]
+
+    assert not [x for x in issues if x.check == "overlap" and x.element == "text_2"]
+    # Same verdict on line 2 as distinct text gets: drawn, or reported missing
+    missing = [x.element for x in issues if x.check == "missing_box"]
+    assert missing == [x.element for x in distinct_issues if x.check == "missing_box"]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Renderer conformance test.
+Renders every template in assets/, plus product designs injected into main
+templates (icons, prohibition overlay and text, all sized in mm), with
+Inkscape (the reference) and with an in-process backend, then compares the
+two images pixel by pixel at the production DPI.
+
+Usage:
+    python -m pytest test_renderer_conformance.py
+    python test_renderer_conformance.py --renderer resvg --dpi 300 --max-mean-diff 4 --max-bad-pixels 0.02
+"""
+
+import argparse
+import copy
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+from lxml import etree
+
+from generate_images_v2 import (
+    ProductRow,
+    _build_render_context,
+    _canvas_size_px,
+    _inject_graphic_design,
+    _load_template_svg,
+)
+from rasterizers import PIXEL_THRESHOLD, compare_images, get_rasterizer
+
+BASE_DIR = Path(__file__).parent
+ASSETS_DIR = BASE_DIR / "assets"
+ICONS_DIR = BASE_DIR / "001 ICONS"
+PRODUCTION_DPI = 300
+
+# Injected designs: mm-unit content (stroke widths, font sizes) exercises the backend's unit handling
+DESIGN_PRODUCTS = [
+    ProductRow(
+        sku_parent="CONFORMANCE", size="saville", color="silver", layout_mode="A",
+        icon_files=["001 PROHIBITION BAR.svg"], text_line_1="NO", text_line_2="PARKING",
+        text_line_3="", m_number="M9001", sign_type="prohibition",
+    ),
+    ProductRow(
+        sku_parent="CONFORMANCE", size="dick", color="gold", layout_mode="B",
+        icon_files=["003 INFORMATION SYMBOL.svg"], text_line_1="PRIVATE", text_line_2="PROPERTY",
+        text_line_3="KEEP OUT", m_number="M9002",
+    ),
+]
+
+
+def _cases(dpi: int):
+    """Yield (name, root, width_px, height_px, export_area) for every template and design."""
+    for template in sorted(ASSETS_DIR.glob("*.svg")):
+        root = etree.parse(str(template)).getroot()
+        width_px, height_px = _canvas_size_px(root, dpi)
+        export_area = "drawing" if "peel_and_stick" in template.name else "page"
+        yield template.name, root, width_px, height_px, export_area
+
+    for product in DESIGN_PRODUCTS:
+        ctx = _build_render_context(product, ASSETS_DIR, ICONS_DIR, dpi)
+        assert ctx is not None, f"{product.m_number}: icons not found in {ICONS_DIR}"
+        root = _load_template_svg(ASSETS_DIR, product.color, product.size, "main", product.orientation)
+        _inject_graphic_design(root, product, ctx.icons, ctx.layout)
+        yield f"{product.m_number} ({product.size}, {product.sign_type})", root, ctx.width_px, ctx.height_px, "page"
+
+
+def check_renderer_conformance(
+    renderer: str = "resvg",
+    dpi: int = PRODUCTION_DPI,
+    max_mean_diff: float = 4.0,
+    max_bad_pixels: float = 0.02,
+) -> list[str]:
+    """Compare `renderer` against Inkscape for every case. Returns the names that failed."""
+    print("=" * 60)
+    print(f"Renderer conformance: {renderer} vs inkscape @ {dpi} DPI")
+    print("=" * 60)
+
+    candidate_backend = get_rasterizer(renderer)
+    reference_backend = get_rasterizer("inkscape", use_shell=True)
+
+    failures = []
+    total = 0
+    try:
+        for name, root, width_px, height_px, export_area in _cases(dpi):
+            total += 1
+            try:
+                reference = reference_backend.render(copy.deepcopy(root), width_px, height_px, dpi, export_area)
+                candidate = candidate_backend.render(copy.deepcopy(root), width_px, height_px, dpi, export_area)
+            except Exception as e:
+                print(f"✗ {name}: render failed ({e})")
+                failures.append(name)
+                continue
+
+            mean_diff, bad_fraction = compare_images(reference, candidate)
+            ok = mean_diff <= max_mean_diff and bad_fraction <= max_bad_pixels
+            mark = "✓" if ok else "✗"
+            print(f"{mark} {name}: mean diff {mean_diff:.2f}, bad pixels {bad_fraction:.2%}")
+            if not ok:
+                failures.append(name)
+    finally:
+        reference_backend.close()
+        candidate_backend.close()
+
+    print()
+    print(f"{total - len(failures)}/{total} cases within tolerance")
+    print("=" * 60)
+    return failures
+
+
+def _require_backend(name: str):
+    try:
+        return get_rasterizer(name)
+    except RuntimeError as e:
+        pytest.skip(str(e))
+
+
+def test_renderer_conformance():
+    """resvg matches Inkscape at the production DPI, templates and injected designs alike."""
+    if not shutil.which("inkscape"):
+        pytest.skip("Inkscape not found in PATH")
+    _require_backend("resvg").close()
+    failures = check_renderer_conformance("resvg", PRODUCTION_DPI)
+    assert not failures, f"outside tolerance: {', '.join(failures)}"
+
+
+def test_resvg_scale_independent_of_dpi():
+    """An injected design rendered at 300 DPI matches the 96 DPI render scaled up: mm units don't grow with DPI."""
+    backend = _require_backend("resvg")
+    try:
+        for product in DESIGN_PRODUCTS:
+            ctx = _build_render_context(product, ASSETS_DIR, ICONS_DIR, PRODUCTION_DPI)
+            root = _load_template_svg(ASSETS_DIR, product.color, product.size, "main", product.orientation)
+            _inject_graphic_design(root, product, ctx.icons, ctx.layout)
+            low_w, low_h = _canvas_size_px(root, 96)
+            high = backend.render(copy.deepcopy(root), ctx.width_px, ctx.height_px, PRODUCTION_DPI)
+            low = backend.render(copy.deepcopy(root), low_w, low_h, 96)
+            assert high.size == (ctx.width_px, ctx.height_px)
+            mean_diff, bad_fraction = compare_images(low, high)
+            assert mean_diff <= 8.0 and bad_fraction <= 0.05, (
+                f"{product.m_number}: 300 DPI render differs from 96 DPI "
+                f"(mean diff {mean_diff:.2f}, bad pixels {bad_fraction:.2%})"
+            )
+    finally:
+        backend.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pixel-diff an in-process renderer against Inkscape")
+    parser.add_argument("--renderer", default="resvg", help="Backend to check (default: resvg)")
+    parser.add_argument("--dpi", type=int, default=PRODUCTION_DPI,
+                        help=f"Render DPI (default: {PRODUCTION_DPI}, the production DPI)")
+    parser.add_argument("--max-mean-diff", type=float, default=4.0,
+                        help="Max mean per-channel difference, 0-255 (default: 4.0)")
+    parser.add_argument("--max-bad-pixels", type=float, default=0.02,
+                        help=f"Max fraction of pixels differing by more than {PIXEL_THRESHOLD} (default: 0.02)")
+    args = parser.parse_args()
+
+    if not shutil.which("inkscape"):
+        sys.exit("Inkscape not found in PATH")
+    failed = check_renderer_conformance(args.renderer, args.dpi, args.max_mean_diff, args.max_bad_pixels)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Glyph metrics for sizing sign text.
+
+Measures the fonts in generate_images_v2.FONTS (Arial Bold, Arial Black)
+with Pillow's FreeType binding once, and caches a compact table per font
+in assets/compiled/fonts/<font>.json:
+
+    {"version": "1", "digest": "<font file sha256>", "em": 2048,
+     "advances": {"A": 1479, ...}, "kerning": {"AV": -152, ...},
+     "cap_height": 1466, "descent": 434}
+
+Advances and kerning pairs cover printable ASCII; other characters use the
+average advance. The table is rebuilt when the font file changes. Where
+the font is not installed, a per-character-class estimate stands in (and
+is logged once), so layouts still work, just less precisely.
+
+Build the tables and show sample widths:
+    python text_metrics.py [--font-dir DIR]
+"""
+
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from rasterizers import write_atomic
+from render_cache import file_digest
+
+METRICS_VERSION = "1"  # bump when the table format or measurement changes
+METRICS_DIR = Path("assets/compiled/fonts")
+MEASURE_EM = 2048  # measure at this pixel size: integer advances to 1/2048 em
+
+# font-size is written in CSS mm inside a viewBox whose user unit is 1mm,
+# so one font_size unit renders as 96/25.4 mm
+CSS_MM = 96 / 25.4
+
+# Font files per generate_images_v2.FONTS key (Windows, macOS, msttcorefonts names)
+FONT_FILES = {
+    "arial_bold": ("arialbd.ttf", "Arial Bold.ttf", "Arial_Bold.ttf", "ArialBD.TTF"),
+    "arial_heavy": ("ariblk.ttf", "Arial Black.ttf", "Arial_Black.ttf", "ARIBLK.TTF"),
+}
+
+# Fallback advance widths in em per character class: upper, lower, digit, space
+# (Arial Bold / Arial Black averages; punctuation counts as lower case)
+ESTIMATED_ADVANCE_EM = {
+    "arial_bold": (0.70, 0.58, 0.556, 0.278),
+    "arial_heavy": (0.78, 0.66, 0.667, 0.333),
+}
+ESTIMATED_CAP_HEIGHT_EM = 0.716
+ESTIMATED_DESCENT_EM = 0.21
+
+PRINTABLE = "".join(chr(c) for c in range(32, 127))
+
+
+@dataclass
+class FontMetrics:
+    """Advance widths and kerning in em units."""
+    font: str
+    advances: dict[str, float]
+    kerning: dict[str, float] = field(default_factory=dict)
+    cap_height: float = ESTIMATED_CAP_HEIGHT_EM
+    descent: float = ESTIMATED_DESCENT_EM
+    measured: bool = True  # False: class-based estimate, font file not found
+    digest: Optional[str] = None
+
+    @functools.cached_property
+    def default_advance(self) -> float:
+        return sum(self.advances.values()) / len(self.advances)
+
+    def width(self, text: str) -> float:
+        """Advance width of text in em, including pair kerning."""
+        get = self.advances.get
+        width = sum(get(c, self.default_advance) for c in text)
+        if self.kerning:
+            width += sum(self.kerning.get(text[i:i + 2], 0.0) for i in range(len(text) - 1))
+        return width
+
+
+def _font_dirs() -> list[Path]:
+    dirs = []
+    if os.environ.get("SIGN_FONTS_DIR"):
+        dirs.append(Path(os.environ["SIGN_FONTS_DIR"]))
+    if os.environ.get("WINDIR"):
+        dirs.append(Path(os.environ["WINDIR"]) / "Fonts")
+    if os.environ.get("LOCALAPPDATA"):
+        dirs.append(Path(os.environ["LOCALAPPDATA"]) / "Microsoft" / "Windows" / "Fonts")
+    dirs += [
+        Path.home() / "Library" / "Fonts",
+        Path("/Library/Fonts"),
+        Path("/System/Library/Fonts/Supplemental"),
+        Path.home() / ".fonts",
+        Path.home() / ".local" / "share" / "fonts",
+        Path("/usr/share/fonts"),
+        Path("/usr/local/share/fonts"),
+    ]
+    return [d for d in dirs if d.is_dir()]
+
+
+def find_font_file(font: str) -> Optional[Path]:
+    """The installed file for a FONTS key, or None."""
+    names = FONT_FILES.get(font, ())
+    for directory in _font_dirs():
+        for name in names:
+            if (directory / name).is_file():
+                return directory / name
+        # Linux font packages nest files in per-family folders
+        for name in names:
+            found = next(directory.rglob(name), None)
+            if found is not None:
+                return found
+    return None
+
+
+def measure_font(path: Path) -> dict:
+    """Measure a font file into the cached table form (integer units of 1/MEASURE_EM em)."""
+    from PIL import ImageFont
+
+    face = ImageFont.truetype(str(path), size=MEASURE_EM)
+    advances = {c: face.getlength(c) for c in PRINTABLE}
+    kerning = {}
+    for a in PRINTABLE[1:]:  # no kerning against spaces worth storing
+        for b in PRINTABLE[1:]:
+            adjust = face.getlength(a + b) - advances[a] - advances[b]
+            if abs(adjust) >= 1:
+                kerning[a + b] = round(adjust)
+    cap_top = face.getbbox("H", anchor="ls")[1]
+    descent = face.getbbox("gjpqy", anchor="ls")[3]
+    return {
+        "version": METRICS_VERSION,
+        "digest": file_digest(path),
+        "source": path.name,
+        "em": MEASURE_EM,
+        "advances": {c: round(v) for c, v in advances.items()},
+        "kerning": kerning,
+        "cap_height": round(-cap_top),
+        "descent": round(descent),
+    }
+
+
+def _estimated_metrics(font: str) -> FontMetrics:
+    upper, lower, digit, space = ESTIMATED_ADVANCE_EM.get(font, ESTIMATED_ADVANCE_EM["arial_bold"])
+    advances = {
+        c: space if c == " " else upper if c.isupper() else digit if c.isdigit() else lower
+        for c in PRINTABLE
+    }
+    return FontMetrics(font, advances, measured=False)
+
+
+@functools.lru_cache(maxsize=None)
+def font_metrics(font: str) -> FontMetrics:
+    """Metrics for a FONTS key: the cached table, built on first use, or the estimate."""
+    path = find_font_file(font)
+    if path is None:
+        logging.warning("Font file for %s not found; text sizes are estimated (set SIGN_FONTS_DIR)", font)
+        return _estimated_metrics(font)
+
+    cache_path = METRICS_DIR / f"{font}.json"
+    digest = file_digest(path)
+    table = None
+    try:
+        table = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    if not table or table.get("version") != METRICS_VERSION or table.get("digest") != digest:
+        try:
+            table = measure_font(path)
+        except OSError as e:
+            logging.warning("Could not measure %s (%s); text sizes are estimated", path, e)
+            return _estimated_metrics(font)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(cache_path, json.dumps(table, separators=(",", ":")).encode("utf-8"))
+        except OSError as e:
+            logging.warning("Could not cache font metrics %s: %s", cache_path, e)
+
+    em = table["em"]
+    return FontMetrics(
+        font=font,
+        advances={c: v / em for c, v in table["advances"].items()},
+        kerning={pair: v / em for pair, v in table["kerning"].items()},
+        cap_height=table["cap_height"] / em,
+        descent=table["descent"] / em,
+        digest=table["digest"],
+    )
+
+
+def metrics_signature(font: str) -> str:
+    """Identifies the metrics in use (font file digest, or "estimated"), for cache and manifest keys."""
+    metrics = font_metrics(font)
+    return f"{METRICS_VERSION}:{metrics.digest or 'estimated'}"
+
+
+def text_width_mm(text: str, font_size: float, font: str = "arial_bold") -> float:
+    """Rendered advance width of text at an SVG font_size (CSS mm)."""
+    return font_metrics(font).width(text) * font_size * CSS_MM
+
+
+def fit_font_size(
+    text: str,
+    max_width_mm: float,
+    max_cap_height_mm: Optional[float] = None,
+    font: str = "arial_bold",
+) -> float:
+    """
+    Largest SVG font_size (CSS mm) at which text is at most max_width_mm wide
+    and, if given, its capitals at most max_cap_height_mm tall.
+    """
+    metrics = font_metrics(font)
+    limits = []
+    width_em = metrics.width(text)
+    if width_em > 0:
+        limits.append(max_width_mm / (width_em * CSS_MM))
+    if max_cap_height_mm is not None:
+        limits.append(max_cap_height_mm / (metrics.cap_height * CSS_MM))
+    return max(0.0, min(limits)) if limits else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the cached glyph-metric tables for sign fonts")
+    parser.add_argument("--font-dir", type=Path, help="Also search this directory for font files")
+    parser.add_argument("--sample", default="NO PARKING", help="Text to measure (default: NO PARKING)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.font_dir:
+        os.environ["SIGN_FONTS_DIR"] = str(args.font_dir)
+    missing = 0
+    for font in FONT_FILES:
+        metrics = font_metrics(font)
+        missing += not metrics.measured
+        logging.info("%-12s %-9s %d kerning pairs, cap height %.3f em; %r is %.3f em wide",
+                     font, "measured" if metrics.measured else "estimated", len(metrics.kerning),
+                     metrics.cap_height, args.sample, metrics.width(args.sample))
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,9 +17,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from generate_amazon_content import (
     read_products_from_csv,
-    generate_content_with_claude,
+    generate_all_content,
     upload_to_cloudflare_r2,
     generate_flatfile,
+    MAX_CONTENT_WORKERS,
     MAX_UPLOAD_WORKERS
 )
 
@@ -45,6 +46,8 @@ def run_amazon_content_workflow(
             'upload_images': bool,        # Whether to upload images (default: True)
             'qa_filter': str,             # QA filter (default: 'approved')
             'm_number': str,              # Specific M number (optional)
+            'content_workers': int,       # Concurrent Claude requests (default: MAX_CONTENT_WORKERS)
+            'refresh_content': bool,      # Ignore cached content (default: False)
         }
         progress_callback: Optional callback function(stage: str, data: dict)
                           Called at each workflow stage for progress tracking
@@ -54,6 +57,7 @@ def run_amazon_content_workflow(
             'success': bool,
             'flatfile_path': str,
             'products_processed': int,
+            'content_failed': list,       # M numbers whose content could not be generated
             'images_uploaded': int,
             'duration_seconds': float,
             'error': str (if failed)
@@ -78,6 +82,8 @@ def run_amazon_content_workflow(
         upload_images = payload.get('upload_images', True)
         qa_filter = payload.get('qa_filter', 'approved')
         m_number = payload.get('m_number')
+        content_workers = payload.get('content_workers', MAX_CONTENT_WORKERS)
+        refresh_content = payload.get('refresh_content', False)
         
         report_progress('validating_inputs', {
             'csv_path': str(csv_path),
@@ -111,25 +117,36 @@ def run_amazon_content_workflow(
             'qa_filter': qa_filter
         })
         
-        # Generate content for each product
-        report_progress('generating_content', {'total_products': len(products)})
+        # Generate content concurrently; a failed product is left out of the flatfile
+        report_progress('generating_content', {'total_products': len(products), 'workers': content_workers})
         contents = {}
+        content_failed = []
         
-        for idx, product in enumerate(products, 1):
+        def on_content(done, product, content, error):
             report_progress('generating_product_content', {
                 'product': product.m_number,
-                'progress': f"{idx}/{len(products)}"
+                'progress': f"{done}/{len(products)}",
+                'ok': error is None
             })
-            
-            try:
-                content = generate_content_with_claude(product, api_key, brand, theme, use_cases)
-                contents[product.m_number] = content
-                logging.info(f"Generated content for {product.m_number}: {content.title[:80]}")
-            except Exception as e:
-                logging.error(f"Failed to generate content for {product.m_number}: {e}")
-                raise
         
-        report_progress('content_generated', {'products_with_content': len(contents)})
+        results = generate_all_content(products, api_key, brand, theme, use_cases,
+                                       workers=content_workers, on_result=on_content,
+                                       refresh=refresh_content)
+        for product, content, error in results:
+            if error is not None:
+                logging.error(f"Failed to generate content for {product.m_number}: {error}")
+                content_failed.append(product.m_number)
+                continue
+            contents[product.m_number] = content
+            logging.info(f"Generated content for {product.m_number}: {content.title[:80]}")
+        
+        if not contents:
+            raise ValueError(f"Content generation failed for all {len(products)} products")
+        
+        report_progress('content_generated', {
+            'products_with_content': len(contents),
+            'failed': content_failed
+        })
         
         # Upload images if requested
         images_uploaded = 0
@@ -213,6 +230,7 @@ def run_amazon_content_workflow(
             'success': True,
             'flatfile_path': str(output_path),
             'products_processed': len(contents),
+            'content_failed': content_failed,
             'images_uploaded': images_uploaded,
             'duration_seconds': round(duration, 2)
         }